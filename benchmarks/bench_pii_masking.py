@@ -0,0 +1,127 @@
+"""
+Throughput and coverage of PII masking.
+
+Compares the old mask_pii (two uncompiled re.sub passes, for emails and for
+runs of 10+ digits) with the single-pass engine in pii.py, per KB of message
+text at the sizes candidates send, up to the 5000-character limit of
+validate_input. Three kinds of text: plain technical prose, the same prose
+with contact details in it, and number-heavy prose (dates, versions,
+amounts), which is the worst case for the phone anchor.
+
+Coverage counts how many of a set of PII samples each version masks, and
+how many technical phrases it garbles (masks although they are not PII).
+
+Run from the repository root:
+    python benchmarks/bench_pii_masking.py
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from pii import mask  # noqa: E402
+
+PROSE = (
+    "I have five years of experience with Python, Django and PostgreSQL, mostly building REST APIs "
+    "and data pipelines. Lately I moved our services to Kubernetes and wrote the CI in GitHub Actions. "
+)
+CONTACT = "You can reach me at jane.doe@example.com or +1 (555) 123-4567, profile at https://github.com/janedoe. "
+NUMBERS = "In 2021-2023 we cut p99 latency from 840 ms to 120 ms on Python 3.11.4 with 16 workers and 99.95% uptime. "
+SIZES = (200, 1000, 5000)
+REPEATS = 5
+MIN_SECONDS = 0.2
+
+PII_SAMPLES = [
+    "jane.doe@example.com",
+    "jane.doe+jobs@mail.example.co.uk",
+    "5551234567",
+    "555-123-4567",
+    "555 123 4567",
+    "(555) 123-4567",
+    "+1 555 123 4567",
+    "+91 98765 43210",
+    "+44 20 7946 0958",
+    "https://github.com/janedoe",
+    "http://jane.dev/about",
+    "www.jane.dev",
+    "linkedin.com/in/jane-doe",
+    "github.com/janedoe",
+    "@jane_doe",
+]
+NOT_PII = [
+    "Python 3.11.4",
+    "from 2015 - 2020",
+    "in 2019-2023",
+    "a salary of 120,000",
+    "node.js/react",
+    "python.org",
+    "p99 under 120 ms",
+    "uptime of 99.95%",
+    "C++ and C#",
+    "ratio 16:9",
+    "2015 2016 2017 2018",
+    "192.168.100.200",
+    "1.2.3.4.5.6.7.8.9.10",
+]
+
+
+def old_mask_pii(content: str) -> str:
+    """The previous mask_pii: one uncompiled pass per kind."""
+    content = re.sub(r"\b[\w\.-]+@[\w\.-]+\.\w+\b", "[EMAIL]", content)
+    content = re.sub(r"\b\d{10,}\b", "[PHONE]", content)
+    return content
+
+
+def make_text(size: int, kind: str) -> str:
+    if kind == "prose":
+        unit = PROSE
+    elif kind == "contact":
+        unit = PROSE + CONTACT
+    else:
+        unit = PROSE + NUMBERS + NUMBERS
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def per_kb(func, text: str) -> float:
+    """Best time per KB of text, in microseconds."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(text)
+        if time.perf_counter() - start >= MIN_SECONDS:
+            break
+        loops *= 2
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func(text)
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best * 1e6 * 1024 / len(text)
+
+
+def masked(func, sample: str) -> bool:
+    return func(f"Here it is: {sample} thanks") != f"Here it is: {sample} thanks"
+
+
+def main():
+    print(f"{'text':>8} {'size':>6} {'two passes (us/KB)':>19} {'single pass (us/KB)':>20}")
+    for kind in ("prose", "contact", "numbers"):
+        for size in SIZES:
+            text = make_text(size, kind)
+            print(f"{kind:>8} {size:>6} {per_kb(old_mask_pii, text):>19.1f} {per_kb(mask, text):>20.1f}")
+
+    print()
+    print(f"{'':>8} {'PII masked':>12} {'false positives':>16}")
+    for name, func in (("old", old_mask_pii), ("new", mask)):
+        caught = sum(masked(func, sample) for sample in PII_SAMPLES)
+        garbled = sum(masked(func, phrase) for phrase in NOT_PII)
+        print(f"{name:>8} {caught:>5} of {len(PII_SAMPLES):<4} {garbled:>8} of {len(NOT_PII)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Fixed per-rerun cost of the app's logo and stylesheet markup.
+
+Compares the old approach (read logo.png, base64-encode it into both the
+sidebar and the header, and inline the full stylesheet on every rerun) with
+the static asset pipeline, which sends only URLs (or, without static
+serving, a small inlined thumbnail and minified CSS).
+
+Run from the repository root:
+    python benchmarks/bench_rerun_payload.py
+"""
+
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from assets import LOGO_PATH, build_assets  # noqa: E402
+from styles import get_app_styles  # noqa: E402
+
+REPEATS = 50
+
+
+def logo_markup(logo_src) -> list:
+    if not logo_src:
+        return ["🎯", "🎯"]
+    return [
+        f'<img src="{logo_src}" style="width: 10rem; height: 10rem; object-fit: contain;">',
+        f'<img src="{logo_src}" style="width: 7rem; height: 7rem; object-fit: contain;">',
+    ]
+
+
+def old_rerun() -> list:
+    """The previous per-rerun work: read and encode the logo, inline the full CSS."""
+    with open(LOGO_PATH, "rb") as f:
+        logo = base64.b64encode(f.read()).decode()
+    return [get_app_styles()] + logo_markup(f"data:image/png;base64,{logo}")
+
+
+def new_rerun(assets: dict) -> list:
+    """Per-rerun work with the asset pipeline: the assets are already built."""
+    return [assets["styles"]] + logo_markup(assets["logo_src"])
+
+
+def measure(rerun) -> tuple:
+    """Return (bytes of markup, best time in microseconds) for one rerun."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        markup = rerun()
+        best = min(best, (time.perf_counter() - start) * 1e6)
+    return sum(len(part.encode()) for part in markup), best
+
+
+def main():
+    served = build_assets(get_app_styles(), static_serving=True)
+    inlined = build_assets(get_app_styles(), static_serving=False)
+
+    print(f"{'variant':<28} {'bytes/rerun':>12} {'time (us)':>10}")
+    for name, rerun in (
+        ("old (inline, base64 x2)", old_rerun),
+        ("assets, static serving", lambda: new_rerun(served)),
+        ("assets, inlined fallback", lambda: new_rerun(inlined)),
+    ):
+        size, best = measure(rerun)
+        print(f"{name:<28} {size:>12,} {best:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
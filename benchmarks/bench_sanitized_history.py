@@ -0,0 +1,71 @@
+"""
+Per-turn cost of building the sanitized history sent to the model.
+
+Compares the old approach (re-mask and copy the whole history every turn)
+with ConversationHistory, which masks each message once when it is appended.
+
+Run from the repository root:
+    python benchmarks/bench_sanitized_history.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from pipeline import mask_pii  # noqa: E402
+from history import ConversationHistory  # noqa: E402
+from prompt import instruction  # noqa: E402
+
+USER_MESSAGE = (
+    "Sure! I'm reachable at jane.doe@example.com or 5551234567. I have five years "
+    "of experience with Python, Django and PostgreSQL, mostly building REST APIs."
+)
+ASSISTANT_MESSAGE = (
+    "Thanks, that's helpful. Can you walk me through how you would design a "
+    "rate limiter for a public API?\nMETADATA: {\"name\": true, \"contact\": true}"
+)
+CHECKPOINTS = (5, 25, 50, 100, 200)
+REPEATS = 20
+
+
+def rebuild_sanitized(history: list) -> list:
+    """The previous build_sanitized_history: a full pass every turn."""
+    safe_history = []
+    for msg in history:
+        content = msg["content"]
+        if msg["role"] == "user":
+            content = mask_pii(content)
+        safe_history.append({"role": msg["role"], "content": content})
+    return safe_history
+
+
+def time_turns(make_history, sanitize) -> dict:
+    """Return the best per-turn time (in microseconds) at each checkpoint."""
+    best = {}
+    for _ in range(REPEATS):
+        history = make_history()
+        for turn in range(1, max(CHECKPOINTS) + 1):
+            start = time.perf_counter()
+            history.append({"role": "user", "content": USER_MESSAGE})
+            sanitize(history)
+            history.append({"role": "assistant", "content": ASSISTANT_MESSAGE})
+            elapsed = (time.perf_counter() - start) * 1e6
+            if turn in CHECKPOINTS:
+                best[turn] = min(best.get(turn, elapsed), elapsed)
+    return best
+
+
+def main():
+    system = {"role": "system", "content": instruction}
+    old = time_turns(lambda: [system], rebuild_sanitized)
+    new = time_turns(lambda: ConversationHistory([system]), lambda history: history.sanitized)
+
+    print(f"{'turn':>6} {'full rebuild (us)':>18} {'incremental (us)':>17}")
+    for turn in CHECKPOINTS:
+        print(f"{turn:>6} {old[turn]:>18.1f} {new[turn]:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
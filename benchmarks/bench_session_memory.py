@@ -0,0 +1,93 @@
+"""
+Memory held per interview by its transcript.
+
+Compares the old representation (a dict per message in conversation_history,
+a second dict with a cleaned copy of every reply in messages, a system
+message dict per session and hex digests) with Message records shared by
+the history and the displayed messages (history.py). Sizes are measured
+with tracemalloc over many sessions built side by side, so objects shared
+by all sessions (the system prompt) are not counted per session. The text
+of each message is unique to its session, as in production.
+
+Run from the repository root:
+    python benchmarks/bench_session_memory.py
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from pipeline import chain_digest, parse_metadata_and_clean_reply, sanitize_message  # noqa: E402
+from history import ConversationHistory, Message  # noqa: E402
+from prompt import instruction  # noqa: E402
+
+USER_MESSAGE = (
+    "Session {session}, answer {turn}: I have five years of experience with Python, Django "
+    "and PostgreSQL, mostly building REST APIs; reach me at dev{session}@example.com."
+)
+ASSISTANT_MESSAGE = (
+    "Thanks for answer {turn}, session {session}. That's a solid approach. Next question: how would you "
+    "design a rate limiter for a public API that has to handle bursts from many clients at once, and where "
+    "would you keep its state?\nMETADATA: {{\"questions\": false}}"
+)
+TURNS = (10, 50, 200)
+SESSIONS = 100
+
+
+def old_session(session: int, turns: int) -> dict:
+    """The previous layout: dicts in history, sanitized view and messages, hex digests."""
+    history = [{"role": "system", "content": instruction}]
+    sanitized = [history[0]]
+    digests = [chain_digest("", history[0])]
+    messages = []
+    for turn in range(turns):
+        user = {"role": "user", "content": USER_MESSAGE.format(session=session, turn=turn)}
+        raw_reply = ASSISTANT_MESSAGE.format(session=session, turn=turn)
+        display_text = parse_metadata_and_clean_reply(raw_reply)[0]
+        for message in (user, {"role": "assistant", "content": raw_reply}):
+            history.append(message)
+            sanitized.append(sanitize_message(message))
+            digests.append(chain_digest(digests[-1], sanitized[-1]))
+        messages.append({"role": "user", "content": user["content"]})
+        messages.append({"role": "assistant", "content": display_text})
+    return {"history": history, "sanitized": sanitized, "digests": digests, "messages": messages}
+
+
+def new_session(session: int, turns: int) -> dict:
+    history = ConversationHistory([{"role": "system", "content": instruction}])
+    messages = []
+    for turn in range(turns):
+        user = Message("user", USER_MESSAGE.format(session=session, turn=turn))
+        raw_reply = ASSISTANT_MESSAGE.format(session=session, turn=turn)
+        history.append(user)
+        messages.append(user)
+        messages.append(history.add_reply(raw_reply, parse_metadata_and_clean_reply(raw_reply)[0]))
+    return {"history": history, "messages": messages}
+
+
+def bytes_per_session(build, turns: int) -> float:
+    build(-1, 1)  # shared, process-wide state is allocated before measuring
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(session, turns) for session in range(SESSIONS)]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return size / SESSIONS
+
+
+def main():
+    print(f"{'turns':>6} {'old (bytes)':>12} {'new (bytes)':>12} {'saved':>7}")
+    for turns in TURNS:
+        old = bytes_per_session(old_session, turns)
+        new = bytes_per_session(new_session, turns)
+        print(f"{turns:>6} {old:>12,.0f} {new:>12,.0f} {1 - new / old:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Per-rerun cost of drawing the chat transcript.
+
+Compares the old loop (format every message into its own markdown block on
+every rerun) with TranscriptRenderer, which renders each message once, sends
+full pages as blocks the browser already has cached, and only shows the most
+recent pages. "Bytes sent" counts blocks that are new since the previous
+rerun in full and cached blocks as a short reference, averaged over the
+ten turns up to each checkpoint.
+
+Run from the repository root:
+    python benchmarks/bench_transcript_render.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from history import Message  # noqa: E402
+from transcript import TranscriptRenderer  # noqa: E402
+
+USER_MESSAGE = (
+    "({turn}) I'd use a token bucket per API key in Redis, with a sliding window for bursts "
+    "and a separate limit for expensive endpoints."
+)
+ASSISTANT_MESSAGE = (
+    "({turn}) Thanks, that's a solid approach. How would you handle clock skew between "
+    "the API servers that share the limiter?"
+)
+CHECKPOINTS = (10, 50, 100, 200)
+WINDOW = 10
+REPEATS = 20
+
+# Approximate size of a cached-message reference (hash plus metadata), and
+# the smallest block Streamlit caches (global.minCachedMessageSize)
+REFERENCE_BYTES = 48
+MIN_CACHED_BYTES = 1000
+
+
+def old_render(messages: list) -> list:
+    """The previous display loop."""
+    blocks = []
+    for message in messages:
+        if message["role"] == "assistant":
+            blocks.append(f'<div class="assistant-message">🤖 {message["content"]}</div>')
+        else:
+            blocks.append(f'<div class="user-message">{message["content"]} 👤</div>')
+    return blocks
+
+
+def bytes_sent(blocks: list, cached: set) -> int:
+    total = 0
+    for block in blocks:
+        size = len(block.encode())
+        total += REFERENCE_BYTES if block in cached and size >= MIN_CACHED_BYTES else size
+    return total
+
+
+def run(render, use_cache: bool) -> dict:
+    """Return {turn: (mean bytes sent, best time in microseconds)} at each checkpoint."""
+    results = {}
+    for _ in range(REPEATS):
+        messages = []
+        cached = set()
+        state = {}
+        sent_window = []
+        for turn in range(1, max(CHECKPOINTS) + 1):
+            messages.append(Message("user", USER_MESSAGE.format(turn=turn)))
+            messages.append(Message("assistant", ASSISTANT_MESSAGE.format(turn=turn)))
+            start = time.perf_counter()
+            blocks = render(messages, state)
+            elapsed = (time.perf_counter() - start) * 1e6
+            sent_window = (sent_window + [bytes_sent(blocks, cached)])[-WINDOW:]
+            if use_cache:
+                cached = set(blocks)
+            if turn in CHECKPOINTS:
+                best = results.get(turn, (0, elapsed))[1]
+                results[turn] = (sum(sent_window) / len(sent_window), min(best, elapsed))
+    return results
+
+
+def new_render(messages: list, state: dict) -> list:
+    renderer = state.setdefault("renderer", TranscriptRenderer())
+    renderer.sync(messages)
+    return renderer.blocks()
+
+
+def main():
+    old = run(lambda messages, state: old_render(messages), use_cache=False)
+    new = run(new_render, use_cache=True)
+
+    print(f"{'turn':>6} {'old bytes':>10} {'old (us)':>9} {'new bytes':>10} {'new (us)':>9}")
+    for turn in CHECKPOINTS:
+        print(f"{turn:>6} {old[turn][0]:>10,.0f} {old[turn][1]:>9.1f} {new[turn][0]:>10,.0f} {new[turn][1]:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
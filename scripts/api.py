@@ -0,0 +1,309 @@
+"""
+Headless HTTP API for TalentScout AI.
+
+Runs interviews through the same engine as the Streamlit app (engine.py),
+for other front ends (web, mobile, ATS integrations). Workers are
+stateless: every request loads the interview from the session store
+(session_store.py), runs it and writes it back, so any number of worker
+processes or hosts can sit behind a load balancer.
+
+  POST   /v1/sessions                 start an interview; the reply is the greeting
+                                      body (optional): {"model": "llama3.1", "save_transcript": false}
+  GET    /v1/sessions/{id}            messages and progress so far
+  POST   /v1/sessions/{id}/messages   {"content": "..."}; the reply is the assistant's
+  DELETE /v1/sessions/{id}            end and erase the interview ("Delete my data")
+  GET    /healthz                     backend health
+  GET    /metrics                     stage histograms in Prometheus text format
+
+Both POST routes answer with JSON ({"reply": ..., "session": ...}), or, when
+the request sends "Accept: text/event-stream", with Server-Sent Events: a
+"delta" event per piece of the reply ({"text": ...}), then "done" with the
+JSON body, or "error" ({"error": ..., "status": ...}). A client that
+disconnects mid-reply cancels the backend request and the turn is not kept.
+Two turns sent to one interview at the same time are not merged as in the
+app: the later one to finish gets 409 and can be resent.
+
+  TALENTSCOUT_API_BASE_URL   backend(s), comma-separated (default http://localhost:11434/v1)
+  TALENTSCOUT_API_MODEL      model for sessions that do not pick one (default llama3.1)
+
+    python api.py --port 8000 --workers 4    (workers need a shared store, e.g.
+                                              TALENTSCOUT_SESSION_STORE=sqlite:///data/sessions.db)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from backend_pool import BackendPool
+from client import GenerationCancelled
+from engine import InterviewSession, answer, forget, greet, pending_transcript
+from pipeline import MODEL_NAMES, get_exit_prompt, get_initial_greeting_prompt
+from metrics import render_prometheus
+from prompt import instruction
+from reply_pool import ReplyPool
+from routing import get_model_router
+from session_store import SessionConflict, get_session_store
+from transcript_store import get_transcript_store
+from turns import CLOSING, GREETING
+
+BASE_URL = os.environ.get("TALENTSCOUT_API_BASE_URL", "http://localhost:11434/v1")
+DEFAULT_MODEL = os.environ.get("TALENTSCOUT_API_MODEL", MODEL_NAMES[0])
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _error_response(error: ApiError) -> JSONResponse:
+    return JSONResponse({"error": error.message}, status_code=error.status)
+
+
+def _wants_events(request: Request) -> bool:
+    return "text/event-stream" in request.headers.get("accept", "")
+
+
+def _event(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _read_json(request: Request) -> dict:
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError:
+        raise ApiError(400, "Request body is not valid JSON.") from None
+    if not isinstance(data, dict):
+        raise ApiError(400, "Request body must be a JSON object.")
+    return data
+
+
+def _save(session: InterviewSession, version: int) -> int:
+    try:
+        return get_session_store().put(session.session_id, session.to_state(), version)
+    except SessionConflict:
+        raise ApiError(409, "The interview changed while this message was answered; send it again.") from None
+
+
+def _load(session_id: str) -> tuple:
+    found = get_session_store().get(session_id)
+    if found is None:
+        raise ApiError(404, "No such interview (it may have expired).")
+    state, version = found
+    try:
+        return InterviewSession.from_state(state), version
+    except ValueError:
+        # Saved by an older release
+        raise ApiError(404, "No such interview (it may have expired).") from None
+
+
+def _run_turn(work, on_text=None, is_cancelled=None) -> dict:
+    """Run one turn on this thread, mapping its failures to ApiError."""
+    try:
+        return work(on_text, is_cancelled)
+    except ApiError:
+        raise
+    except GenerationCancelled:
+        raise ApiError(499, "Cancelled.") from None
+    except ValueError as e:
+        raise ApiError(400, str(e)) from None
+    except Exception as e:
+        raise ApiError(502, f"The model backend failed: {e}") from None
+
+
+async def _respond(request: Request, work, status: int = 200) -> Response:
+    """
+    Answer with work(on_text, is_cancelled)'s result as JSON, or stream the
+    reply as Server-Sent Events. The turn runs on a worker thread; streamed
+    text is handed to the event loop as it grows.
+    """
+    if not _wants_events(request):
+        try:
+            return JSONResponse(await run_in_threadpool(_run_turn, work), status_code=status)
+        except ApiError as e:
+            return _error_response(e)
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    cancelled = threading.Event()
+    shown = [""]
+
+    def on_text(text: str):
+        if text.startswith(shown[0]):
+            delta = text[len(shown[0]):]
+            if delta:
+                loop.call_soon_threadsafe(events.put_nowait, _event("delta", {"text": delta}))
+        else:
+            # The parser took back text it had shown (the start of METADATA)
+            loop.call_soon_threadsafe(events.put_nowait, _event("replace", {"text": text}))
+        shown[0] = text
+
+    def run():
+        try:
+            payload = _run_turn(work, on_text, cancelled.is_set)
+            event = _event("done", payload)
+        except ApiError as e:
+            event = _event("error", {"error": e.message, "status": e.status})
+        loop.call_soon_threadsafe(events.put_nowait, event)
+        loop.call_soon_threadsafe(events.put_nowait, None)
+
+    async def stream():
+        turn = loop.run_in_executor(None, run)
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            # Also reached when the client disconnects: abort the backend request
+            cancelled.set()
+            await asyncio.shield(turn)
+
+    return StreamingResponse(stream(), status_code=status, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def create_session(request: Request) -> Response:
+    try:
+        options = await _read_json(request)
+    except ApiError as e:
+        return _error_response(e)
+    model_name = options.get("model", DEFAULT_MODEL)
+    if model_name not in MODEL_NAMES:
+        return _error_response(ApiError(400, f"Unknown model {model_name!r}; use one of {', '.join(MODEL_NAMES)}."))
+    reply_pool = request.app.state.reply_pool
+    for turn_type in (GREETING, CLOSING):
+        reply_pool.ensure(get_model_router().route(turn_type, model_name), turn_type)
+    stream = _wants_events(request)
+
+    def work(on_text, is_cancelled):
+        session = InterviewSession(model_name=model_name, save_transcript=bool(options.get("save_transcript")))
+        reply = greet(session, request.app.state.client, reply_pool, stream=stream, on_text=on_text)
+        if is_cancelled is not None and is_cancelled():
+            raise GenerationCancelled()
+        _save(session, 0)
+        return {"reply": reply, "session": session.view()}
+
+    return await _respond(request, work, status=201)
+
+
+async def get_session(request: Request) -> Response:
+    try:
+        session, _ = await run_in_threadpool(_load, request.path_params["session_id"])
+    except ApiError as e:
+        return _error_response(e)
+    return JSONResponse(session.view())
+
+
+async def post_message(request: Request) -> Response:
+    try:
+        body = await _read_json(request)
+        session, version = await run_in_threadpool(_load, request.path_params["session_id"])
+    except ApiError as e:
+        return _error_response(e)
+    content = body.get("content")
+    if not isinstance(content, str):
+        return _error_response(ApiError(400, 'Send the message as {"content": "..."}.'))
+    stream = _wants_events(request)
+
+    def work(on_text, is_cancelled):
+        reply = answer(session, request.app.state.client, content, request.app.state.reply_pool,
+                       stream=stream, on_text=on_text, is_cancelled=is_cancelled)
+        if is_cancelled is not None and is_cancelled():
+            raise GenerationCancelled()
+        # Submitted only once the ended session is stored: after a 409 the
+        # turn is resent and must not save a second transcript
+        transcript = pending_transcript(session)
+        _save(session, version)
+        if transcript is not None:
+            get_transcript_store().submit(transcript)
+        return {"reply": reply, "session": session.view()}
+
+    return await _respond(request, work)
+
+
+async def delete_session(request: Request) -> Response:
+    def work():
+        session, _ = _load(request.path_params["session_id"])
+        forget(session)
+        get_session_store().delete(session.session_id)
+
+    try:
+        await run_in_threadpool(work)
+    except ApiError as e:
+        return _error_response(e)
+    return Response(status_code=204)
+
+
+async def healthz(request: Request) -> Response:
+    endpoints = request.app.state.client.endpoints
+    healthy = sum(endpoint.healthy for endpoint in endpoints)
+    return JSONResponse({"backends": len(endpoints), "healthy": healthy}, status_code=200 if healthy else 503)
+
+
+async def metrics(request: Request) -> Response:
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    # Refuse to start with a misconfigured transcript store (no key) rather than fail at the first save
+    get_transcript_store()
+    # One backend pool and one reply pool per worker process, as in the app
+    app.state.client = BackendPool(BASE_URL)
+    prompts = {GREETING: get_initial_greeting_prompt(), CLOSING: get_exit_prompt()}
+    app.state.reply_pool = ReplyPool(app.state.client, instruction, prompts).start()
+    for turn_type in (GREETING, CLOSING):
+        app.state.reply_pool.ensure(get_model_router().route(turn_type, DEFAULT_MODEL), turn_type)
+    try:
+        yield
+    finally:
+        app.state.reply_pool.stop()
+        app.state.client.close()
+
+
+app = Starlette(
+    routes=[
+        Route("/v1/sessions", create_session, methods=["POST"]),
+        Route("/v1/sessions/{session_id}", get_session, methods=["GET"]),
+        Route("/v1/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        Route("/v1/sessions/{session_id}/messages", post_message, methods=["POST"]),
+        Route("/healthz", healthz, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the TalentScout interview API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (need a shared session store)")
+    args = parser.parse_args()
+
+    store = os.environ.get("TALENTSCOUT_SESSION_STORE", "memory")
+    if args.workers > 1 and store in ("", "memory"):
+        parser.error("--workers > 1 needs a shared session store, e.g. TALENTSCOUT_SESSION_STORE=sqlite:///data/sessions.db")
+
+    import uvicorn
+
+    # Workers import the app by name, from this directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Static asset pipeline for TalentScout AI.
+
+Streamlit reruns the whole app on every interaction, and everything the
+script emits is sent to the browser again. Instead of inlining the full logo
+(twice, base64-encoded) and the full stylesheet on each rerun, build_assets()
+writes a resized logo thumbnail and a minified stylesheet, named by content
+hash, into scripts/static/ once per process. Pages then only reference them
+by URL and the browser caches them.
+
+The files are served by Streamlit's static file serving
+(server.enableStaticServing, see .streamlit/config.toml). When it is off,
+the small thumbnail and the minified CSS are inlined instead.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(SCRIPT_DIR, "static")
+STATIC_URL = "app/static"
+LOGO_PATH = os.path.join(SCRIPT_DIR, "..", "logo.png")
+
+# Largest rendered size of the logo (10rem in the sidebar), doubled for high-DPI screens
+LOGO_THUMBNAIL_PX = 320
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def split_styles(markup: str) -> tuple:
+    """Split styles.get_app_styles() into its CSS and the remaining HTML."""
+    match = re.search(r"<style>(.*?)</style>", markup, flags=re.DOTALL)
+    if not match:
+        return "", markup.strip()
+    return match.group(1), (markup[:match.start()] + markup[match.end():]).strip()
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write_once(filename: str, data: bytes) -> str:
+    """Write a content-addressed file unless it already exists; return its path."""
+    path = os.path.join(STATIC_DIR, filename)
+    if not os.path.exists(path):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+
+def build_logo_thumbnail(size: int = LOGO_THUMBNAIL_PX) -> str | None:
+    """
+    Write a resized copy of logo.png and return its filename. Falls back to a
+    copy of the original when Pillow is not installed.
+    """
+    try:
+        with open(LOGO_PATH, "rb") as f:
+            original = f.read()
+    except FileNotFoundError:
+        return None
+
+    filename = f"logo-{_content_hash(original)}-{size}.png"
+    if os.path.exists(os.path.join(STATIC_DIR, filename)):
+        return filename
+
+    try:
+        from io import BytesIO
+        from PIL import Image
+    except ImportError:
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        shutil.copyfile(LOGO_PATH, os.path.join(STATIC_DIR, filename))
+        return filename
+
+    with Image.open(BytesIO(original)) as image:
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+    _write_once(filename, buffer.getvalue())
+    return filename
+
+
+def build_stylesheet(css: str) -> str:
+    """Write the minified stylesheet and return its filename."""
+    data = minify_css(css).encode()
+    filename = f"styles-{_content_hash(data)}.css"
+    _write_once(filename, data)
+    return filename
+
+
+def build_assets(styles_markup: str, static_serving: bool = True) -> dict:
+    """
+    Build the static assets and return the markup that references them:
+    {"styles": <style/HTML markup>, "logo_src": <img src or None>}.
+    """
+    css, extra_html = split_styles(styles_markup)
+    logo = build_logo_thumbnail()
+
+    if static_serving:
+        stylesheet = build_stylesheet(css)
+        styles = f'<style>@import url("{STATIC_URL}/{stylesheet}");</style>{extra_html}'
+        logo_src = f"{STATIC_URL}/{logo}" if logo else None
+    else:
+        import base64
+        styles = f"<style>{minify_css(css)}</style>{extra_html}"
+        logo_src = None
+        if logo:
+            with open(os.path.join(STATIC_DIR, logo), "rb") as f:
+                logo_src = "data:image/png;base64," + base64.b64encode(f.read()).decode()
+
+    return {"styles": styles, "logo_src": logo_src}
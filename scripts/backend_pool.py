@@ -0,0 +1,299 @@
+"""
+Multi-backend routing for TalentScout AI.
+
+The API Base URL may list several OpenAI-compatible endpoints, separated by
+commas, each optionally followed by per-model weights:
+
+    http://gpu1:11434/v1 llama3.1=3 mistral=1, http://gpu2:11434/v1 llama3.1=1 mistral=0
+
+A weight of 0 means the endpoint does not serve that model; models that are
+not listed get the `*` weight (1 unless given). Every completion goes to the
+healthy endpoint serving the model with the fewest outstanding requests
+relative to its weight.
+
+A background task probes each endpoint's /models route. An endpoint is
+ejected after EJECT_AFTER consecutive failures (probes or connection errors
+and 5xx replies on real requests) and re-admitted after READMIT_AFTER
+successful probes. If every endpoint serving a model is ejected, requests
+still go to the least loaded one rather than failing outright.
+
+Requests are hedged: if the first token (the whole reply, without
+streaming) has not arrived by the HEDGE_PERCENTILE of recent first-response
+times for that model, a duplicate goes to another healthy endpoint and the
+first to answer wins. The loser is cancelled at once, which closes its
+connection so the backend stops generating.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from client import BackendClient, get_event_loop, get_request_semaphore, run_coroutine
+
+HEALTH_INTERVAL = float(os.environ.get("TALENTSCOUT_HEALTH_INTERVAL", 10))
+HEALTH_TIMEOUT = float(os.environ.get("TALENTSCOUT_HEALTH_TIMEOUT", 3))
+EJECT_AFTER = int(os.environ.get("TALENTSCOUT_EJECT_AFTER", 2))
+READMIT_AFTER = int(os.environ.get("TALENTSCOUT_READMIT_AFTER", 1))
+
+# Hedge once the first response is later than this percentile of recent ones (0 disables hedging)
+HEDGE_PERCENTILE = float(os.environ.get("TALENTSCOUT_HEDGE_PERCENTILE", 95))
+HEDGE_MIN_DELAY = float(os.environ.get("TALENTSCOUT_HEDGE_MIN_DELAY", 0.5))
+# Used until HEDGE_MIN_SAMPLES first-response times are known for a model
+HEDGE_INITIAL_DELAY = float(os.environ.get("TALENTSCOUT_HEDGE_INITIAL_DELAY", 5))
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+
+
+def parse_endpoints(spec: str) -> list:
+    """Parse an endpoint list into [(base_url, {model: weight})]; "*" is the default weight."""
+    endpoints = []
+    for part in spec.split(","):
+        fields = part.split()
+        if not fields:
+            continue
+        weights = {}
+        for field in fields[1:]:
+            model, _, weight = field.partition("=")
+            weights[model] = float(weight or 1)
+        endpoints.append((fields[0].rstrip("/"), weights))
+    if not endpoints:
+        raise ValueError("no backend endpoint given")
+    return endpoints
+
+
+def is_backend_failure(error: Exception) -> bool:
+    """True for errors that say the endpoint is unhealthy (not that the request was bad)."""
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+class Endpoint:
+    """One backend in the pool, with its client, weights and load counters."""
+
+    def __init__(self, base_url: str, weights: dict, client: BackendClient):
+        self.base_url = base_url
+        self.weights = weights
+        self.client = client
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.ejected_at = None
+        self.last_error = None
+
+    def weight(self, model: str) -> float:
+        return self.weights.get(model, self.weights.get("*", 1.0))
+
+    def serves(self, model: str) -> bool:
+        return self.weight(model) > 0
+
+    def load(self, model: str) -> float:
+        return (self.outstanding + 1) / self.weight(model)
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.consecutive_successes += 1
+        if not self.healthy and self.consecutive_successes >= READMIT_AFTER:
+            self.healthy = True
+            self.ejected_at = None
+
+    def record_failure(self, error: Exception):
+        self.failures += 1
+        self.consecutive_successes = 0
+        self.consecutive_failures += 1
+        self.last_error = str(error) or type(error).__name__
+        if self.healthy and self.consecutive_failures >= EJECT_AFTER:
+            self.healthy = False
+            self.ejected_at = time.time()
+
+
+class BackendPool:
+    """
+    Drop-in for BackendClient over several endpoints (see parse_endpoints).
+    Use `acreate`/`astream` from async code or `chat.completions.create`
+    from the Streamlit script thread, exactly as with a single client.
+    """
+
+    def __init__(self, spec: str, api_key: str = "LAMBA", health_interval: float = HEALTH_INTERVAL):
+        self.base_url = spec
+        self.endpoints = [Endpoint(url, weights, BackendClient(url, api_key=api_key))
+                          for url, weights in parse_endpoints(spec)]
+        self.health_interval = health_interval
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._first_response = {}
+        self._health_task = None
+        if health_interval > 0:
+            self._health_task = asyncio.run_coroutine_threadsafe(self._health_loop(), get_event_loop())
+
+    def pick(self, model: str, exclude=(), healthy_only: bool = False) -> Endpoint | None:
+        """The endpoint for the next request: least outstanding per unit of weight."""
+        serving = [e for e in self.endpoints if e.serves(model) and e not in exclude]
+        candidates = [e for e in serving if e.healthy] or ([] if healthy_only else serving)
+        if not candidates:
+            return None
+        lowest = min(e.load(model) for e in candidates)
+        return random.choice([e for e in candidates if e.load(model) == lowest])
+
+    def hedge_delay(self, model: str, kind: str) -> float | None:
+        """Seconds to wait for a first response before hedging, or None when disabled."""
+        if HEDGE_PERCENTILE <= 0:
+            return None
+        samples = self._first_response.get((model, kind))
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_INITIAL_DELAY
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(HEDGE_PERCENTILE / 100 * len(ordered)))
+        return max(HEDGE_MIN_DELAY, ordered[index])
+
+    async def acreate(self, **kwargs):
+        """Non-streaming completion, hedged and retried once on another endpoint."""
+        _, completion = await self._race(kwargs.get("model"), "complete", self._complete, kwargs)
+        return completion
+
+    async def astream(self, **kwargs):
+        """Streaming completion; hedging and retries only happen before the first chunk."""
+        endpoint, (chunks, first) = await self._race(kwargs.get("model"), "stream", self._open_stream, kwargs)
+        try:
+            if first is not None:
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+        except Exception as e:
+            if is_backend_failure(e):
+                endpoint.record_failure(e)
+            raise
+        finally:
+            endpoint.outstanding -= 1
+            await chunks.aclose()
+
+    def create(self, is_cancelled=None, **kwargs):
+        """Synchronous drop-in for chat.completions.create, run on the shared loop."""
+        if kwargs.pop("stream", False):
+            return BackendClient._iterate(self.astream(**kwargs), is_cancelled)
+        return run_coroutine(self.acreate(**kwargs), is_cancelled=is_cancelled)
+
+    async def _complete(self, endpoint: Endpoint, kwargs: dict):
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        try:
+            return await endpoint.client.acreate(**kwargs)
+        finally:
+            endpoint.outstanding -= 1
+
+    async def _open_stream(self, endpoint: Endpoint, kwargs: dict):
+        # Returns the stream and its first chunk; the winner's outstanding
+        # count is released by astream() when the stream ends.
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        chunks = endpoint.client.astream(**kwargs)
+        try:
+            return chunks, await chunks.__anext__()
+        except StopAsyncIteration:
+            return chunks, None
+        except BaseException:
+            endpoint.outstanding -= 1
+            raise
+
+    async def _race(self, model: str, kind: str, attempt, kwargs: dict):
+        """
+        Run `attempt(endpoint, kwargs)` on the best endpoint; add a hedge when
+        it is slower than hedge_delay() and a retry when it fails. Returns
+        (endpoint, result) of the first attempt to succeed; the others are
+        cancelled.
+        """
+        first = self.pick(model)
+        if first is None:
+            raise ValueError(f"no backend endpoint serves model {model!r}")
+        started = time.monotonic()
+        tried = [first]
+        pending = {asyncio.ensure_future(attempt(first, kwargs)): first}
+        delay = self.hedge_delay(model, kind)
+        hedged = retried = False
+        error = None
+        try:
+            while pending:
+                timeout = None if hedged or delay is None else max(0.0, started + delay - time.monotonic())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    # No point duplicating a request that is only waiting for a local slot
+                    backup = None if get_request_semaphore().locked() else self.pick(model, tried, healthy_only=True)
+                    if backup is not None:
+                        tried.append(backup)
+                        pending[asyncio.ensure_future(attempt(backup, kwargs))] = backup
+                        self.hedges += 1
+                    continue
+
+                for task in done:
+                    endpoint = pending.pop(task)
+                    if task.exception() is None:
+                        endpoint.record_success()
+                        self._record_first_response(model, kind, time.monotonic() - started)
+                        if len(tried) > 1 and endpoint is not first:
+                            self.hedge_wins += 1
+                        return endpoint, task.result()
+                    error = task.exception()
+                    if not is_backend_failure(error):
+                        raise error
+                    endpoint.record_failure(error)
+
+                if not pending and not retried:
+                    retried = True
+                    backup = self.pick(model, tried, healthy_only=True)
+                    if backup is not None:
+                        tried.append(backup)
+                        pending[asyncio.ensure_future(attempt(backup, kwargs))] = backup
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                # Let the losers close their connections before returning
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in pending:
+                if not task.cancelled() and task.exception() is None and kind == "stream":
+                    pending[task].outstanding -= 1
+                    await task.result()[0].aclose()
+
+    def _record_first_response(self, model: str, kind: str, seconds: float):
+        self._first_response.setdefault((model, kind), deque(maxlen=HEDGE_WINDOW)).append(seconds)
+
+    def stats(self) -> list:
+        """Per-endpoint health and load counters."""
+        return [{
+            "base_url": e.base_url,
+            "healthy": e.healthy,
+            "outstanding": e.outstanding,
+            "requests": e.requests,
+            "failures": e.failures,
+            "last_error": e.last_error,
+        } for e in self.endpoints]
+
+    def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+
+    async def check(self, endpoint: Endpoint):
+        """Probe one endpoint and update its health."""
+        try:
+            await asyncio.wait_for(endpoint.client.aping(), HEALTH_TIMEOUT)
+        except Exception as e:
+            endpoint.record_failure(e)
+        else:
+            endpoint.record_success()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*(self.check(endpoint) for endpoint in self.endpoints))
+            await asyncio.sleep(self.health_interval)
@@ -0,0 +1,182 @@
+"""
+Token accounting and output budgets for TalentScout AI.
+
+Every model call is capped by the output budget of its turn type: a short
+acknowledgement while collecting contact details needs far fewer tokens than
+evaluating an answer and writing the next technical question. Budgets leave
+room for the METADATA trailer.
+
+Each interview keeps a TokenUsage with its prompt and completion tokens, as
+reported by the backend (`usage`, requested with stream_options when
+streaming) or estimated when the backend does not report them. Sessions also
+add to a process-wide TokenLedger for capacity planning. With a session
+ceiling, a turn's output budget shrinks to what is left of it, and once fewer
+than MIN_OUTPUT_TOKENS remain the interview is wrapped up without a model call.
+
+  TALENTSCOUT_OUTPUT_BUDGETS   max_tokens per turn type, e.g. "collecting=120,questioning=800"
+  TALENTSCOUT_SESSION_TOKENS   ceiling on prompt + completion tokens per interview (default 0, none)
+  TALENTSCOUT_STREAM_USAGE     ask streaming backends to report usage (default 1)
+"""
+
+import os
+import threading
+
+from routing import parse_assignments
+from turns import CLARIFICATION, CLOSING, COLLECTING, GREETING, QUESTIONING, STACK_ACK
+
+OUTPUT_BUDGETS = {
+    GREETING: 300,
+    CLOSING: 200,
+    COLLECTING: 200,
+    CLARIFICATION: 250,
+    STACK_ACK: 600,
+    QUESTIONING: 600,
+}
+OUTPUT_BUDGETS.update({turn_type: int(tokens) for turn_type, tokens in
+                       parse_assignments(os.environ.get("TALENTSCOUT_OUTPUT_BUDGETS", "")).items()})
+# For turns whose type is not known
+DEFAULT_OUTPUT_BUDGET = max(OUTPUT_BUDGETS.values())
+SESSION_TOKEN_CEILING = int(os.environ.get("TALENTSCOUT_SESSION_TOKENS", 0))
+STREAM_USAGE = os.environ.get("TALENTSCOUT_STREAM_USAGE", "1") != "0"
+# Below this, a reply would be cut off mid-sentence; the session is over instead
+MIN_OUTPUT_TOKENS = 64
+
+# Shown instead of a reply once a session has used its ceiling
+BUDGET_EXHAUSTED_REPLY = ("We have reached the time available for this interview. Thank you for your answers! "
+                          "TalentScout will review them and get in touch about next steps.")
+
+
+def output_budget(turn_type: str | None) -> int:
+    """max_tokens for a turn of this type."""
+    return OUTPUT_BUDGETS.get(turn_type, DEFAULT_OUTPUT_BUDGET)
+
+
+class TokenLedger:
+    """Process-wide token counters per turn type, plus session totals."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def record(self, turn_type: str | None, prompt_tokens: int, completion_tokens: int, truncated: bool = False):
+        with self._lock:
+            counters = self._counters.setdefault(turn_type or "unknown", {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "truncated": 0,
+            })
+            counters["calls"] += 1
+            counters["prompt_tokens"] += prompt_tokens
+            counters["completion_tokens"] += completion_tokens
+            counters["truncated"] += truncated
+
+    def session_started(self):
+        with self._lock:
+            self.sessions += 1
+
+    def session_exhausted(self):
+        with self._lock:
+            self.exhausted_sessions += 1
+
+    def stats(self) -> dict:
+        """Counters per turn type, totals and the mean tokens per session."""
+        with self._lock:
+            by_type = {turn_type: dict(counters) for turn_type, counters in sorted(self._counters.items())}
+            sessions, exhausted = self.sessions, self.exhausted_sessions
+        prompt_tokens = sum(counters["prompt_tokens"] for counters in by_type.values())
+        completion_tokens = sum(counters["completion_tokens"] for counters in by_type.values())
+        return {
+            "by_type": by_type,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "sessions": sessions,
+            "exhausted_sessions": exhausted,
+            "tokens_per_session": (prompt_tokens + completion_tokens) / sessions if sessions else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._counters = {}
+            self.sessions = 0
+            self.exhausted_sessions = 0
+
+
+_shared_ledger = TokenLedger()
+
+
+def get_token_ledger() -> TokenLedger:
+    return _shared_ledger
+
+
+class TokenUsage:
+    """
+    Token counters for one interview, with its optional ceiling. Turns call
+    max_tokens() before a model call and record() after it.
+    """
+
+    def __init__(self, ceiling: int = SESSION_TOKEN_CEILING, ledger: TokenLedger | None = None):
+        self.ceiling = ceiling
+        self.ledger = ledger or get_token_ledger()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+        self.truncated = 0
+        self.exhausted = False
+        self.ledger.session_started()
+
+    @property
+    def total(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def remaining(self) -> int | None:
+        """Tokens left under the ceiling, or None without one."""
+        if self.ceiling <= 0:
+            return None
+        return max(0, self.ceiling - self.total)
+
+    def max_tokens(self, turn_type: str | None, prompt_tokens: int) -> int:
+        """
+        max_tokens for the next call: the turn type's budget, cut to what the
+        ceiling leaves after the prompt. Returns 0 (and marks the session
+        exhausted) when too little is left for a useful reply.
+        """
+        budget = output_budget(turn_type)
+        remaining = self.remaining()
+        if remaining is None:
+            return budget
+        left = remaining - prompt_tokens
+        if left < min(budget, MIN_OUTPUT_TOKENS):
+            if not self.exhausted:
+                self.exhausted = True
+                self.ledger.session_exhausted()
+            return 0
+        return min(budget, left)
+
+    def record(self, turn_type: str | None, prompt_tokens: int, completion_tokens: int, truncated: bool = False):
+        """Count one model call of this session."""
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.truncated += truncated
+        self.ledger.record(turn_type, prompt_tokens, completion_tokens, truncated)
+
+    @classmethod
+    def from_state(cls, state: dict, ledger: TokenLedger | None = None) -> "TokenUsage":
+        """Resume counters saved from stats() (not counted as a new session)."""
+        usage = cls.__new__(cls)
+        usage.ledger = ledger or get_token_ledger()
+        usage.ceiling = state["ceiling"]
+        usage.prompt_tokens = state["prompt_tokens"]
+        usage.completion_tokens = state["completion_tokens"]
+        usage.calls = state["calls"]
+        usage.truncated = state["truncated"]
+        usage.exhausted = state["exhausted"]
+        return usage
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "truncated": self.truncated,
+            "ceiling": self.ceiling,
+            "exhausted": self.exhausted,
+        }
@@ -0,0 +1,231 @@
+"""
+Process-wide response cache for TalentScout AI.
+
+Replies are shared by every session in the process, so identical contexts
+(above all the greeting turn) reach the model once per fleet instead of once
+per candidate. Concurrent misses on one key are coalesced: the first caller
+generates the reply and the others wait for it (join and settle). Setting
+TALENTSCOUT_CACHE_PATH adds a SQLite tier that is shared between worker
+processes and survives restarts.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class ResponseCache:
+    """
+    LRU response cache with TTL expiry, bounded by entry count and total bytes.
+    When `path` is given, entries are also written to a SQLite file.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: float = 3600.0, path: str | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path = path
+
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._in_flight = {}           # key -> Future of the reply being generated
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = self._open_db(path) if path else None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> str | None:
+        """Return the cached reply for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+
+            if self._db is not None:
+                value = self._db_get(key, now)
+                if value is not None:
+                    self._store(key, value, now + self.ttl)
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Store a reply, evicting least recently used entries to stay in bounds."""
+        now = time.time()
+        with self._lock:
+            self._store(key, value, now + self.ttl)
+            if self._db is not None:
+                self._db_set(key, value, now)
+
+    def join(self, key: str) -> Future | None:
+        """
+        After a miss: None makes the caller the one generating the reply for
+        key, and it must call settle() when done. Concurrent callers get a
+        Future of that reply instead (None if it could not be cached).
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                entry = self._entries.get(key)
+                if entry is None or entry[1] <= time.time():
+                    self._in_flight[key] = Future()
+                    return None
+                # Stored since the caller's miss
+                future = Future()
+                future.set_result(entry[0])
+            self.coalesced += 1
+            return future
+
+    def settle(self, key: str, value: str | None):
+        """Hand the reply generated after join() (None on failure) to the callers waiting for it."""
+        with self._lock:
+            future = self._in_flight.pop(key, None)
+        if future is not None:
+            future.set_result(value)
+
+    def discard(self, key: str):
+        """Remove a single entry from every tier."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM responses")
+            self.hits = self.misses = self.evictions = self.expirations = self.coalesced = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # Memory tier (callers hold the lock)
+
+    def _store(self, key: str, value: str, expires_at: float):
+        size = len(key) + len(value.encode())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    # SQLite tier (callers hold the lock)
+
+    @staticmethod
+    def _open_db(path: str):
+        db = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        db.commit()
+        return db
+
+    def _db_get(self, key: str, now: float) -> str | None:
+        row = self._db.execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        with self._db:
+            if expires_at <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expirations += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return value
+
+    def _db_set(self, key: str, value: str, now: float):
+        size = len(key) + len(value.encode())
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + self.ttl, now),
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+
+            count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            while count > self.max_entries or total > self.max_bytes:
+                row = self._db.execute(
+                    "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+                count -= 1
+                total -= row[1]
+                self.evictions += 1
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return the process-wide cache, configured from the environment:
+    TALENTSCOUT_CACHE_MAX_ENTRIES, TALENTSCOUT_CACHE_MAX_BYTES,
+    TALENTSCOUT_CACHE_TTL (seconds) and TALENTSCOUT_CACHE_PATH (SQLite file).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = ResponseCache(
+                    max_entries=int(os.environ.get("TALENTSCOUT_CACHE_MAX_ENTRIES", 1000)),
+                    max_bytes=int(os.environ.get("TALENTSCOUT_CACHE_MAX_BYTES", 8 * 1024 * 1024)),
+                    ttl=float(os.environ.get("TALENTSCOUT_CACHE_TTL", 3600)),
+                    path=os.environ.get("TALENTSCOUT_CACHE_PATH") or None,
+                )
+    return _shared_cache
@@ -0,0 +1,156 @@
+"""
+Pooled asynchronous backend client for TalentScout AI.
+
+Every session in the process shares one background event loop, one
+AsyncOpenAI client per base URL (a small pool of keep-alive connections) and
+one semaphore that caps concurrent generations. BackendClient also exposes a
+synchronous `chat.completions.create` so existing callers keep working.
+
+Synchronous calls accept `is_cancelled`, a callable polled while waiting.
+Once it returns True the request is cancelled on the loop, which closes its
+HTTP connection so the backend stops generating, and GenerationCancelled is
+raised in the caller.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+
+MAX_CONNECTIONS = int(os.environ.get("TALENTSCOUT_MAX_CONNECTIONS", 16))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("TALENTSCOUT_MAX_KEEPALIVE", 8))
+KEEPALIVE_EXPIRY = float(os.environ.get("TALENTSCOUT_KEEPALIVE_EXPIRY", 60))
+CONNECT_TIMEOUT = float(os.environ.get("TALENTSCOUT_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("TALENTSCOUT_READ_TIMEOUT", 120))
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("TALENTSCOUT_MAX_CONCURRENT_REQUESTS", 8))
+
+# How often a blocked caller checks is_cancelled()
+CANCEL_POLL_INTERVAL = 0.05
+
+_loop = None
+_loop_lock = threading.Lock()
+_request_semaphore = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, starting its thread on first use."""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="talentscout-backend", daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+class GenerationCancelled(Exception):
+    """Raised by synchronous calls whose is_cancelled() turned True."""
+
+
+def run_coroutine(coro, timeout: float | None = None, is_cancelled=None):
+    """
+    Run a coroutine on the shared loop and block until it finishes. With
+    `is_cancelled`, the coroutine is cancelled as soon as it returns True.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    if is_cancelled is None:
+        return future.result(timeout)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        try:
+            return future.result(CANCEL_POLL_INTERVAL)
+        except concurrent.futures.TimeoutError:
+            if is_cancelled():
+                future.cancel()
+                raise GenerationCancelled() from None
+            if deadline is not None and time.monotonic() >= deadline:
+                raise
+
+
+async def _aclose(chunks):
+    # A cancelled __anext__ may still be unwinding inside the generator
+    while getattr(chunks, "ag_running", False):
+        await asyncio.sleep(0)
+    await chunks.aclose()
+
+
+def get_request_semaphore() -> asyncio.Semaphore:
+    """Semaphore capping concurrent backend requests across all sessions."""
+    global _request_semaphore
+    if _request_semaphore is None:
+        _request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return _request_semaphore
+
+
+class BackendClient:
+    """
+    Shared client for one OpenAI-compatible endpoint.
+    Use `acreate`/`astream` from async code, or `chat.completions.create`
+    (with or without stream=True) from the Streamlit script thread.
+    """
+
+    def __init__(self, base_url: str, api_key: str = "LAMBA"):
+        # openai takes most of a second to import; only pay for it once a client is needed
+        from openai import AsyncOpenAI
+
+        self.base_url = base_url
+        timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+        self._client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            timeout=timeout,
+            max_retries=1,
+            http_client=httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            ),
+        )
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def acreate(self, **kwargs):
+        """Non-streaming chat completion, limited by the shared semaphore."""
+        async with get_request_semaphore():
+            return await self._client.chat.completions.create(**kwargs)
+
+    async def astream(self, **kwargs):
+        """Streaming chat completion; yields chunks and closes the stream when done."""
+        async with get_request_semaphore():
+            stream = await self._client.chat.completions.create(stream=True, **kwargs)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.close()
+
+    async def aping(self):
+        """List the endpoint's models; raises if the endpoint is unreachable."""
+        return await self._client.models.list()
+
+    def create(self, is_cancelled=None, **kwargs):
+        """Synchronous drop-in for chat.completions.create, run on the shared loop."""
+        if kwargs.pop("stream", False):
+            return self._iterate(self.astream(**kwargs), is_cancelled)
+        return run_coroutine(self.acreate(**kwargs), is_cancelled=is_cancelled)
+
+    @staticmethod
+    def _iterate(chunks, is_cancelled=None):
+        # Closing the generator early (e.g. the rerun was interrupted) closes
+        # the HTTP stream, so the backend stops generating.
+        try:
+            while True:
+                try:
+                    yield run_coroutine(chunks.__anext__(), is_cancelled=is_cancelled)
+                except StopAsyncIteration:
+                    return
+        finally:
+            run_coroutine(_aclose(chunks))
@@ -0,0 +1,166 @@
+"""
+Token-budgeted context window for TalentScout AI.
+
+The system prompt and the most recent messages are sent verbatim. Older
+messages are folded, oldest first, into a rolling summary that is sent with a
+candidate-profile block, so the prompt (and prefill time) stays bounded no
+matter how long the interview runs.
+"""
+
+import os
+import re
+from collections import deque
+
+# Prompt token budget per model. Ollama's default context is small, so the
+# budget also keeps prompts from being silently truncated by the backend.
+MODEL_CONTEXT_BUDGETS = {
+    "llama3.1": 3000,
+    "llama3": 3000,
+    "mistral": 3000,
+    "codellama": 3000,
+}
+DEFAULT_CONTEXT_BUDGET = 3000
+
+# Messages always sent verbatim, however tight the budget
+KEEP_RECENT_MESSAGES = 6
+
+# Longest summary line kept per folded message
+SUMMARY_LINE_CHARS = 160
+
+PROFILE_LABELS = {
+    "name": "Full name",
+    "contact": "Email and phone",
+    "location": "Location",
+    "experience": "Years of experience",
+    "position": "Desired position",
+    "tech_stack": "Tech stack",
+    "questions": "Technical questions answered",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token, plus message overhead)."""
+    return len(text) // 4 + 4
+
+
+def get_context_budget(model_name: str) -> int:
+    """
+    Return the prompt token budget for a model. TALENTSCOUT_CONTEXT_BUDGETS
+    overrides the defaults, e.g. "llama3.1=6000,mistral=4000".
+    """
+    budgets = dict(MODEL_CONTEXT_BUDGETS)
+    for item in os.environ.get("TALENTSCOUT_CONTEXT_BUDGETS", "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            budgets[name.strip()] = int(value)
+    return budgets.get(model_name, DEFAULT_CONTEXT_BUDGET)
+
+
+def summarize_message(message: dict) -> str:
+    """One compact summary line for a folded message."""
+    text = message["content"].split("METADATA:", 1)[0]
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    speaker = "Candidate" if message["role"] == "user" else "TalentScout"
+    return f"- {speaker}: {text}"
+
+
+class ContextWindow:
+    """
+    Builds the messages sent to the model for one conversation.
+
+    Reads the sanitized view of a ConversationHistory. Folding only moves
+    forward, so each message is summarized at most once and every turn costs
+    work proportional to the recent messages, not the whole interview.
+    """
+
+    def __init__(self, history, budget: int, keep_recent: int = KEEP_RECENT_MESSAGES,
+                 control_prompts=()):
+        self.history = history
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.control_prompts = set(control_prompts)
+
+        # Technical questions sampled from the question bank for this candidate
+        self.planned_questions = None
+        self.plan_block = ""
+
+        # Index of the first message still sent verbatim (0 is the system prompt)
+        self.folded = 1
+        self.summary_lines = deque()
+        self.summary_tokens = 0
+        self.dropped_lines = 0
+
+        # The system messages the last build() added that the history does
+        # not hold (summary and profile, question plan)
+        self.injected = []
+
+    def build(self, collected_info: dict, facts: dict | None = None) -> list:
+        """
+        Return the system prompt, summary/profile block and recent messages.
+        `facts` are values from the local profile extractor, if available.
+        """
+        messages = self.history.sanitized
+        if not messages:
+            return []
+
+        system = messages[0]
+        profile = self._profile_block(collected_info, facts or {})
+        fixed_tokens = estimate_tokens(system["content"]) + estimate_tokens(profile)
+        tail_tokens = sum(estimate_tokens(m["content"]) for m in messages[self.folded:])
+
+        while (len(messages) - self.folded > self.keep_recent
+               and fixed_tokens + self.summary_tokens + tail_tokens > self.budget):
+            message = messages[self.folded]
+            tail_tokens -= estimate_tokens(message["content"])
+            self._fold(message)
+            self.folded += 1
+
+        # The history holds Message records; the request gets plain dicts
+        self.injected = []
+        if self.folded == 1:
+            context = [{"role": m["role"], "content": m["content"]} for m in messages]
+        else:
+            self.injected.append({"role": "system", "content": self._summary_block(profile)})
+            context = [{"role": "system", "content": system["content"]}, self.injected[-1]]
+            context += [{"role": m["role"], "content": m["content"]} for m in messages[self.folded:]]
+
+        # The plan goes right before the latest message, so the prefix before it stays cacheable
+        if self.plan_block:
+            self.injected.append({"role": "system", "content": self.plan_block})
+            context.insert(len(context) - 1, self.injected[-1])
+        return context
+
+    def _fold(self, message: dict):
+        if message["role"] == "user" and message["content"] in self.control_prompts:
+            return
+        line = summarize_message(message)
+        self.summary_lines.append(line)
+        self.summary_tokens += estimate_tokens(line)
+
+        # The summary itself is capped at a quarter of the budget
+        while self.summary_tokens > self.budget // 4 and len(self.summary_lines) > 1:
+            self.summary_tokens -= estimate_tokens(self.summary_lines.popleft())
+            self.dropped_lines += 1
+
+    def _summary_block(self, profile: str) -> str:
+        lines = ["EARLIER IN THIS INTERVIEW (summary, oldest first):"]
+        if self.dropped_lines:
+            lines.append(f"- ({self.dropped_lines} earlier messages omitted)")
+        lines.extend(self.summary_lines)
+        return "\n".join(lines) + "\n\n" + profile
+
+    @staticmethod
+    def _profile_block(collected_info: dict, facts: dict) -> str:
+        details = {
+            "experience": f"{facts['years']:g} years" if "years" in facts else None,
+            "tech_stack": ", ".join(facts.get("tech_stack", [])) or None,
+        }
+        lines = ["CANDIDATE PROFILE (internal):"]
+        for key, label in PROFILE_LABELS.items():
+            status = "collected" if collected_info.get(key) else "still needed"
+            if details.get(key):
+                status = f"{status} ({details[key]})"
+            lines.append(f"- {label}: {status}")
+        return "\n".join(lines)
@@ -0,0 +1,276 @@
+"""
+Interview engine for TalentScout AI, independent of any UI.
+
+An InterviewSession holds everything one interview needs: the conversation
+history (with its sanitized view and cache-key digests), collected_info,
+the profile extractor, the context window, token counters and the messages
+shown to the candidate. greet(), answer() and close() run the greeting, a
+candidate turn and the exit flow through the same pipeline as the Streamlit
+app (caches, model routing, METADATA parsing, budgets), so the app, the HTTP
+API (api.py) and scripts all drive interviews the same way.
+
+Sessions round-trip through plain JSON-compatible dicts (to_state and
+from_state), so a session store can hand them to any worker process. The
+derived state (sanitized view, digests, summaries) is rebuilt on load.
+"""
+
+import uuid
+
+from budgets import TokenUsage
+from context import ContextWindow, get_context_budget
+from extractor import FIELDS, ProfileExtractor
+from pipeline import (
+    MODEL_NAMES,
+    complete_turn,
+    get_exit_prompt,
+    get_initial_greeting_prompt,
+    is_exit_intent,
+    pooled_turn,
+    transcript_record,
+    update_collected_info,
+    validate_input,
+)
+from history import ConversationHistory, Message
+from prompt import instruction
+from reply_pool import FALLBACK_CLOSING
+from transcript_store import get_transcript_store
+from turns import CLOSING, GREETING
+
+STATE_VERSION = 2
+
+
+class InterviewSession:
+    """
+    One interview. Components left as None are created fresh; the Streamlit
+    app passes its own session_state objects so both views stay the same
+    objects. `messages` holds the displayed Message records, which are the
+    history's own records wherever the history has the message.
+    """
+
+    def __init__(self, session_id: str | None = None, model_name: str = MODEL_NAMES[0],
+                 history: ConversationHistory | None = None, collected_info: dict | None = None,
+                 messages: list | None = None, cache_keys: set | None = None,
+                 extractor: ProfileExtractor | None = None, usage: TokenUsage | None = None,
+                 window: ContextWindow | None = None, save_transcript: bool = False):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.model_name = model_name
+        self.history = history if history is not None else ConversationHistory([{"role": "system", "content": instruction}])
+        self.collected_info = collected_info if collected_info is not None else dict.fromkeys(FIELDS, False)
+        self.messages = messages if messages is not None else []
+        self.cache_keys = cache_keys if cache_keys is not None else set()
+        self.extractor = extractor or ProfileExtractor(self.history)
+        self.usage = usage or TokenUsage()
+        self.window = window or ContextWindow(
+            self.history,
+            get_context_budget(model_name),
+            control_prompts=(get_initial_greeting_prompt(), get_exit_prompt()),
+        )
+        self.initialized = False
+        self.ended = False
+        self.save_transcript = save_transcript
+        self.saved = False
+
+    def to_state(self) -> dict:
+        """Everything needed to resume the session, as JSON-compatible data."""
+        # The system prompt is the same for every session. Displayed messages
+        # that are history records are saved as their index in it.
+        history = []
+        positions = {}
+        for position, message in enumerate(self.history[1:], 1):
+            history.append(message.as_dict() if message.display_len is None
+                           else {**message.as_dict(), "display_len": message.display_len})
+            positions[id(message)] = position
+        messages = [positions.get(id(message), message.display_dict()) for message in self.messages]
+        return {
+            "version": STATE_VERSION,
+            "session_id": self.session_id,
+            "model_name": self.model_name,
+            "history": history,
+            "collected_info": dict(self.collected_info),
+            "messages": messages,
+            "cache_keys": sorted(self.cache_keys),
+            "extractor": self.extractor.to_state(),
+            "usage": self.usage.stats(),
+            "planned_questions": self.window.planned_questions,
+            "plan_block": self.window.plan_block,
+            "initialized": self.initialized,
+            "ended": self.ended,
+            "save_transcript": self.save_transcript,
+            "saved": self.saved,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "InterviewSession":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"unsupported session state version {state.get('version')!r}")
+        history = ConversationHistory([{"role": "system", "content": instruction}])
+        history.extend(Message(m["role"], m["content"], m.get("display_len")) for m in state["history"])
+        messages = [history[m] if isinstance(m, int) else Message(m["role"], m["content"]) for m in state["messages"]]
+        session = cls(
+            session_id=state["session_id"],
+            model_name=state["model_name"],
+            history=history,
+            collected_info=dict(state["collected_info"]),
+            messages=messages,
+            cache_keys=set(state["cache_keys"]),
+            extractor=ProfileExtractor.from_state(history, state["extractor"]),
+            usage=TokenUsage.from_state(state["usage"]),
+            save_transcript=state["save_transcript"],
+        )
+        session.window.planned_questions = state["planned_questions"]
+        session.window.plan_block = state["plan_block"]
+        session.initialized = state["initialized"]
+        session.ended = state["ended"]
+        session.saved = state["saved"]
+        return session
+
+    def view(self) -> dict:
+        """What a client may see: the displayed messages and progress, never the raw history."""
+        return {
+            "session_id": self.session_id,
+            "model": self.model_name,
+            "messages": [message.display_dict() for message in self.messages],
+            "collected_info": dict(self.collected_info),
+            "initialized": self.initialized,
+            "ended": self.ended,
+            "tokens": self.usage.stats(),
+        }
+
+
+def greet(session: InterviewSession, client, reply_pool=None, stream: bool = False, on_text=None,
+          use_cache: bool = True) -> str:
+    """
+    Open the interview: a pre-generated greeting when the pool has one,
+    otherwise a model call. Returns the greeting as shown; if the call
+    fails, the session is left as it was and the error propagates.
+    `use_cache=False` bypasses the response caches (replays).
+    """
+    if session.initialized:
+        return session.messages[0].display if session.messages else ""
+    session.history.append({"role": "user", "content": get_initial_greeting_prompt()})
+
+    pooled = pooled_turn(reply_pool, GREETING, session.model_name, session.extractor) if reply_pool is not None else None
+    if pooled is not None:
+        raw_reply, display_text, metadata = pooled
+        update_collected_info(metadata, session.collected_info)
+    else:
+        try:
+            # The greeting context is identical for every session, so it
+            # goes through the shared cache and is generated once per fleet.
+            # Its key is not the session's own: forget() must leave it.
+            raw_reply, display_text, metadata = complete_turn(
+                client, session.window, session.collected_info, session.model_name,
+                stream=stream, cache_keys=set(), on_text=on_text,
+                extractor=session.extractor, use_cache=use_cache, usage=session.usage,
+            )
+        except Exception:
+            # Retried on the next call, without a second greeting prompt
+            session.history.pop()
+            raise
+
+    session.messages.append(session.history.add_reply(raw_reply, display_text))
+    session.initialized = True
+    return display_text
+
+
+def answer(session: InterviewSession, client, user_input: str, reply_pool=None, stream: bool = False,
+           on_text=None, is_cancelled=None, use_cache: bool = True) -> str:
+    """
+    Run one candidate turn and return the reply as shown. Exit messages end
+    the interview with a closing; so does a used-up token ceiling. Raises
+    ValueError for empty or over-long input and for ended interviews. A
+    failed or cancelled turn leaves the session as it was. As with close(),
+    saving the transcript is left to the caller; `use_cache` as for greet().
+    """
+    if session.ended:
+        raise ValueError("The interview has ended.")
+    is_valid, result = validate_input(user_input)
+    if not is_valid:
+        raise ValueError(result)
+    message = Message("user", result)
+    if is_exit_intent(result):
+        session.messages.append(message)
+        return close(session, reply_pool)
+
+    session.history.append(message)
+    try:
+        raw_reply, display_text, metadata = complete_turn(
+            client, session.window, session.collected_info, session.model_name,
+            stream=stream, cache_keys=session.cache_keys, on_text=on_text, is_cancelled=is_cancelled,
+            extractor=session.extractor, use_cache=use_cache, usage=session.usage,
+        )
+    except Exception:
+        session.history.pop()
+        raise
+    if is_cancelled is not None and is_cancelled():
+        session.history.pop()
+        return display_text
+
+    session.messages.append(message)
+    session.messages.append(session.history.add_reply(raw_reply, display_text))
+    if session.usage.exhausted:
+        # Its reply was the goodbye
+        session.ended = True
+    return display_text
+
+
+def close(session: InterviewSession, reply_pool=None) -> str:
+    """
+    End the interview with a pre-generated goodbye (or a fixed one), so
+    leaving never waits for the model. Returns the closing as shown. The
+    caller saves the transcript (save_transcript) once the ended session
+    is persisted.
+    """
+    session.history.append({"role": "user", "content": get_exit_prompt()})
+    pooled = pooled_turn(reply_pool, CLOSING, session.model_name) if reply_pool is not None else None
+    raw_reply, display_text = pooled[:2] if pooled is not None else (FALLBACK_CLOSING, FALLBACK_CLOSING)
+    session.messages.append(session.history.add_reply(raw_reply, display_text))
+    session.ended = True
+    return display_text
+
+
+def pending_transcript(session: InterviewSession) -> dict | None:
+    """
+    The transcript record of an ended interview that still has to be saved,
+    with the session marked as saved; None when there is nothing to save.
+    Persist the session before submitting the record, so a failed write
+    (and the client's retry) cannot save the interview twice.
+    """
+    if (not session.ended or not session.save_transcript or session.saved
+            or get_transcript_store() is None):
+        return None
+    session.saved = True
+    return transcript_record(session.session_id, session.model_name, session.history, session.collected_info)
+
+
+def save_transcript(session: InterviewSession) -> bool:
+    """
+    Hand the ended interview to the transcript store, once, if the store
+    is configured and the candidate opted in. Does not wait for the write.
+    """
+    record = pending_transcript(session)
+    if record is None:
+        return False
+    get_transcript_store().submit(record)
+    return True
+
+
+def forget(session: InterviewSession):
+    """
+    Drop the cache entries made from the candidate's messages and any saved
+    transcript ("Delete my data"). Shared entries (the greeting) are kept.
+    """
+    from cache import get_response_cache
+    from semantic_cache import get_semantic_cache
+
+    cache = get_response_cache()
+    semantic_cache = get_semantic_cache()
+    for cache_key in session.cache_keys:
+        cache.discard(cache_key)
+        if semantic_cache is not None:
+            semantic_cache.discard(cache_key)
+    session.cache_keys.clear()
+    store = get_transcript_store()
+    if store is not None and session.saved:
+        store.delete(session.session_id)
+        session.saved = False
@@ -0,0 +1,238 @@
+"""
+Deterministic candidate-profile extraction for TalentScout AI.
+
+Updates the collected_info flags locally from each new message, so the model
+no longer has to spend decode tokens on a full METADATA trailer every turn.
+Extraction is incremental: every message is scanned once, and the question
+the assistant asked last is used to interpret short answers ("Priya Shah",
+"Pune", "4 years"). Questions, greetings and refusals are never taken as
+answers. Fields the model reports in its METADATA trailer (prompt.py) are
+left to the model; the extractor still records their facts.
+"""
+
+import re
+
+from prompt import METADATA_FIELDS
+
+FIELDS = ("name", "contact", "location", "experience", "position", "tech_stack", "questions")
+
+# Technical questions that must be answered before "questions" is complete
+REQUIRED_ANSWERS = 3
+
+EMAIL_PATTERN = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+PHONE_PATTERN = re.compile(r"(?<!\w)\+?\d[\d\s().-]{8,}\d(?!\w)")
+YEARS_PATTERN = re.compile(r"\b(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+MONTHS_PATTERN = re.compile(r"\b(\d{1,3})\s*(?:months?|mos?)\b", re.IGNORECASE)
+# Replies that do not answer the question: questions back, greetings, refusals
+NOT_AN_ANSWER_PATTERN = re.compile(
+    r"\?|^(?:hi|hello|hey|hiya|yo|greetings|good (?:morning|afternoon|evening))\b|"
+    r"\b(?:skip|rather not|prefer not|don'?t want|do not want|won'?t|not comfortable|why|pass|no thanks|n/?a)\b",
+    re.IGNORECASE,
+)
+# Hedges and non-places, never taken as a name or location ("I am Not Sure", "Remote")
+HEDGE_PATTERN = re.compile(
+    r"\b(?:not sure|unsure|no idea|don'?t know|do not know|dunno|maybe|not yet|undecided|"
+    r"tbd|none|nothing|nowhere|anywhere|remote(?:ly)?|flexible|wfh|work from home)\b",
+    re.IGNORECASE,
+)
+NO_EXPERIENCE_PATTERN = re.compile(r"\b(fresher|fresh graduate|no (?:professional )?experience|entry[- ]level)\b", re.IGNORECASE)
+NAME_PATTERN = re.compile(
+    r"\b(?i:my name is|my name's|i am|i'm|this is|call me|name:)\s+"
+    r"([A-Z][a-zA-Z'-]+(?:\s+[A-Z][a-zA-Z'-]+){0,3})"
+)
+LOCATION_PATTERN = re.compile(
+    r"\b(?i:based (?:in|out of)|live in|living in|located in|relocating to|location:)\s+"
+    r"([A-Z][\w .'-]{1,60}?)(?=[.,;!?\n]|$| and | but )"
+)
+ROLE_PATTERN = re.compile(
+    r"\b(developer|engineer|architect|scientist|analyst|devops|sre|programmer|"
+    r"administrator|consultant|tester|designer|lead|manager|intern)s?\b",
+    re.IGNORECASE,
+)
+ROLE_INTENT_PATTERN = re.compile(
+    r"\b(looking for|applying (?:for|to)|interested in|want to work as|position|role|opening|job as)\b",
+    re.IGNORECASE,
+)
+WORD_PATTERN = re.compile(r"[a-z0-9#+.]+")
+
+# Technologies recognised in a candidate's stack (lower case; multi-word entries allowed)
+TECHNOLOGIES = frozenset({
+    "python", "java", "javascript", "typescript", "go", "golang", "rust", "c", "c++", "c#", "ruby", "php",
+    "kotlin", "swift", "scala", "r", "dart", "elixir", "perl", "bash", "sql",
+    "django", "flask", "fastapi", "spring", "spring boot", "rails", "laravel", ".net", "asp.net",
+    "react", "angular", "vue", "svelte", "next.js", "nextjs", "node", "node.js", "nodejs", "express",
+    "nestjs", "redux", "tailwind", "flutter", "react native", "jquery",
+    "postgresql", "postgres", "mysql", "sqlite", "mongodb", "redis", "cassandra", "dynamodb",
+    "elasticsearch", "kafka", "rabbitmq", "graphql", "oracle", "snowflake",
+    "docker", "kubernetes", "k8s", "terraform", "ansible", "jenkins", "aws", "azure", "gcp",
+    "linux", "git", "spark", "hadoop", "airflow", "pandas", "numpy", "pytorch", "tensorflow",
+    "scikit-learn", "keras", "langchain", "llm", "html", "css", "sass",
+})
+MULTI_WORD_TECHNOLOGIES = sorted((tech for tech in TECHNOLOGIES if " " in tech), key=len, reverse=True)
+
+# What the assistant is asking for, recognised from the last question of its latest message
+QUESTION_PATTERN = re.compile(r"[^.!?\n]*\?")
+ASK_PATTERNS = (
+    ("contact", re.compile(r"\b(email|e-mail|phone|contact)\b", re.IGNORECASE)),
+    ("name", re.compile(r"\b(your (?:full )?name|who am i speaking|introduce yourself)\b", re.IGNORECASE)),
+    ("location", re.compile(r"\b(where are you|located|location|based|city|relocat)", re.IGNORECASE)),
+    ("experience", re.compile(r"\b(years of|how long have you|experience do you have|how much experience)\b", re.IGNORECASE)),
+    ("position", re.compile(r"\b(position|role|job are you|looking for)\b", re.IGNORECASE)),
+    ("tech_stack", re.compile(r"\b(tech stack|technologies|languages|frameworks|tools)\b", re.IGNORECASE)),
+)
+
+
+def find_technologies(text: str) -> list:
+    """Return the known technologies mentioned in text, in order of appearance."""
+    lowered = text.lower()
+    found = []
+    for tech in MULTI_WORD_TECHNOLOGIES:
+        if tech in lowered:
+            found.append(tech)
+            lowered = lowered.replace(tech, " ")
+    for word in WORD_PATTERN.findall(lowered):
+        word = word.rstrip(".")
+        if word in TECHNOLOGIES and word not in found and len(word) > 1:
+            found.append(word)
+    return found
+
+
+class ProfileExtractor:
+    """
+    Incremental extractor for one conversation.
+
+    Feed it every assistant reply (observe_assistant) and every candidate
+    message (observe_user); `flags` holds the seven collected_info flags and
+    `facts` the values that were recognised (name, location, years,
+    tech_stack, ...). Flags only ever turn on. apply() leaves the fields
+    the model reports in METADATA to the model.
+    """
+
+    def __init__(self, history=None):
+        self.history = history
+        self.flags = dict.fromkeys(FIELDS, False)
+        self.facts = {}
+        self.asking_for = None
+        self.questions_asked = 0
+        self.answers_given = 0
+        self._question_pending = False
+
+    def observe_assistant(self, text: str):
+        """Note what the assistant asked for, and count technical questions."""
+        self.asking_for = None
+        self._question_pending = False
+        questions = QUESTION_PATTERN.findall(text)
+        if not questions:
+            return
+
+        # A greeting may list every field before asking for the first one
+        for field, pattern in ASK_PATTERNS:
+            if not self.flags[field] and pattern.search(questions[-1]):
+                self.asking_for = field
+                return
+
+        if self.flags["tech_stack"]:
+            self.questions_asked += 1
+            self._question_pending = True
+
+    def observe_user(self, text: str) -> dict:
+        """Update the profile from one candidate message and return the flags."""
+        asking_for = self.asking_for
+        answers = len(text.split()) <= 5 and not NOT_AN_ANSWER_PATTERN.search(text)
+
+        if EMAIL_PATTERN.search(text):
+            self.facts["email"] = True
+        if PHONE_PATTERN.search(text):
+            self.facts["phone"] = True
+        if self.facts.get("email") and self.facts.get("phone"):
+            self.flags["contact"] = True
+
+        if not self.flags["name"]:
+            match = NAME_PATTERN.search(text)
+            if match and self._looks_like_name(match.group(1)):
+                self._set("name", match.group(1).strip())
+            elif (asking_for == "name" and answers and re.fullmatch(r"[A-Za-z][A-Za-z .'-]{1,60}", text.strip())
+                  and self._looks_like_name(text.strip())):
+                self._set("name", text.strip().rstrip("."))
+
+        if not self.flags["location"]:
+            match = LOCATION_PATTERN.search(text)
+            if match:
+                if not HEDGE_PATTERN.search(match.group(1)):
+                    self._set("location", match.group(1).strip())
+            elif asking_for == "location" and answers:
+                answer = re.sub(r"^(?i:i'm in|i am in|in|from|i'm from|i am from)\s+", "", text.strip()).rstrip(".")
+                if answer and not any(ch.isdigit() for ch in answer) and not HEDGE_PATTERN.match(answer):
+                    self._set("location", answer)
+
+        if not self.flags["experience"]:
+            match = YEARS_PATTERN.search(text)
+            if match:
+                self._set("years", float(match.group(1)), "experience")
+            elif NO_EXPERIENCE_PATTERN.search(text):
+                self._set("years", 0.0, "experience")
+            elif asking_for == "experience":
+                # Only with a unit: "I have 2 kids" is not two years
+                months = MONTHS_PATTERN.search(text)
+                if months:
+                    self._set("years", round(int(months.group(1)) / 12, 1), "experience")
+
+        if not self.flags["position"]:
+            match = ROLE_PATTERN.search(text)
+            if match and (asking_for == "position" or ROLE_INTENT_PATTERN.search(text)):
+                self._set("position", text.strip()[:120])
+
+        technologies = find_technologies(text)
+        if technologies:
+            known = self.facts.setdefault("tech_stack", [])
+            known.extend(tech for tech in technologies if tech not in known)
+            if not self.flags["tech_stack"] and (len(technologies) >= 2 or asking_for == "tech_stack"):
+                self.flags["tech_stack"] = True
+
+        if self._question_pending:
+            self.answers_given += 1
+            self._question_pending = False
+            if self.answers_given >= REQUIRED_ANSWERS:
+                self.flags["questions"] = True
+
+        return self.flags
+
+    def apply(self, collected_info: dict):
+        """Turn on every collected_info flag the extractor has established, except the model's."""
+        for field, value in self.flags.items():
+            if value and field in collected_info and field not in METADATA_FIELDS:
+                collected_info[field] = True
+
+    def to_state(self) -> dict:
+        """The extractor's progress as plain data (see from_state)."""
+        return {
+            "flags": dict(self.flags),
+            "facts": dict(self.facts),
+            "asking_for": self.asking_for,
+            "questions_asked": self.questions_asked,
+            "answers_given": self.answers_given,
+            "question_pending": self._question_pending,
+        }
+
+    @classmethod
+    def from_state(cls, history, state: dict) -> "ProfileExtractor":
+        """Resume an extractor saved with to_state() for the same history."""
+        extractor = cls(history)
+        extractor.flags.update(state["flags"])
+        extractor.facts = dict(state["facts"])
+        extractor.asking_for = state["asking_for"]
+        extractor.questions_asked = state["questions_asked"]
+        extractor.answers_given = state["answers_given"]
+        extractor._question_pending = state["question_pending"]
+        return extractor
+
+    @staticmethod
+    def _looks_like_name(candidate: str) -> bool:
+        # "I'm Python developer" or "I am Senior engineer" are not names, nor are "hello",
+        # "Can I skip this" or "I am Not Sure"
+        return (candidate.split()[0].lower() not in TECHNOLOGIES and not ROLE_PATTERN.search(candidate)
+                and not NOT_AN_ANSWER_PATTERN.search(candidate) and not HEDGE_PATTERN.search(candidate))
+
+    def _set(self, fact: str, value, field: str | None = None):
+        self.facts[fact] = value
+        self.flags[field or fact] = True
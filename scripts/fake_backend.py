@@ -0,0 +1,233 @@
+"""
+Stand-in OpenAI-compatible backend for load tests and offline development.
+
+Serves /v1/chat/completions (streaming and non-streaming) and /v1/models
+with a configurable time-to-first-token, decode speed and error rate.
+Replies are scripted and end with the METADATA trailer the app expects; the
+reply is picked by how many candidate messages the conversation holds.
+
+Run standalone:
+    python fake_backend.py --port 11435 --ttft 0.4 --tokens-per-sec 40
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIELDS = ("name", "contact", "location", "experience", "position", "tech_stack", "questions")
+
+
+def _with_metadata(text: str, collected: int) -> str:
+    metadata = {field: index < collected for index, field in enumerate(FIELDS)}
+    return f"{text}\nMETADATA: {json.dumps(metadata)}"
+
+
+DEFAULT_REPLIES = [
+    _with_metadata("Hi, I'm TalentScout, an AI hiring assistant. I'll ask a few questions about your "
+                   "background and skills. To start, what's your full name?", 0),
+    _with_metadata("Thanks! Could you share the best email and phone number to reach you?", 1),
+    _with_metadata("Great. Where are you currently based?", 2),
+    _with_metadata("Got it. How many years of professional experience do you have?", 3),
+    _with_metadata("Nice. Which position or positions are you interested in?", 4),
+    _with_metadata("Sounds good. What's your tech stack: languages, frameworks, databases and tools?", 5),
+    _with_metadata("Thanks. First question: how would you design a rate limiter for a public REST API?", 6),
+    _with_metadata("Good answer. Next: how do you find and fix a memory leak in a long-running service?", 6),
+    _with_metadata("Makes sense. Last one: how would you roll out a database schema change with zero downtime?", 6),
+    _with_metadata("Thanks for your answers! TalentScout will review your details and reach out about next steps.", 7),
+]
+
+
+class FakeBackend:
+    """
+    Scripted OpenAI-compatible server. `ttft` and `tokens_per_second` shape
+    the timing of every reply; `error_rate` is the share of requests that
+    fail with HTTP 500. `disconnects` counts streams the client closed
+    before the reply was complete.
+    """
+
+    def __init__(self, ttft: float = 0.2, tokens_per_second: float = 50.0, error_rate: float = 0.0,
+                 replies: list | None = None):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.replies = replies or DEFAULT_REPLIES
+        self.requests = 0
+        self.disconnects = 0
+        self._server = None
+        self._lock = threading.Lock()
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in a background thread and return the OpenAI-style base URL."""
+        handler = type("Handler", (_Handler,), {"backend": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-backend", daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def pick_reply(self, messages: list) -> str:
+        """Scripted reply for a conversation: one step per candidate message (the last one for the exit prompt)."""
+        if messages and "want to end the conversation" in messages[-1].get("content", ""):
+            return self.replies[-1]
+        user_turns = sum(1 for message in messages if message.get("role") == "user")
+        return self.replies[min(max(user_turns - 1, 0), len(self.replies) - 1)]
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_disconnect(self):
+        with self._lock:
+            self.disconnects += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    backend = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "talentscout"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        backend = self.backend
+        backend.count_request()
+        if random.random() < backend.error_rate:
+            self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+
+        reply = backend.pick_reply(body.get("messages", []))
+        tokens = re.findall(r"\S+\s*", reply)
+        max_tokens = body.get("max_tokens")
+        finish_reason = "length" if max_tokens and len(tokens) > max_tokens else "stop"
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        model = body.get("model", "fake")
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+        delay = 1.0 / backend.tokens_per_second if backend.tokens_per_second > 0 else 0.0
+
+        time.sleep(backend.ttft)
+        if body.get("stream"):
+            self._stream(model, tokens, delay, usage, body.get("stream_options") or {}, finish_reason)
+            return
+
+        time.sleep(delay * len(tokens))
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                         "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    def _stream(self, model: str, tokens: list, delay: float, usage: dict, stream_options: dict,
+                finish_reason: str = "stop"):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        try:
+            for index, token in enumerate(tokens):
+                if index:
+                    time.sleep(delay)
+                self._send_event(self._chunk(completion_id, model, {"content": token}, None))
+            self._send_event(self._chunk(completion_id, model, {}, finish_reason))
+            if stream_options.get("include_usage"):
+                final = self._chunk(completion_id, model, {}, None)
+                final["choices"] = []
+                final["usage"] = usage
+                self._send_event(final)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client cancelled the generation
+            self.backend.count_disconnect()
+
+    @staticmethod
+    def _chunk(completion_id: str, model: str, delta: dict, finish_reason: str | None) -> dict:
+        return {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    def _send_event(self, payload: dict):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def load_replies(path: str) -> list:
+    """Read scripted replies from a JSON list or a JSONL file of strings."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible backend.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--ttft", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="decode speed")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 500")
+    parser.add_argument("--replies", help="JSON or JSONL file with scripted replies")
+    args = parser.parse_args()
+
+    backend = FakeBackend(
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        replies=load_replies(args.replies) if args.replies else None,
+    )
+    print(f"Fake backend listening on {backend.start(args.host, args.port)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
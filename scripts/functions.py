@@ -1,194 +1,188 @@
+"""
+Streamlit session glue for TalentScout AI.
 
-import re
-import hashlib
-import streamlit as st
-from functools import lru_cache
-
-
-def completion_func(client, message, model_name="llama3.1"):
-    completion = client.chat.completions.create(
-        model=model_name,
-        messages=message,
-    )
-    return completion
-
+Keeps each browser session's interview objects in st.session_state and
+hands them to the engine (engine.py), which runs every turn through the
+UI-independent pipeline (pipeline.py). Candidate turns are answered by a
+background InputWorker, so the script thread only polls.
+"""
 
-def get_initial_greeting_prompt():
-    return "Start the conversation by greeting the candidate and briefly explaining your role."
+import uuid
 
+import streamlit as st
 
-def get_exit_prompt():
-    return (
-        "The candidate indicated they want to end the conversation. "
-        "Thank them for their time, briefly mention that TalentScout will review their details "
-        "and contact them about next steps, and say goodbye in one or two sentences."
+from budgets import TokenUsage
+from context import ContextWindow, get_context_budget
+from engine import InterviewSession, answer, forget
+from extractor import ProfileExtractor
+from pipeline import get_exit_prompt, get_initial_greeting_prompt
+from transcript import TranscriptRenderer
+from worker import InputWorker
+
+
+def get_context_window(model_name: str) -> ContextWindow:
+    """Return this session's context window for the model, creating it as needed."""
+    history = st.session_state.conversation_history
+    window = st.session_state.get("context_window")
+    if window is None or window.history is not history or window.budget != get_context_budget(model_name):
+        window = ContextWindow(
+            history,
+            get_context_budget(model_name),
+            control_prompts=(get_initial_greeting_prompt(), get_exit_prompt()),
+        )
+        st.session_state.context_window = window
+    return window
+
+
+def get_profile_extractor() -> ProfileExtractor:
+    """Return this session's local profile extractor, bound to the current history."""
+    history = st.session_state.conversation_history
+    extractor = st.session_state.get("profile_extractor")
+    if extractor is None or extractor.history is not history:
+        extractor = ProfileExtractor(history)
+        st.session_state.profile_extractor = extractor
+    return extractor
+
+
+def get_session_usage() -> TokenUsage:
+    """Return this interview's token counters (new ones after Reset)."""
+    if "token_usage" not in st.session_state:
+        st.session_state.token_usage = TokenUsage()
+    return st.session_state.token_usage
+
+
+def get_transcript_renderer() -> TranscriptRenderer:
+    """Return this session's transcript renderer, synced with the messages list."""
+    if "transcript_renderer" not in st.session_state:
+        st.session_state.transcript_renderer = TranscriptRenderer()
+    renderer = st.session_state.transcript_renderer
+    renderer.sync(st.session_state.messages)
+    return renderer
+
+
+def get_session_id() -> str:
+    """Return the id of the current interview (a new one after Reset)."""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+def get_interview_session(model_name: str) -> InterviewSession:
+    """This browser session's interview, as the engine sees it (the same objects)."""
+    init_input_queue()
+    session_id = get_session_id()
+    session = InterviewSession(
+        session_id=session_id,
+        model_name=model_name,
+        history=st.session_state.conversation_history,
+        collected_info=st.session_state.collected_info,
+        messages=st.session_state.messages,
+        cache_keys=st.session_state.cache_keys,
+        extractor=get_profile_extractor(),
+        usage=get_session_usage(),
+        window=get_context_window(model_name),
+        save_transcript=bool(st.session_state.get("save_transcript")),
     )
+    session.initialized = st.session_state.initialized
+    session.ended = st.session_state.conversation_ended
+    session.saved = session_id in st.session_state.get("saved_sessions", [])
+    return session
 
 
-def is_exit_intent(user_input):
-    exit_keywords = ["exit", "quit", "bye", "goodbye", "that's all", "thats all", "end", "done"]
-    return user_input.lower().strip() in exit_keywords
-
+def record_saved(session: InterviewSession):
+    """Remember that engine.save_transcript saved this interview, for "Delete my data"."""
+    saved_sessions = st.session_state.setdefault("saved_sessions", [])
+    if session.saved and session.session_id not in saved_sessions:
+        saved_sessions.append(session.session_id)
 
 
-"""
-Utility functions for TalentScout AI.
-"""
-
-
-def mask_pii(content: str) -> str:
+def forget_everything(model_name: str):
     """
-    Mask personally identifiable information in text.
-    Returns content with emails and phone numbers masked.
+    "Delete my data": engine.forget for the current interview and for every
+    earlier one of this browser session whose transcript was saved.
     """
-    content = re.sub(r"\b[\w\.-]+@[\w\.-]+\.\w+\b", "[EMAIL]", content)
-    content = re.sub(r"\b\d{10,}\b", "[PHONE]", content)
-    return content
+    clear_queue(wait=True)
+    current = get_interview_session(model_name)
+    for session_id in st.session_state.get("saved_sessions", []):
+        if session_id != current.session_id:
+            earlier = InterviewSession(session_id=session_id, model_name=model_name, cache_keys=set())
+            earlier.saved = True
+            forget(earlier)
+    forget(current)
 
 
-def build_sanitized_history() -> list:
-    """
-    Return a version of conversation_history where user PII is masked
-    before sending to the model (emails, phone numbers, etc.).
-    """
-    safe_history = []
-    for msg in st.session_state.conversation_history:
-        role = msg["role"]
-        content = msg["content"]
+def init_input_queue():
+    """Initialize the input worker state in session state if not present."""
+    if "cache_keys" not in st.session_state:
+        st.session_state.cache_keys = set()
 
-        if role == "user":
-            content = mask_pii(content)
 
-        safe_history.append({"role": role, "content": content})
-    return safe_history
+def answer_input(user_input: str, session: InterviewSession, client, stream: bool = False,
+                 on_text=None, is_cancelled=None) -> tuple | None:
+    """
+    Answer queued input through engine.answer (the input worker's turn).
+    The app shows inputs as they are sent, so the engine records the turn in
+    a list of its own. Returns (input record, reply record), or None when
+    the turn was cancelled.
+    """
+    session.messages = []
+    answer(session, client, user_input, stream=stream, on_text=on_text, is_cancelled=is_cancelled)
+    return tuple(session.messages) if session.messages else None
 
 
-def init_input_queue():
-    """Initialize the input queue in session state if not present."""
-    if "input_queue" not in st.session_state:
-        st.session_state.input_queue = []
-    if "processing" not in st.session_state:
-        st.session_state.processing = False
-    if "response_cache" not in st.session_state:
-        st.session_state.response_cache = {}
+def get_input_worker() -> InputWorker:
+    """Return this session's background input worker, bound to the current history."""
+    init_input_queue()
+    worker = st.session_state.get("input_worker")
+    history = st.session_state.conversation_history
+    if worker is None or worker.history is not history:
+        if worker is not None:
+            worker.cancel()
+        worker = InputWorker(history, answer_input)
+        st.session_state.input_worker = worker
+    return worker
 
 
-def add_to_queue(user_input: str) -> bool:
+def add_to_queue(user_input: str, client=None, model_name: str = "llama3.1", stream: bool = False) -> bool:
     """
     Add user input to the processing queue.
-    Returns True if added successfully, False if duplicate/empty.
+    Inputs that arrive while a reply is being generated are merged into one turn.
+    Returns True if added successfully, False if empty.
     """
-    init_input_queue()
-    
     # Validate input
     cleaned_input = user_input.strip()
     if not cleaned_input:
         return False
     
-    st.session_state.input_queue.append(cleaned_input)
+    get_input_worker().submit(cleaned_input, {
+        "session": get_interview_session(model_name),
+        "client": client,
+        "stream": stream,
+    })
     return True
 
 
-def get_next_from_queue() -> str | None:
-    """Get the next input from the queue, or None if empty."""
-    init_input_queue()
-    if st.session_state.input_queue:
-        return st.session_state.input_queue.pop(0)
-    return None
-
-
 def has_pending_inputs() -> bool:
-    """Check if there are pending inputs in the queue."""
-    init_input_queue()
-    return len(st.session_state.input_queue) > 0
-
+    """Check if inputs are queued, being answered, or answered but not yet collected."""
+    worker = get_input_worker()
+    return worker.busy or bool(worker.results)
 
-def clear_queue():
-    """Clear all pending inputs from the queue."""
-    init_input_queue()
-    st.session_state.input_queue = []
 
-
-def get_cache_key(messages: list) -> str:
-    """Generate a cache key from the conversation context."""
-    context = str(messages[-5:]) if len(messages) > 5 else str(messages)
-    return hashlib.md5(context.encode()).hexdigest()
-
-
-def get_cached_response(messages: list) -> str | None:
-    """Check if we have a cached response for this context."""
-    init_input_queue()
-    cache_key = get_cache_key(messages)
-    return st.session_state.response_cache.get(cache_key)
-
-
-def cache_response(messages: list, response: str):
-    """Cache a response for future use. Keeps last 50 responses."""
-    init_input_queue()
-    cache_key = get_cache_key(messages)
-    
-    # Limit cache size
-    if len(st.session_state.response_cache) >= 50:
-        oldest_key = next(iter(st.session_state.response_cache))
-        del st.session_state.response_cache[oldest_key]
-    
-    st.session_state.response_cache[cache_key] = response
-
-
-def efficient_completion(client, messages: list, model_name: str, use_cache: bool = True):
+def clear_queue(wait: bool = False):
     """
-    Wrapper for completion_func with caching and efficient processing.
+    Clear all pending inputs and abandon the reply being generated; with
+    `wait`, until that turn has stopped and left the history.
     """
-    # Check cache first
-    if use_cache:
-        cached = get_cached_response(messages)
-        if cached:
-            return cached
-    
-    # Make the API call
-    completion = client.chat.completions.create(
-        model=model_name,
-        messages=messages,
-        temperature=0.7,
-        max_tokens=1024,
-    )
-    
-    response = completion.choices[0].message.content
-    
-    # Cache the response
-    if use_cache:
-        cache_response(messages, response)
-    
-    return response
+    get_input_worker().cancel(wait=wait)
 
 
-def validate_input(user_input: str) -> tuple[bool, str]:
+def collect_finished_turns() -> list:
     """
-    Validate user input and return (is_valid, cleaned_input or error_message).
+    Move replies finished by the input worker into the displayed messages.
+    Returns the finished turns; failed ones carry an "error" message.
     """
-    if not user_input:
-        return False, "Please enter a message."
-    
-    cleaned = user_input.strip()
-    
-    if len(cleaned) < 1:
-        return False, "Please enter a message."
-    
-    if len(cleaned) > 5000:
-        return False, "Message too long. Please keep it under 5000 characters."
-    
-    return True, cleaned
-
-
-def is_processing() -> bool:
-    """Check if the system is currently processing a request."""
-    init_input_queue()
-    return st.session_state.get("processing", False)
-
-
-def set_processing(state: bool):
-    """Set the processing state."""
-    init_input_queue()
-    st.session_state.processing = state
-
-
+    finished = get_input_worker().poll()
+    for result in finished:
+        if result["error"] is None:
+            st.session_state.messages.append(result["message"])
+    return finished
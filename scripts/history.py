@@ -0,0 +1,185 @@
+"""
+Conversation history with an incrementally maintained sanitized view and
+cache-key digest.
+
+Messages are kept as compact Message records rather than dicts. An
+assistant reply is stored once, raw (with its METADATA trailer), with the
+length of the part shown to the candidate, so the displayed messages list
+holds the same records instead of a second, cleaned copy. The system
+prompt's record and digest are shared by every conversation in the
+process. Dicts for the backend request or an API response are built only
+when one is sent (Message.as_dict).
+"""
+
+import sys
+from functools import lru_cache
+
+from pipeline import chain_digest, sanitize_message
+from metrics import span
+
+
+class Message:
+    """
+    One message of an interview. `content` is what the model saw or wrote;
+    the candidate is shown its first `display_len` characters (all of it
+    when None). Readable like a dict (message["role"], message["content"])
+    by the model pipeline.
+    """
+
+    __slots__ = ("role", "content", "display_len")
+
+    def __init__(self, role: str, content: str, display_len: int | None = None):
+        self.role = role
+        self.content = content
+        self.display_len = display_len
+
+    @property
+    def display(self) -> str:
+        """The text shown to the candidate."""
+        return self.content if self.display_len is None else self.content[:self.display_len]
+
+    def __getitem__(self, key: str) -> str:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self) -> dict:
+        return {"role": self.role, "content": self.content}
+
+    def display_dict(self) -> dict:
+        return {"role": self.role, "content": self.display}
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.content!r}, {self.display_len!r})"
+
+
+def to_message(message) -> Message:
+    """A Message for a message dict (records are returned as they are)."""
+    if isinstance(message, Message):
+        return message
+    return Message(message["role"], message["content"])
+
+
+def reply_message(raw_reply: str, display_text: str) -> Message:
+    """
+    The record of an assistant reply: the raw text with the length of its
+    shown part, or the shown text alone when it is not a prefix of the raw.
+    """
+    if display_text != raw_reply and raw_reply.startswith(display_text):
+        return Message("assistant", raw_reply, len(display_text))
+    return Message("assistant", display_text)
+
+
+@lru_cache(maxsize=8)
+def _system_entry(content: str) -> tuple:
+    """The record and digest of a system prompt, shared by all conversations starting with it."""
+    message = Message("system", sys.intern(content))
+    return message, bytes.fromhex(chain_digest("", message))
+
+
+class ConversationHistory(list):
+    """
+    The conversation_history list, extended with derived per-message state.
+
+    sanitized[i] is message i as sent to the model (PII masked once, when the
+    message is appended; the same record when there is nothing to mask), and
+    digests[i] is the chained digest of sanitized[0..i] (as 32 raw bytes), so
+    both the model view and the cache key for the whole conversation cost
+    only the newest message per turn. Appends extend the derived state and
+    popping the last message trims it; any other mutation rebuilds it.
+    Message dicts are stored as Message records.
+    """
+
+    def __init__(self, messages=()):
+        super().__init__()
+        self.sanitized = []
+        self.digests = []
+        self.extend(messages)
+
+    @property
+    def digest(self) -> str:
+        """Digest of the full conversation so far."""
+        return self.digests[-1].hex() if self.digests else ""
+
+    def append(self, message):
+        if not self and message["role"] == "system":
+            message, digest = _system_entry(message["content"])
+            super().append(message)
+            self.sanitized.append(message)
+            self.digests.append(digest)
+            return
+        message = to_message(message)
+        super().append(message)
+        with span("history.sanitize"):
+            sanitized = self._sanitize(message)
+        self.digests.append(bytes.fromhex(chain_digest(self.digest, sanitized)))
+        self.sanitized.append(sanitized)
+
+    def add_reply(self, raw_reply: str, display_text: str) -> Message:
+        """
+        Append an assistant reply and return the record to display for it,
+        which is the appended record itself unless the shown text is not a
+        prefix of the raw reply.
+        """
+        message = reply_message(raw_reply, display_text)
+        self.append(message if message.content == raw_reply else Message("assistant", raw_reply))
+        return message
+
+    @staticmethod
+    def _sanitize(message: Message) -> Message:
+        sanitized = sanitize_message(message)
+        return message if sanitized is message else Message(sanitized["role"], sanitized["content"])
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def __iadd__(self, messages):
+        self.extend(messages)
+        return self
+
+    def _rebuild(self):
+        messages = list(self)
+        super().clear()
+        self.sanitized = []
+        self.digests = []
+        self.extend(messages)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, to_message(value) if isinstance(index, int) else [to_message(m) for m in value])
+        self._rebuild()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._rebuild()
+
+    def insert(self, index, message):
+        super().insert(index, to_message(message))
+        self._rebuild()
+
+    def pop(self, index=-1):
+        last = index in (-1, len(self) - 1)
+        message = super().pop(index)
+        if last:
+            self.sanitized.pop()
+            self.digests.pop()
+        else:
+            self._rebuild()
+        return message
+
+    def remove(self, message):
+        super().remove(message)
+        self._rebuild()
+
+    def clear(self):
+        super().clear()
+        self.sanitized = []
+        self.digests = []
@@ -0,0 +1,239 @@
+"""
+Headless load driver for TalentScout AI.
+
+Simulates N concurrent candidates running the same flow as the app: the
+greeting turn, candidate turns through complete_turn/efficient_completion,
+and the exit path. By default it starts a bundled FakeBackend, so releases
+can be compared without a model server.
+
+    python loadtest.py --candidates 50 --turns 8 --ttft 0.3 --tokens-per-sec 40
+    python loadtest.py --candidates 500 --base-url http://localhost:11434/v1 --model llama3.1
+    python loadtest.py --candidates 100 --backends 3 --error-rate 0.02
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import get_response_cache
+from semantic_cache import get_semantic_cache
+from routing import get_model_router
+from budgets import get_token_ledger
+import metrics
+from backend_pool import BackendPool
+from fake_backend import FakeBackend
+from replay import replay_interview
+
+CANDIDATE_SCRIPT = [
+    "Hi, my name is {name}.",
+    "You can reach me at {email} or 555{phone:07d}.",
+    "I'm based in Austin, Texas.",
+    "I have {years} years of professional experience.",
+    "I'm looking for a senior backend engineer role.",
+    "Python, Django, PostgreSQL, Redis, Docker and Kubernetes.",
+    "I'd use a token bucket per API key in Redis, with a sliding window for bursts.",
+    "Heap snapshots over time, then compare allocations to find what keeps growing.",
+    "Expand and contract: add the new column, backfill, switch reads, then drop the old one.",
+]
+
+
+def candidate_messages(index: int, turns: int, identical: bool) -> list:
+    """The scripted messages for one candidate, ending with an exit message."""
+    seed = 0 if identical else index
+    values = {
+        "name": f"Candidate {seed}",
+        "email": f"candidate{seed}@example.com",
+        "phone": seed,
+        "years": 2 + seed % 10,
+    }
+    messages = [CANDIDATE_SCRIPT[turn % len(CANDIDATE_SCRIPT)].format(**values) for turn in range(turns)]
+    return messages + ["bye"]
+
+
+def run_candidate(client, model_name: str, script: list, stream: bool) -> dict:
+    """Run one interview and return its timings and final session state."""
+    result = replay_interview(client, model_name, script, stream=stream)
+    return {
+        "latencies": [turn["latency_s"] for turn in result["turns"]],
+        "ttfts": [turn["ttft_s"] for turn in result["turns"]],
+        "errors": len(result["errors"]),
+        "session_bytes": deep_sizeof(result["session"]),
+    }
+
+
+def deep_sizeof(obj, seen: set | None = None) -> int:
+    """Approximate retained size of an object graph, counting shared objects once."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for name in getattr(type(obj), "__slots__", ()):
+        size += deep_sizeof(getattr(obj, name, None), seen)
+    return size
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_load(client, model_name: str, candidates: int, turns: int, stream: bool = True,
+             identical: bool = False, ramp: float = 0.0) -> dict:
+    """Run `candidates` concurrent interviews and return the aggregated report."""
+    cache = get_response_cache()
+    cache_before = cache.stats()
+    semantic_cache = get_semantic_cache()
+    semantic_before = semantic_cache.stats() if semantic_cache is not None else None
+    router = get_model_router()
+    router.clear()
+    ledger = get_token_ledger()
+    ledger.clear()
+    metrics.reset()
+    results = []
+    results_lock = threading.Lock()
+
+    def candidate(index: int):
+        if ramp:
+            time.sleep(ramp * index / candidates)
+        result = run_candidate(client, model_name, candidate_messages(index, turns, identical), stream)
+        with results_lock:
+            results.append(result)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=candidates) as pool:
+        list(pool.map(candidate, range(candidates)))
+    elapsed = time.perf_counter() - started
+
+    cache_after = cache.stats()
+    hits = cache_after["hits"] - cache_before["hits"]
+    lookups = hits + cache_after["misses"] - cache_before["misses"]
+    semantic = {}
+    if semantic_cache is not None:
+        semantic_after = semantic_cache.stats()
+        semantic = {key: semantic_after[key] - semantic_before[key] for key in ("lookups", "hits", "verified")}
+        semantic["precision"] = semantic_after["precision"]
+    latencies = [value for result in results for value in result["latencies"]]
+    ttfts = [value for result in results for value in result["ttfts"]]
+
+    return {
+        "candidates": candidates,
+        "turns": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "elapsed_s": elapsed,
+        "throughput_turns_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_s": {f"p{pct}": percentile(latencies, pct) for pct in (50, 95, 99)},
+        "ttft_s": {f"p{pct}": percentile(ttfts, pct) for pct in (50, 95, 99)},
+        "cache_hit_rate": hits / lookups if lookups else 0.0,
+        "semantic_hit_rate": semantic["hits"] / semantic["lookups"] if semantic.get("lookups") else 0.0,
+        "semantic_precision": semantic.get("precision"),
+        "bytes_per_session": sum(result["session_bytes"] for result in results) / max(len(results), 1),
+        "backends": client.stats() if hasattr(client, "stats") else [],
+        "routes": router.stats(),
+        "tokens": ledger.stats(),
+        "stages": {stage: {"count": count, "p50": p50, "p95": p95, "p99": p99}
+                   for stage, count, p50, p95, p99 in metrics.stage_percentiles()},
+        "hedges": getattr(client, "hedges", 0),
+        "hedge_wins": getattr(client, "hedge_wins", 0),
+    }
+
+
+def print_report(report: dict):
+    print(f"candidates:        {report['candidates']}")
+    print(f"turns completed:   {report['turns']}  (errors: {report['errors']})")
+    print(f"elapsed:           {report['elapsed_s']:.2f} s")
+    print(f"throughput:        {report['throughput_turns_per_s']:.1f} turns/s")
+    for name in ("latency_s", "ttft_s"):
+        values = report[name]
+        label = "turn latency" if name == "latency_s" else "first token"
+        print(f"{label + ':':<19}p50 {values['p50'] * 1000:.0f} ms  p95 {values['p95'] * 1000:.0f} ms  p99 {values['p99'] * 1000:.0f} ms")
+    print(f"cache hit rate:    {report['cache_hit_rate']:.1%}")
+    precision = report["semantic_precision"]
+    print(f"semantic hits:     {report['semantic_hit_rate']:.1%}  (sampled precision: "
+          f"{'n/a' if precision is None else f'{precision:.1%}'})")
+    print(f"memory/session:    {report['bytes_per_session'] / 1024:.1f} KiB")
+    tokens = report["tokens"]
+    print(f"tokens/session:    {tokens['tokens_per_session']:.0f}  (prompt {tokens['prompt_tokens']}, "
+          f"completion {tokens['completion_tokens']}, sessions at ceiling {tokens['exhausted_sessions']})")
+    for turn_type, counters in tokens["by_type"].items():
+        print(f"  {turn_type:<22} {counters['calls']:>6} calls  prompt {counters['prompt_tokens']:>8}  "
+              f"completion {counters['completion_tokens']:>7}  truncated {counters['truncated']}")
+    print("stages:")
+    for stage, values in report["stages"].items():
+        print(f"  {stage:<22} n {values['count']:>6}  p50 {values['p50'] * 1000:8.2f} ms  "
+              f"p95 {values['p95'] * 1000:8.2f} ms  p99 {values['p99'] * 1000:8.2f} ms")
+    if len(report["routes"]) > 1:
+        print("routes:")
+        for route, counters in report["routes"].items():
+            print(f"  {route:<32} {counters['turns']:>6} turns  {counters['cached']:>5} cached  "
+                  f"mean {counters['mean_latency_s'] * 1000:.0f} ms  cost {counters['cost']:.2f}")
+    if report["hedges"]:
+        print(f"hedged requests:   {report['hedges']}  (hedge answered first: {report['hedge_wins']})")
+    if len(report["backends"]) > 1:
+        for backend in report["backends"]:
+            state = "up" if backend["healthy"] else "ejected"
+            print(f"  {backend['base_url']:<32} {backend['requests']:>6} requests  {backend['failures']:>4} failures  {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the TalentScout interview flow.")
+    parser.add_argument("--candidates", type=int, default=50, help="concurrent simulated candidates")
+    parser.add_argument("--turns", type=int, default=len(CANDIDATE_SCRIPT), help="candidate turns before exiting")
+    parser.add_argument("--model", default="llama3.1")
+    parser.add_argument("--base-url", help="real backend(s) to test, comma-separated; bundled fake servers are used when omitted")
+    parser.add_argument("--backends", type=int, default=1, help="fake backends to start and balance across")
+    parser.add_argument("--no-stream", action="store_true", help="use blocking completions instead of streaming")
+    parser.add_argument("--identical", action="store_true", help="give every candidate the same answers (cache best case)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which candidates start")
+    parser.add_argument("--ttft", type=float, default=0.2, help="fake backend: seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="fake backend: decode speed")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake backend: share of failing requests")
+    parser.add_argument("--json", dest="json_path", help="also write the report as JSON to this file")
+    parser.add_argument("--metrics", dest="metrics_path", help="also write the stage histograms in Prometheus text format")
+    args = parser.parse_args()
+
+    backends = []
+    base_url = args.base_url
+    if base_url is None:
+        backends = [FakeBackend(ttft=args.ttft, tokens_per_second=args.tokens_per_sec, error_rate=args.error_rate)
+                    for _ in range(args.backends)]
+        base_url = ",".join(backend.start() for backend in backends)
+
+    try:
+        report = run_load(
+            BackendPool(base_url),
+            args.model,
+            args.candidates,
+            args.turns,
+            stream=not args.no_stream,
+            identical=args.identical,
+            ramp=args.ramp,
+        )
+    finally:
+        for backend in backends:
+            backend.stop()
+
+    print_report(report)
+    if args.metrics_path:
+        with open(args.metrics_path, "w", encoding="utf-8") as f:
+            f.write(metrics.render_prometheus())
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Stage timings and profiling for TalentScout AI.
+
+Hot paths are wrapped in spans (`with span("turn.backend"):`) that feed one
+fixed-bucket histogram per stage. Recording a sample is a bisect and three
+additions under a lock, cheap enough to leave on in production. Histograms
+are exported in Prometheus text format (render_prometheus, or the HTTP
+endpoint started by start_metrics_server) and summarized as percentiles for
+the operator panel.
+
+Stages:
+  session.init           greeting at session start (pooled or generated)
+  history.sanitize       PII masking of one appended message
+  turn.total             complete_turn end to end
+  turn.context_build     context window (summary, profile, plan) for the prompt
+  turn.cache_lookup      exact response cache lookup
+  turn.semantic_lookup   semantic cache sketch and lookup
+  turn.backend           backend request, until the last token
+  turn.ttft              time to first token (or full reply without streaming)
+  turn.parse_metadata    METADATA parsing of the reply
+  render.transcript      transcript blocks drawn on a rerun
+
+A session can also be profiled with cProfile: pass its Profile to
+profiled() around the work to capture (turns run on worker threads, so
+each turn enables it on its own thread).
+"""
+
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.environ.get("TALENTSCOUT_METRICS_PORT", 0))
+
+# Upper bounds in seconds, from 100 µs to 2 minutes
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """Cumulative-on-export histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def percentile(self, pct: float) -> float | None:
+        """Estimate a percentile by interpolating inside its bucket."""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        rank = pct / 100 * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> tuple:
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(stage: str) -> Histogram:
+    """The histogram for a stage, created on first use."""
+    found = _histograms.get(stage)
+    if found is None:
+        with _histograms_lock:
+            found = _histograms.setdefault(stage, Histogram())
+    return found
+
+
+def observe(stage: str, seconds: float):
+    histogram(stage).observe(seconds)
+
+
+@contextmanager
+def span(stage: str):
+    """Time the enclosed block into the stage's histogram (also when it raises)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram(stage).observe(time.perf_counter() - started)
+
+
+def timed(stage: str):
+    """Decorator form of span()."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def stage_percentiles() -> list:
+    """[(stage, count, p50, p95, p99)] for every stage seen so far, in seconds."""
+    with _histograms_lock:
+        stages = sorted(_histograms.items())
+    return [(stage, h.count, h.percentile(50), h.percentile(95), h.percentile(99)) for stage, h in stages]
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def render_prometheus() -> str:
+    """All stage histograms in Prometheus text exposition format."""
+    lines = [
+        "# HELP talentscout_stage_seconds Time spent in each stage of a turn or session start.",
+        "# TYPE talentscout_stage_seconds histogram",
+    ]
+    with _histograms_lock:
+        stages = sorted(_histograms.items())
+    for stage, h in stages:
+        counts, count, total = h.snapshot()
+        cumulative = 0
+        for bound, bucket_count in zip(h.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'talentscout_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+        lines.append(f'talentscout_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'talentscout_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+        lines.append(f'talentscout_stage_seconds_count{{stage="{stage}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        data = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "0.0.0.0") -> ThreadingHTTPServer | None:
+    """Serve /metrics on `port` in a background thread; does nothing when port is 0."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="talentscout-metrics", daemon=True).start()
+    return server
+
+
+@contextmanager
+def profiled(profiler: cProfile.Profile | None):
+    """Enable `profiler` on this thread for the enclosed block (no-op when None)."""
+    if profiler is None:
+        yield
+        return
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+
+def profile_report(profiler: cProfile.Profile, limit: int = 20) -> str:
+    """The profiler's top functions by cumulative time, as text."""
+    out = io.StringIO()
+    try:
+        pstats.Stats(profiler, stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    except TypeError:
+        return "No samples yet."
+    return out.getvalue()
@@ -0,0 +1,133 @@
+"""
+PII masking for TalentScout AI.
+
+Candidate messages are masked before they reach the model. Every kind of PII
+is recognised at a rare anchor character: the @ of an email address or
+handle, the : of a URL scheme, the w of www., the . of a profile host, or
+the first digit, + or ( of a phone number. All kinds are alternatives of one
+compiled expression, each led by its anchor, so a message is scanned once
+and the regex engine skips ordinary words without trying any alternative on
+them. Parts that come before the anchor (an email's local part, "https",
+"github") are taken with small bounded lookups when a match is found, and a
+run of digits is only masked where it has a phone number's grouping.
+
+Kinds:
+  url      http(s)://… and www.… links, and profile links without a scheme
+           (linkedin.com/in/…, github.com/…)
+  email    name@example.com
+  phone    10 or more digits in a phone number's grouping: one run of
+           digits, or 3-3-4, 2-4-4 or 5-5 groups with one separator (space,
+           dot or dash) throughout, or (area) 123-4567; optionally after a
+           + and a country code
+  handle   @name social handles (not the @ of an email address)
+
+Bare domains without a path (python.org), numbers with fewer than 10
+digits (years, dates, salaries) and longer runs that are not grouped like a
+phone number (lists of years, IP addresses, version numbers) are left alone,
+so technical answers are not garbled.
+"""
+
+import re
+
+LABELS = {
+    "url": "[URL]",
+    "email": "[EMAIL]",
+    "phone": "[PHONE]",
+    "handle": "[HANDLE]",
+}
+
+PROFILE_HOSTS = ("linkedin", "github", "gitlab", "bitbucket", "twitter", "x", "facebook", "instagram",
+                 "medium", "stackoverflow", "behance", "dribbble", "kaggle", "t")
+
+URL_TAIL = r"[^\s<>\"']*[^\s<>\"'.,;:!?)\]]"
+PHONE_DIGITS = r"(?:[ ().-]{0,2}\d)"
+
+# One alternative per anchor character, each starting with that character as
+# a literal: the regex engine then skips to the next anchor in C and only
+# tries the alternative for it. Digits get one alternative each for the same
+# reason. Named groups are "<kind>" or "<kind>_<variant>"; the digit
+# alternatives have none and, like the phone_ ones, find runs of digits
+# that PHONE_SHAPE then checks.
+PHONE_AFTER_DIGIT = r"(?<![\w+]\d)" + PHONE_DIGITS + r"{9,}(?!\w)"
+WWW_REST = r"(?i:ww\.)[\w-]+(?:\.[\w-]+)+(?:/" + URL_TAIL + r")?"
+PII_PATTERN = re.compile("|".join([
+    r"@(?:(?<=[\w.+-]@)(?P<email>[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}\b)"
+    r"|(?<![\w.]@)(?P<handle>[A-Za-z_]\w{1,29}\b))",
+    r":(?:(?<=https:)|(?<=http:)|(?<=HTTPS:)|(?<=HTTP:))(?P<url_scheme>//" + URL_TAIL + r")",
+    r"w(?<![\w.]w)(?P<url_www>" + WWW_REST + r")",
+    r"W(?<![\w.]W)(?P<url_WWW>" + WWW_REST + r")",
+    r"\.(?i:" + "|".join(rf"(?<={host}\.)" for host in PROFILE_HOSTS) + r")"
+    r"(?P<url_profile>(?i:com|org|me)/" + URL_TAIL + r")",
+    r"\+(?<![\w+]\+)(?P<phone_plus>\(?\d" + PHONE_DIGITS + r"{9,}(?!\w))",
+    r"\((?<!\w\()(?P<phone_paren>\d" + PHONE_DIGITS + r"{9,}(?!\w))",
+    *(digit + PHONE_AFTER_DIGIT for digit in "0123456789"),
+]))
+
+# What comes before the anchor, searched in a short window ending at it
+LEADING = {
+    "email": re.compile(r"[\w.+-]{1,64}\Z"),
+    "url_scheme": re.compile(r"https?\Z", re.IGNORECASE),
+    "url_profile": re.compile(r"(?:" + "|".join(PROFILE_HOSTS) + r")\Z", re.IGNORECASE),
+}
+LEADING_WINDOW = 65
+
+# Phone numbers within a run of digits the phone alternatives found: one
+# separator throughout, and exactly 10 digits in the separated forms after
+# the optional country code or trunk prefix, which may use any separator.
+# A number may be followed by a separator only when another whole number
+# comes next ("1234567890-1234567890"), not a further group of its own.
+PHONE_PREFIX = r"(?:\+ ?(?:\d{1,3}[ .-]?)?|\d{1,3}(?:[ .-]|(?=\()))?"
+PHONE_SEPARATED = "|".join(
+    rf"(?:\d{{3}}{sep}\d{{3}}|\d{{2}}{sep}\d{{4}}){sep}\d{{4}}|\d{{5}}{sep}\d{{5}}"
+    for sep in (" ", "-", r"\.")
+)
+PHONE_BODY = PHONE_PREFIX + r"(?:\d{10,}|\(\d{2,4}\) ?\d{3,4}[ .-]?\d{4}|" + PHONE_SEPARATED + r")"
+PHONE_SHAPE = re.compile(
+    r"(?<![\w+])" + PHONE_BODY + r"(?!\w)(?![.-](?!" + PHONE_BODY + r"(?![.-]?\w))\w)"
+)
+
+
+def find_pii(text: str) -> list:
+    """Return (kind, start, end) for every PII item in text, in order."""
+    spans = []
+    for match in PII_PATTERN.finditer(text):
+        group = match.lastgroup or "phone"
+        if group.startswith("phone"):
+            # Years, addresses and versions can add up to 10 digits too
+            for phone in PHONE_SHAPE.finditer(text, match.start(), match.end()):
+                spans.append(("phone", phone.start(), phone.end()))
+            continue
+        start = match.start()
+        leading = LEADING.get(group)
+        if leading is not None:
+            found = leading.search(text, max(0, start - LEADING_WINDOW), start)
+            if found is not None:
+                start = found.start()
+        # An email whose local part was already taken for a phone number
+        if spans and start < spans[-1][2]:
+            start = min(start, spans.pop()[1])
+        spans.append((group.partition("_")[0], start, match.end()))
+    return spans
+
+
+def scan(text: str) -> tuple:
+    """
+    Mask every PII item in one pass. Returns (masked_text, spans), where
+    spans lists (kind, start, end) in the original text, in order.
+    """
+    spans = find_pii(text)
+    if not spans:
+        return text, spans
+    parts = []
+    position = 0
+    for kind, start, end in spans:
+        parts.append(text[position:start])
+        parts.append(LABELS[kind])
+        position = end
+    parts.append(text[position:])
+    return "".join(parts), spans
+
+
+def mask(text: str) -> str:
+    """Mask every PII item (scan() without the spans)."""
+    return scan(text)[0]
@@ -0,0 +1,601 @@
+"""
+The model pipeline of TalentScout AI, independent of any UI.
+
+complete_turn() produces the assistant's reply to a conversation: profile
+extraction, turn routing, both cache tiers, the question bank, output
+budgets and METADATA parsing. It works on the objects it is given and never
+on UI state, so the engine (engine.py) runs it for the Streamlit app, the
+HTTP API and scripts alike. The prompts, PII sanitizing, cache keys and
+transcript records they share live here too.
+"""
+
+import hashlib
+import json
+import random
+import time
+
+from budgets import (BUDGET_EXHAUSTED_REPLY, DEFAULT_OUTPUT_BUDGET, STREAM_USAGE, TokenUsage, get_token_ledger,
+                     output_budget)
+from cache import get_response_cache
+from client import GenerationCancelled
+from context import ContextWindow, estimate_tokens
+from metrics import observe, span, timed
+from pii import mask
+from question_bank import QUESTION_BANK_MODE, first_question_reply, get_question_bank, plan_block
+from routing import get_model_router
+from semantic_cache import get_semantic_cache
+from turns import CLARIFICATION, STACK_ACK, classify_turn
+
+# Models offered in the sidebar; the first one is the default
+MODEL_NAMES = ["llama3.1", "llama3", "mistral", "codellama"]
+
+
+def get_initial_greeting_prompt():
+    return "Start the conversation by greeting the candidate and briefly explaining your role."
+
+
+def get_exit_prompt():
+    return (
+        "The candidate indicated they want to end the conversation. "
+        "Thank them for their time, briefly mention that TalentScout will review their details "
+        "and contact them about next steps, and say goodbye in one or two sentences."
+    )
+
+
+def is_exit_intent(user_input):
+    exit_keywords = ["exit", "quit", "bye", "goodbye", "that's all", "thats all", "end", "done"]
+    return user_input.lower().strip() in exit_keywords
+
+
+def mask_pii(content: str) -> str:
+    """
+    Mask personally identifiable information in text.
+    Returns content with emails, phone numbers, URLs and social handles
+    masked (one pass, see pii.py).
+    """
+    return mask(content)
+
+
+def sanitize_message(message: dict) -> dict:
+    """
+    Return the form of a message that is sent to the model (user PII masked).
+    The message itself is returned when masking leaves it unchanged.
+    """
+    if message["role"] != "user":
+        return message
+
+    content = mask_pii(message["content"])
+    if content == message["content"]:
+        return message
+    return {"role": "user", "content": content}
+
+
+def transcript_record(session_id: str, model_name: str, history: list, collected_info: dict) -> dict:
+    """The transcript store record of an interview: its messages without control prompts or METADATA."""
+    control_prompts = (get_initial_greeting_prompt(), get_exit_prompt())
+    return {
+        "session_id": session_id,
+        "model": model_name,
+        "history": [
+            {"role": message["role"],
+             "content": parse_metadata_and_clean_reply(message["content"])[0] if message["role"] == "assistant" else message["content"]}
+            for message in history
+            if message["role"] != "system" and message["content"] not in control_prompts
+        ],
+        "collected_info": dict(collected_info),
+    }
+
+
+# Sampling parameters used for cached completions; they are part of the cache key,
+# together with max_tokens (the turn type's output budget, see budgets.py)
+SAMPLING_PARAMS = {"temperature": 0.7}
+
+
+def sampling_params(max_tokens: int) -> dict:
+    return {**SAMPLING_PARAMS, "max_tokens": max_tokens}
+
+
+def chain_digest(previous: str, message: dict) -> str:
+    """
+    Extend a conversation digest with one (sanitized) message.
+    Chaining makes every digest cover the whole prefix at O(len(message)) cost.
+    """
+    digest = hashlib.sha256(previous.encode())
+    digest.update(message["role"].encode())
+    digest.update(b"\0")
+    digest.update(message["content"].encode())
+    return digest.hexdigest()
+
+
+def context_digest(window: ContextWindow) -> str:
+    """
+    Digest of the context window.build() last returned: the history's digest
+    extended with the blocks build() added (summary and profile, question
+    plan), so two contexts only share a key when they send the same text.
+    """
+    digest = window.history.digest
+    for message in window.injected:
+        digest = chain_digest(digest, message)
+    return digest
+
+
+def get_cache_key(messages: list, model_name: str = "", digest: str | None = None, **params) -> str:
+    """
+    Generate a cache key from the full conversation context, the model and
+    the sampling params. Pass `digest` (see ConversationHistory.digest) to
+    avoid re-hashing the whole context.
+    """
+    if digest is None:
+        digest = ""
+        for message in messages:
+            digest = chain_digest(digest, message)
+
+    key = hashlib.sha256(digest.encode())
+    key.update(model_name.encode())
+    for name in sorted(params):
+        key.update(f"\0{name}={params[name]!r}".encode())
+    return key.hexdigest()
+
+
+def store_cached_response(cache_key: str, response: str, cache_keys: set | None = None):
+    """
+    Store a response under a precomputed key and remember the key in the
+    session's `cache_keys`, when given, so "Delete my data" can drop it.
+    """
+    get_response_cache().set(cache_key, response)
+    if cache_keys is not None:
+        cache_keys.add(cache_key)
+
+
+def cached_or_shared(cache_key: str, is_cancelled=None) -> tuple:
+    """
+    Look a reply up in the response cache and, on a miss, wait for a
+    concurrent call that is generating the same reply. Returns (reply,
+    leading): reply is None when the caller has to generate it, and
+    `leading` says it must then settle() the key for the calls waiting on it.
+    """
+    cache = get_response_cache()
+    with span("turn.cache_lookup"):
+        cached = cache.get(cache_key)
+        if cached:
+            return cached, False
+        pending = cache.join(cache_key)
+    if pending is None:
+        return None, True
+    while True:
+        try:
+            # None when that call failed; this one then generates its own
+            return pending.result(timeout=0.05), False
+        except TimeoutError:
+            if is_cancelled is not None and is_cancelled():
+                raise GenerationCancelled() from None
+
+
+def stream_completion(client, messages: list, model_name: str, use_cache: bool = True,
+                      digest: str | None = None, cache_keys: set | None = None, is_cancelled=None,
+                      max_tokens: int = DEFAULT_OUTPUT_BUDGET, usage: dict | None = None):
+    """
+    Streaming counterpart of efficient_completion.
+    Yields reply text chunks as the backend produces them. A cached reply is
+    yielded as a single chunk; a fully received reply is cached at the end,
+    unless it was cut off by max_tokens.
+    `is_cancelled` is handed to the client, which aborts the request (raising
+    GenerationCancelled) as soon as it returns True. `usage` receives the
+    backend's token counts and finish reason, as in efficient_completion.
+    """
+    cache_key = get_cache_key(messages, model_name, digest, **sampling_params(max_tokens)) if use_cache else None
+    leading = False
+    if cache_key:
+        cached, leading = cached_or_shared(cache_key, is_cancelled)
+        if cached:
+            yield cached
+            return
+
+    stored = None
+    try:
+        started = time.perf_counter()
+        stream = client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            stream=True,
+            **sampling_params(max_tokens),
+            **({"stream_options": {"include_usage": True}} if STREAM_USAGE else {}),
+            **({"is_cancelled": is_cancelled} if is_cancelled is not None else {}),
+        )
+
+        parts = []
+        finish_reason = None
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None and usage is not None:
+                    usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                    usage["completion_tokens"] = chunk.usage.completion_tokens
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if not parts:
+                        observe("turn.ttft", time.perf_counter() - started)
+                    parts.append(delta)
+                    yield delta
+        finally:
+            observe("turn.backend", time.perf_counter() - started)
+            if usage is not None:
+                usage["finish_reason"] = finish_reason
+
+        if cache_key and parts and finish_reason != "length":
+            stored = "".join(parts)
+            store_cached_response(cache_key, stored, cache_keys)
+    finally:
+        if leading:
+            get_response_cache().settle(cache_key, stored)
+
+
+class MetadataStreamParser:
+    """
+    Incrementally split a streamed assistant reply into display text and the
+    trailing METADATA JSON object.
+
+    Text that could still turn out to be the start of the METADATA marker is
+    held back, so the candidate never sees any part of it. Once the JSON
+    object closes, it is parsed and exposed as `metadata`.
+    """
+
+    marker = "METADATA:"
+
+    def __init__(self):
+        self.raw_reply = ""
+        self.display_text = ""
+        self.metadata = None
+        self._pending = ""
+        self._metadata_buffer = None
+
+    def feed(self, chunk: str) -> str:
+        """Consume a streamed chunk and return the text that is now safe to display."""
+        self.raw_reply += chunk
+
+        if self._metadata_buffer is not None:
+            self._metadata_buffer += chunk
+            self._try_parse_metadata()
+            return ""
+
+        self._pending += chunk
+        marker_index = self._pending.find(self.marker)
+        if marker_index != -1:
+            visible = self._pending[:marker_index].rstrip()
+            self._metadata_buffer = self._pending[marker_index + len(self.marker):]
+            self._pending = ""
+            self._try_parse_metadata()
+            return self._emit(visible)
+
+        # Hold back a trailing partial marker and trailing whitespace, since
+        # both are dropped if the metadata trailer follows.
+        held = 0
+        for size in range(min(len(self.marker) - 1, len(self._pending)), 0, -1):
+            if self._pending.endswith(self.marker[:size]):
+                held = size
+                break
+        visible = self._pending[:len(self._pending) - held].rstrip()
+        self._pending = self._pending[len(visible):]
+        return self._emit(visible)
+
+    def finish(self) -> str:
+        """Flush the stream and return any remaining display text."""
+        if self._metadata_buffer is None:
+            visible = self._pending.rstrip()
+            self._pending = ""
+            return self._emit(visible)
+
+        if self.metadata is None:
+            self.metadata = decode_metadata(self._metadata_buffer)
+        return ""
+
+    def _emit(self, text: str) -> str:
+        self.display_text += text
+        return text
+
+    def _try_parse_metadata(self):
+        if self.metadata is None and "}" in self._metadata_buffer:
+            self.metadata = decode_metadata(self._metadata_buffer)
+
+
+def decode_metadata(trailer: str) -> dict | None:
+    """
+    The JSON object of a METADATA trailer (the text after the marker), or
+    None. Whatever precedes the object, such as a ```json fence, is skipped,
+    and anything the model adds after it is ignored.
+    """
+    start = trailer.find("{")
+    if start == -1:
+        return None
+    try:
+        metadata, _ = json.JSONDecoder().raw_decode(trailer, start)
+    except ValueError:
+        return None
+    return metadata if isinstance(metadata, dict) else None
+
+
+@timed("turn.parse_metadata")
+def parse_metadata_and_clean_reply(raw_reply: str):
+    """
+    Splits the assistant reply into:
+      - display_text: what you show to the user
+      - metadata: dict with booleans or None if missing
+    Accepts the same trailers as MetadataStreamParser, so a reply shows the
+    same text whether it was streamed or not.
+    """
+    marker_index = raw_reply.find(MetadataStreamParser.marker)
+    if marker_index == -1:
+        return raw_reply, None
+
+    # Everything from the marker on is hidden from the user
+    metadata = decode_metadata(raw_reply[marker_index + len(MetadataStreamParser.marker):])
+    return raw_reply[:marker_index].rstrip(), metadata
+
+
+def update_collected_info(metadata: dict | None, collected_info: dict):
+    """Apply boolean progress flags from reply metadata to collected_info."""
+    if not metadata:
+        return
+    for key in collected_info.keys():
+        if key in metadata and isinstance(metadata[key], bool):
+            collected_info[key] = metadata[key]
+
+
+def plan_questions(window, extractor):
+    """Sample this candidate's technical questions from the question bank, once."""
+    bank = get_question_bank()
+    window.planned_questions = []
+    if bank is not None:
+        window.planned_questions = bank.sample(extractor.facts.get("tech_stack", []), extractor.facts.get("years"))
+    window.plan_block = plan_block(window.planned_questions) if window.planned_questions else ""
+
+
+def semantic_probe(window, collected_info: dict, model_name: str, extractor, turn_type: str) -> tuple | None:
+    """
+    Return (scope, signature) for looking up or storing this turn in the
+    semantic cache, or None when the turn is not eligible.
+    """
+    cache = get_semantic_cache()
+    if cache is None or extractor is None or not cache.eligible(turn_type):
+        return None
+
+    stage = tuple(field for field, value in collected_info.items() if value)
+    scope = (model_name, turn_type, stage, extractor.asking_for)
+    if turn_type == STACK_ACK:
+        scope += (tuple(sorted(extractor.facts.get("tech_stack", []))), tuple(window.planned_questions or ()))
+    elif turn_type == CLARIFICATION:
+        previous = next((m["content"] for m in reversed(window.history.sanitized[:-1]) if m["role"] == "assistant"), "")
+        scope += (hashlib.sha256(previous.encode()).hexdigest(),)
+    return scope, cache.sketch(window.history.sanitized[-1]["content"], extractor.facts)
+
+
+@timed("turn.total")
+def complete_turn(client, window, collected_info: dict, model_name: str, stream: bool = False,
+                  cache_keys: set | None = None, on_text=None, is_cancelled=None, extractor=None,
+                  use_cache: bool = True, usage: TokenUsage | None = None):
+    """
+    Generate the assistant reply for a conversation whose history (see
+    window.history) ends with the user's message. Touches only the objects
+    it is given, so it can run on any thread.
+
+    Streams when `stream` is set, calling on_text(display_text_so_far) as the
+    reply grows. Once is_cancelled() returns True the backend request is
+    aborted (GenerationCancelled is raised while waiting for it). Progress
+    flags are applied to collected_info as soon as the metadata arrives, and
+    from the local `extractor` (a ProfileExtractor) when one is given.
+    Eligible turns are answered from the semantic cache when a similar turn
+    was seen before. Once the tech stack is known, technical questions come
+    from the question bank. `use_cache=False` bypasses both cache tiers.
+    The turn goes to the model the router picks for its type (`model_name`
+    unless a route applies; see routing.py), with max_tokens set by the
+    type's output budget. Model calls are counted in `usage` (the session's
+    TokenUsage, see budgets.py); once it is exhausted, the turn gets a
+    closing message instead of a model call.
+    Returns (raw_reply, display_text, metadata).
+    """
+    started = time.perf_counter()
+    if extractor is not None:
+        last_message = window.history[-1]
+        if last_message["role"] == "user" and last_message["content"] not in window.control_prompts:
+            extractor.observe_user(last_message["content"])
+            extractor.apply(collected_info)
+        if collected_info.get("tech_stack") and window.planned_questions is None:
+            plan_questions(window, extractor)
+    turn_type = classify_turn(window.history, collected_info, extractor,
+                              get_initial_greeting_prompt(), get_exit_prompt())
+    router = get_model_router()
+    model_name = router.route(turn_type, model_name)
+
+    if (extractor is not None and turn_type == STACK_ACK and window.planned_questions
+            and QUESTION_BANK_MODE == "serve"):
+        reply = first_question_reply(window.planned_questions)
+        if on_text is not None:
+            on_text(reply)
+        extractor.observe_assistant(reply)
+        extractor.apply(collected_info)
+        router.record(turn_type, model_name, time.perf_counter() - started, cached=True)
+        return reply, reply, {}
+
+    semantic_cache = get_semantic_cache()
+    with span("turn.semantic_lookup"):
+        probe = semantic_probe(window, collected_info, model_name, extractor, turn_type) if use_cache else None
+        hit = semantic_cache.get(*probe) if probe is not None else None
+    cached_reply = None
+    if hit is not None:
+        cached_reply = hit[1]
+        # A sample of hits is generated anyway to measure precision
+        if random.random() >= semantic_cache.verify_rate:
+            if on_text is not None:
+                on_text(cached_reply)
+            extractor.observe_assistant(cached_reply)
+            extractor.apply(collected_info)
+            router.record(turn_type, model_name, time.perf_counter() - started, cached=True)
+            return cached_reply, cached_reply, {}
+
+    with span("turn.context_build"):
+        messages = window.build(collected_info, extractor.facts if extractor is not None else None)
+    digest = context_digest(window)
+
+    prompt_estimate = sum(estimate_tokens(m["content"]) for m in messages)
+    max_tokens = output_budget(turn_type) if usage is None else usage.max_tokens(turn_type, prompt_estimate)
+    if not max_tokens:
+        if on_text is not None:
+            on_text(BUDGET_EXHAUSTED_REPLY)
+        router.record(turn_type, model_name, time.perf_counter() - started, cached=True)
+        return BUDGET_EXHAUSTED_REPLY, BUDGET_EXHAUSTED_REPLY, {}
+
+    call_usage = {}
+    if not stream:
+        raw_reply = efficient_completion(client, messages, model_name, use_cache=use_cache,
+                                         digest=digest, cache_keys=cache_keys, is_cancelled=is_cancelled,
+                                         max_tokens=max_tokens, usage=call_usage)
+        display_text, metadata = parse_metadata_and_clean_reply(raw_reply)
+        update_collected_info(metadata, collected_info)
+    else:
+        parser = MetadataStreamParser()
+        metadata_applied = False
+        parse_seconds = 0.0
+        chunks = stream_completion(client, messages, model_name, use_cache=use_cache,
+                                   digest=digest, cache_keys=cache_keys, is_cancelled=is_cancelled,
+                                   max_tokens=max_tokens, usage=call_usage)
+        try:
+            for chunk in chunks:
+                if is_cancelled is not None and is_cancelled():
+                    break
+                parse_started = time.perf_counter()
+                grew = parser.feed(chunk)
+                parse_seconds += time.perf_counter() - parse_started
+                if grew and on_text is not None:
+                    on_text(parser.display_text)
+                if parser.metadata is not None and not metadata_applied:
+                    update_collected_info(parser.metadata, collected_info)
+                    metadata_applied = True
+        finally:
+            chunks.close()
+
+        parse_started = time.perf_counter()
+        parser.finish()
+        observe("turn.parse_metadata", parse_seconds + time.perf_counter() - parse_started)
+        if not metadata_applied:
+            update_collected_info(parser.metadata, collected_info)
+        raw_reply, display_text, metadata = parser.raw_reply, parser.display_text, parser.metadata
+
+    # Counted when the backend was called (an exact cache hit leaves call_usage
+    # empty), with estimates for what the backend did not report
+    cached = "finish_reason" not in call_usage
+    prompt_tokens = 0 if cached else call_usage.get("prompt_tokens", prompt_estimate)
+    completion_tokens = 0 if cached else call_usage.get("completion_tokens", estimate_tokens(raw_reply))
+    if not cached:
+        counters = usage if usage is not None else get_token_ledger()
+        counters.record(turn_type, prompt_tokens, completion_tokens, truncated=call_usage["finish_reason"] == "length")
+    if stream and is_cancelled is not None and is_cancelled():
+        # An abandoned partial reply is neither cached nor observed
+        return raw_reply, display_text, metadata
+
+    if probe is not None:
+        if cached_reply is not None:
+            semantic_cache.record_verification(cached_reply, display_text)
+        else:
+            # Stored without the METADATA trailer; flags come from the extractor
+            entry_id = semantic_cache.set(*probe, display_text, extractor.facts,
+                                          window.history.sanitized[-1]["content"])
+            if entry_id is not None and cache_keys is not None:
+                cache_keys.add(entry_id)
+
+    if extractor is not None:
+        extractor.observe_assistant(display_text)
+        extractor.apply(collected_info)
+    router.record(turn_type, model_name, time.perf_counter() - started,
+                  prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cached=cached)
+    return raw_reply, display_text, metadata
+
+
+def pooled_turn(reply_pool, turn_type: str, model_name: str, extractor=None):
+    """
+    Take a pre-generated greeting or closing (turn_type GREETING or CLOSING)
+    for the model this turn is routed to. Returns (raw_reply, display_text,
+    metadata) like complete_turn, or None when the pool is empty.
+    """
+    router = get_model_router()
+    model_name = router.route(turn_type, model_name)
+    started = time.perf_counter()
+    entry = reply_pool.pop(model_name, turn_type)
+    if entry is None:
+        return None
+    if extractor is not None:
+        extractor.observe_assistant(entry[1])
+    router.record(turn_type, model_name, time.perf_counter() - started, cached=True)
+    return entry
+
+
+def efficient_completion(client, messages: list, model_name: str, use_cache: bool = True,
+                         digest: str | None = None, cache_keys: set | None = None, is_cancelled=None,
+                         max_tokens: int = DEFAULT_OUTPUT_BUDGET, usage: dict | None = None):
+    """
+    Run a non-streaming completion through the shared response cache.
+    `digest` is the chained digest of `messages` when the caller keeps one;
+    `is_cancelled` aborts the request as in stream_completion. When the
+    backend is called, `usage` (a dict) receives prompt_tokens and
+    completion_tokens (when reported) and finish_reason; it stays empty on a
+    cache hit. Replies cut off by max_tokens are not cached. Concurrent
+    calls for the same key wait for the first one's reply instead of calling
+    the backend again.
+    """
+    # Check cache first (or wait for the same reply being generated)
+    cache_key = get_cache_key(messages, model_name, digest, **sampling_params(max_tokens)) if use_cache else None
+    leading = False
+    if cache_key:
+        cached, leading = cached_or_shared(cache_key, is_cancelled)
+        if cached:
+            return cached
+    
+    stored = None
+    try:
+        # Make the API call
+        started = time.perf_counter()
+        with span("turn.backend"):
+            completion = client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                **sampling_params(max_tokens),
+                **({"is_cancelled": is_cancelled} if is_cancelled is not None else {}),
+            )
+        observe("turn.ttft", time.perf_counter() - started)
+        
+        response = completion.choices[0].message.content
+        finish_reason = completion.choices[0].finish_reason
+        if usage is not None:
+            usage["finish_reason"] = finish_reason
+            if getattr(completion, "usage", None) is not None:
+                usage["prompt_tokens"] = completion.usage.prompt_tokens
+                usage["completion_tokens"] = completion.usage.completion_tokens
+        
+        # Cache the response
+        if cache_key and finish_reason != "length":
+            stored = response
+            store_cached_response(cache_key, response, cache_keys)
+    finally:
+        if leading:
+            get_response_cache().settle(cache_key, stored)
+    
+    return response
+
+
+def validate_input(user_input: str) -> tuple[bool, str]:
+    """
+    Validate user input and return (is_valid, cleaned_input or error_message).
+    """
+    if not user_input:
+        return False, "Please enter a message."
+    
+    cleaned = user_input.strip()
+    
+    if len(cleaned) < 1:
+        return False, "Please enter a message."
+    
+    if len(cleaned) > 5000:
+        return False, "Message too long. Please keep it under 5000 characters."
+    
+    return True, cleaned
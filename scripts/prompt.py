@@ -1,3 +1,5 @@
+import os
+
 # instruction = (
 #     "You are TalentScout, an AI hiring assistant for a tech recruitment agency.\n"
 #     "\n"
@@ -37,7 +39,7 @@
 #     "  - End the conversation and DO NOT ASK FURTHER QUESTIONS.\n"
 # )
 
-instruction = (
+base_instruction = (
     "You are TalentScout, an AI hiring assistant for a tech recruitment agency.\n"
     "\n"
     "YOUR JOB:\n"
@@ -74,19 +76,54 @@ instruction = (
     "  - Thank them for their time.\n"
     "  - Mention that TalentScout will review their details and contact them about next steps.\n"
     "  - End the conversation and DO NOT ASK FURTHER QUESTIONS.\n"
-    "\n"
-    "METADATA TRACKING (INTERNAL - DO NOT MENTION TO USER):\n"
-    "At the end of every response, append a line starting with METADATA: followed by a single JSON object with these boolean fields:\n"
-    "- name: true if the candidate's full name has been collected\n"
-    "- contact: true if email AND phone number have been collected\n"
-    "- location: true if current location has been collected\n"
-    "- experience: true if years of experience has been collected\n"
-    "- position: true if desired position(s) have been collected\n"
-    "- tech_stack: true if tech stack has been collected\n"
-    "- questions: true if you have asked AND received answers to at least 3 technical questions\n"
-    "\n"
-    "Example format (place at end of your response):\n"
-    "METADATA: {\"name\": true, \"contact\": false, \"location\": false, \"experience\": false, \"position\": false, \"tech_stack\": false, \"questions\": false}\n"
-    "\n"
-    "IMPORTANT: Do NOT mention the metadata to the user. It is for internal tracking only.\n"
 )
+
+# One rule per METADATA field the model may be asked to report
+METADATA_FIELD_RULES = {
+    "name": "- name: true if the candidate's full name has been collected\n",
+    "contact": "- contact: true if email AND phone number have been collected\n",
+    "location": "- location: true if current location has been collected\n",
+    "experience": "- experience: true if years of experience has been collected\n",
+    "position": "- position: true if desired position(s) have been collected\n",
+    "tech_stack": "- tech_stack: true if tech stack has been collected\n",
+    "questions": "- questions: true if you have asked AND received answers to at least 3 technical questions\n",
+}
+
+# Which fields the model reports in its METADATA trailer. The local profile
+# extractor (extractor.py) fills in the rest. "partial" asks for the fields
+# the model judges better than the extractor's heuristics (free-form name,
+# location and experience answers, and the technical questions); "full" is
+# the original behaviour.
+METADATA_MODES = {
+    "full": tuple(METADATA_FIELD_RULES),
+    "partial": ("name", "location", "experience", "questions"),
+    "none": (),
+}
+METADATA_MODE = os.environ.get("TALENTSCOUT_METADATA_MODE", "partial")
+METADATA_FIELDS = METADATA_MODES.get(METADATA_MODE, METADATA_MODES["partial"])
+
+
+def build_instruction(metadata_fields=()) -> str:
+    """Return the system prompt, asking for a METADATA trailer with the given fields."""
+    if not metadata_fields:
+        return base_instruction
+
+    example = ", ".join(
+        f'"{field}": {"true" if index == 0 and len(metadata_fields) > 1 else "false"}'
+        for index, field in enumerate(metadata_fields)
+    )
+    return (
+        base_instruction
+        + "\n"
+        + "METADATA TRACKING (INTERNAL - DO NOT MENTION TO USER):\n"
+        + "At the end of every response, append a line starting with METADATA: followed by a single JSON object with these boolean fields:\n"
+        + "".join(METADATA_FIELD_RULES[field] for field in metadata_fields)
+        + "\n"
+        + "Example format (place at end of your response):\n"
+        + "METADATA: {" + example + "}\n"
+        + "\n"
+        + "IMPORTANT: Do NOT mention the metadata to the user. It is for internal tracking only.\n"
+    )
+
+
+instruction = build_instruction(METADATA_FIELDS)
@@ -0,0 +1,233 @@
+"""
+Precomputed technical question bank for TalentScout AI.
+
+Questions are grouped by technology and seniority level in a small JSON index
+(data/question_bank.json by default, TALENTSCOUT_QUESTION_BANK to override).
+Once a candidate's tech stack is known, a plan of questions is sampled from
+the bank and handed to the model, which then only has to ask and evaluate
+them instead of generating them live in every session.
+
+The bank is (re)built offline against any OpenAI-compatible backend; new
+questions are merged in and near-duplicates dropped:
+
+    python question_bank.py build --base-url http://localhost:11434/v1 --model llama3.1 \
+        --techs python,react,kubernetes --per-level 8
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+
+from extractor import REQUIRED_ANSWERS
+from semantic_cache import minhash, normalize, shingles, similarity
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BANK_PATH = os.path.join(SCRIPT_DIR, "data", "question_bank.json")
+
+LEVELS = ("junior", "mid", "senior")
+GENERAL = "general"
+
+# "inject" hands the plan to the model; "serve" also asks the first question
+# without a model call when the tech stack is acknowledged
+QUESTION_BANK_MODE = os.environ.get("TALENTSCOUT_QUESTION_BANK_MODE", "inject")
+
+# Questions closer than this (estimated Jaccard) count as duplicates
+DUPLICATE_THRESHOLD = 0.8
+
+# Spellings the profile extractor recognises, mapped to bank keys
+TECHNOLOGY_KEYS = {
+    "golang": "go", "node.js": "node", "nodejs": "node", "express": "node",
+    "postgres": "postgresql", "sql": "postgresql", "mysql": "postgresql",
+    "k8s": "kubernetes", "next.js": "react", "nextjs": "react", "react native": "react",
+}
+
+GENERATION_PROMPT = (
+    "Write {count} distinct technical interview questions that assess a {level}-level "
+    "candidate's practical knowledge of {tech}. Each question must be a single sentence "
+    "ending with a question mark. Reply with a JSON array of strings and nothing else."
+)
+
+
+def level_for_years(years: float | None) -> str:
+    """Seniority level for a number of years of experience (mid when unknown)."""
+    if years is None:
+        return "mid"
+    if years < 2:
+        return "junior"
+    if years < 6:
+        return "mid"
+    return "senior"
+
+
+def technology_key(tech: str) -> str:
+    return TECHNOLOGY_KEYS.get(tech.lower(), tech.lower())
+
+
+class QuestionBank:
+    """Questions indexed by technology and level; see sample()."""
+
+    def __init__(self, questions: dict | None = None, path: str | None = None):
+        self.questions = questions or {}
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_BANK_PATH) -> "QuestionBank":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("questions", {}), path)
+
+    def save(self, path: str | None = None):
+        """Write the bank atomically."""
+        path = path or self.path or DEFAULT_BANK_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "levels": list(LEVELS), "questions": self.questions}, f,
+                      indent=1, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp_path, path)
+
+    def technologies(self) -> list:
+        return sorted(tech for tech in self.questions if tech != GENERAL)
+
+    def sample(self, tech_stack: list, years: float | None = None, count: int = REQUIRED_ANSWERS,
+               rng: random.Random | None = None) -> list:
+        """
+        Pick `count` questions for a candidate, rotating through the
+        technologies of their stack that the bank covers (in the order they
+        were mentioned) and filling up with general questions.
+        """
+        rng = rng or random.Random()
+        level = level_for_years(years)
+        pools = []
+        for tech in dict.fromkeys(technology_key(tech) for tech in tech_stack):
+            questions = self.questions.get(tech, {}).get(level)
+            if questions:
+                pools.append(rng.sample(questions, len(questions)))
+
+        plan = []
+        while len(plan) < count and any(pools):
+            for pool in pools:
+                if pool and len(plan) < count:
+                    plan.append(pool.pop())
+
+        general = self.questions.get(GENERAL, {}).get(level, [])
+        plan.extend(rng.sample(general, min(len(general), count - len(plan))))
+        return plan
+
+    def merge(self, tech: str, level: str, candidates: list) -> int:
+        """Add new questions, skipping near-duplicates; returns how many were added."""
+        existing = self.questions.setdefault(tech, {}).setdefault(level, [])
+        signatures = [minhash(shingles(normalize(question))) for question in existing]
+        added = 0
+        for question in candidates:
+            question = re.sub(r"\s+", " ", str(question)).strip()
+            if not question.endswith("?"):
+                continue
+            signature = minhash(shingles(normalize(question)))
+            if any(similarity(signature, other) >= DUPLICATE_THRESHOLD for other in signatures):
+                continue
+            existing.append(question)
+            signatures.append(signature)
+            added += 1
+        return added
+
+
+def plan_block(questions: list) -> str:
+    """System-message text handing the sampled questions to the model."""
+    lines = ["TECHNICAL QUESTIONS FOR THIS CANDIDATE (internal):",
+             "Ask these instead of writing your own, one at a time and in this order:"]
+    lines.extend(f"{index}. {question}" for index, question in enumerate(questions, 1))
+    return "\n".join(lines)
+
+
+def first_question_reply(questions: list) -> str:
+    """Reply that acknowledges the stack and asks the first planned question."""
+    return ("Thanks for sharing your tech stack! Let's move on to a few technical questions.\n\n"
+            f"{questions[0]}")
+
+
+_shared_bank = None
+_shared_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank | None:
+    """Return the process-wide question bank, or None if no bank file exists."""
+    global _shared_bank
+    if _shared_bank is None:
+        with _shared_bank_lock:
+            if _shared_bank is None:
+                path = os.environ.get("TALENTSCOUT_QUESTION_BANK", DEFAULT_BANK_PATH)
+                if not os.path.exists(path):
+                    return None
+                _shared_bank = QuestionBank.load(path)
+    return _shared_bank
+
+
+def generate_questions(client, model_name: str, tech: str, level: str, count: int) -> list:
+    """Ask the backend for `count` questions; returns whatever parses as a list of strings."""
+    completion = client.chat.completions.create(
+        model=model_name,
+        messages=[{"role": "user", "content": GENERATION_PROMPT.format(count=count, level=level, tech=tech)}],
+        temperature=0.9,
+        max_tokens=80 * count,
+    )
+    reply = completion.choices[0].message.content or ""
+    start = reply.find("[")
+    if start == -1:
+        return []
+    try:
+        questions, _ = json.JSONDecoder().raw_decode(reply[start:])
+    except json.JSONDecodeError:
+        return []
+    return [question for question in questions if isinstance(question, str)]
+
+
+def build(client, model_name: str, techs: list, per_level: int, path: str, rounds: int = 2):
+    """Generate questions for every technology and level and merge them into the bank."""
+    bank = QuestionBank.load(path) if os.path.exists(path) else QuestionBank(path=path)
+    for tech in techs:
+        for level in LEVELS:
+            added = 0
+            for _ in range(rounds):
+                have = len(bank.questions.get(tech, {}).get(level, []))
+                if have >= per_level:
+                    break
+                added += bank.merge(tech, level, generate_questions(client, model_name, tech, level, per_level - have))
+            print(f"{tech:<14} {level:<7} +{added}")
+    bank.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the technical question bank.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="generate questions and merge them into the bank")
+    build_parser.add_argument("--base-url", default="http://localhost:11434/v1")
+    build_parser.add_argument("--model", default="llama3.1")
+    build_parser.add_argument("--techs", help="comma-separated technologies (default: those already in the bank)")
+    build_parser.add_argument("--per-level", type=int, default=8, help="questions to keep per technology and level")
+    build_parser.add_argument("--path", default=DEFAULT_BANK_PATH)
+
+    stats_parser = subparsers.add_parser("stats", help="print how many questions each technology has")
+    stats_parser.add_argument("--path", default=DEFAULT_BANK_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from client import BackendClient
+        techs = [technology_key(tech.strip()) for tech in args.techs.split(",")] if args.techs else None
+        if techs is None:
+            techs = QuestionBank.load(args.path).technologies() + [GENERAL]
+        build(BackendClient(args.base_url), args.model, techs, args.per_level, args.path)
+    else:
+        bank = QuestionBank.load(args.path)
+        for tech in sorted(bank.questions):
+            counts = "  ".join(f"{level} {len(bank.questions[tech].get(level, []))}" for level in LEVELS)
+            print(f"{tech:<14} {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Headless replay of recorded interviews for TalentScout AI.
+
+Reads candidate scripts from JSONL and drives each one through the
+interview engine (engine.py), the same turn loop as the app and the API,
+with a bounded pool of threads or processes. Results are appended to a JSONL file as interviews finish, so an
+interrupted run picks up where it stopped when started again.
+
+Input, one interview per line (an "id" is optional; the line number is used
+otherwise, and "messages" in chat format is accepted instead of "turns"):
+
+    {"id": "cand-0001", "turns": ["Hi, I'm Priya Shah.", "priya@example.com, 5551234567", ...]}
+
+Usage:
+    python replay.py interviews.jsonl results.jsonl --base-url http://localhost:11434/v1 --workers 8
+    python replay.py interviews.jsonl results.jsonl --fake --processes --workers 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from backend_pool import BackendPool
+from engine import InterviewSession, answer, greet
+
+
+def replay_interview(client, model_name: str, script: list, stream: bool = False,
+                     use_cache: bool = True) -> dict:
+    """
+    Run one interview through the engine: the greeting, then each candidate
+    message until an exit message (answered with the closing) or until the
+    session's token ceiling is used up. A failed turn is recorded and leaves
+    the session as it was. Returns the per-turn transcript, timings, errors,
+    final collected_info, token counters and the InterviewSession.
+    """
+    session = InterviewSession(model_name=model_name)
+    turns, errors = [], []
+
+    def turn(run, shown_content: str | None):
+        started = time.perf_counter()
+        first_token = []
+
+        def on_text(_):
+            if not first_token:
+                first_token.append(time.perf_counter() - started)
+
+        try:
+            display_text = run(on_text)
+        except Exception as e:
+            errors.append({"turn": len(turns), "error": str(e) or type(e).__name__})
+            return
+        latency = time.perf_counter() - started
+        turns.append({
+            "user": shown_content,
+            "reply": display_text,
+            "collected_info": dict(session.collected_info),
+            "latency_s": round(latency, 4),
+            "ttft_s": round(first_token[0] if first_token else latency, 4),
+        })
+
+    turn(lambda on_text: greet(session, client, stream=stream, on_text=on_text, use_cache=use_cache), None)
+    for user_input in script:
+        if session.ended:
+            break
+        turn(lambda on_text: answer(session, client, user_input, stream=stream, on_text=on_text,
+                                    use_cache=use_cache), user_input)
+
+    return {
+        "turns": turns,
+        "errors": errors,
+        "collected_info": session.collected_info,
+        "tokens": session.usage.stats(),
+        "session": session,
+    }
+
+
+def read_interviews(path: str):
+    """Yield (interview_id, script) for every non-empty line of a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            script = record.get("turns")
+            if script is None:
+                script = [m["content"] for m in record.get("messages", []) if m.get("role") == "user"]
+            yield str(record.get("id", f"line-{line_number}")), script
+
+
+def completed_ids(path: str, retry_failed: bool = False) -> set:
+    """Ids already present in an output file (optionally ignoring failed ones)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interrupted run
+            if retry_failed and record.get("errors"):
+                continue
+            done.add(record["id"])
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+# Per-worker state for the pool (one client per thread pool or worker process)
+_worker = {}
+
+
+def _init_worker(base_url: str, model_name: str, stream: bool, use_cache: bool):
+    # Threads of one pool share a single client
+    if _worker.get("base_url") != base_url:
+        _worker.update(client=BackendPool(base_url), base_url=base_url)
+    _worker.update(model_name=model_name, stream=stream, use_cache=use_cache)
+
+
+def _replay_one(interview_id: str, script: list) -> dict:
+    started = time.perf_counter()
+    result = replay_interview(_worker["client"], _worker["model_name"], script,
+                              stream=_worker["stream"], use_cache=_worker["use_cache"])
+    return {
+        "id": interview_id,
+        "model": _worker["model_name"],
+        "turns": result["turns"],
+        "errors": result["errors"],
+        "collected_info": result["collected_info"],
+        "complete": all(result["collected_info"].values()),
+        "tokens": result["tokens"],
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def replay_file(input_path: str, output_path: str, base_url: str, model_name: str, workers: int = 4,
+                processes: bool = False, stream: bool = False, use_cache: bool = False,
+                retry_failed: bool = False) -> dict:
+    """
+    Replay every interview in input_path not yet in output_path. At most
+    2 * workers interviews are in flight, so input of any size streams
+    through. Returns summary counters.
+    """
+    done = completed_ids(output_path, retry_failed)
+    summary = {"replayed": 0, "skipped": 0, "failed": 0, "complete": 0, "turns": 0}
+    pool_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    init_args = (base_url, model_name, stream, use_cache)
+
+    with pool_class(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool, \
+            open(output_path, "a", encoding="utf-8") as out:
+        if out.tell() and not _ends_with_newline(output_path):
+            out.write("\n")  # finish a line cut short by an interrupted run
+        pending = set()
+
+        def drain(return_when):
+            nonlocal pending
+            finished, pending = wait(pending, return_when=return_when)
+            for future in finished:
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                summary["replayed"] += 1
+                summary["failed"] += bool(record["errors"])
+                summary["complete"] += record["complete"]
+                summary["turns"] += len(record["turns"])
+
+        for interview_id, script in read_interviews(input_path):
+            if interview_id in done:
+                summary["skipped"] += 1
+                continue
+            done.add(interview_id)
+            pending.add(pool.submit(_replay_one, interview_id, script))
+            if len(pending) >= 2 * workers:
+                drain(FIRST_COMPLETED)
+        if pending:
+            drain(ALL_COMPLETED)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded interviews through the TalentScout pipeline.")
+    parser.add_argument("input", help="JSONL file of interviews")
+    parser.add_argument("output", help="JSONL results file (appended to; finished interviews are skipped)")
+    parser.add_argument("--base-url", help="OpenAI-compatible backend (comma-separated for several)")
+    parser.add_argument("--fake", action="store_true", help="replay against the bundled fake backend")
+    parser.add_argument("--model", default="llama3.1")
+    parser.add_argument("--workers", type=int, default=4, help="interviews replayed concurrently")
+    parser.add_argument("--processes", action="store_true", help="use worker processes instead of threads")
+    parser.add_argument("--stream", action="store_true", help="use streaming completions")
+    parser.add_argument("--cache", action="store_true", help="allow cached replies (off by default, so every turn is regenerated)")
+    parser.add_argument("--retry-failed", action="store_true", help="replay interviews whose earlier result had errors")
+    args = parser.parse_args()
+
+    if not args.base_url and not args.fake:
+        parser.error("pass --base-url or --fake")
+
+    backend = None
+    base_url = args.base_url
+    if args.fake:
+        from fake_backend import FakeBackend
+        backend = FakeBackend(ttft=0.05, tokens_per_second=200)
+        base_url = backend.start()
+
+    started = time.perf_counter()
+    try:
+        summary = replay_file(args.input, args.output, base_url, args.model, workers=args.workers,
+                              processes=args.processes, stream=args.stream, use_cache=args.cache,
+                              retry_failed=args.retry_failed)
+    finally:
+        if backend is not None:
+            backend.stop()
+
+    elapsed = time.perf_counter() - started
+    print(f"replayed {summary['replayed']} interviews ({summary['turns']} turns) in {elapsed:.1f} s; "
+          f"skipped {summary['skipped']}, with errors {summary['failed']}, "
+          f"profile complete {summary['complete']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Pre-generated greetings and closings for TalentScout AI.
+
+The greeting context (system prompt plus greeting prompt) is the same for
+every session, and so is the goodbye once the candidate asks to leave. A
+background thread keeps a small pool of distinct replies per model for both,
+so a session pops one instead of waiting for a model round trip, and a batch
+of candidates opening their links at once no longer hits the backend
+together.
+
+Refills are low priority: one generation at a time, only while the backend
+has at most REFILL_MAX_OUTSTANDING requests in flight, and at most
+REFILL_PER_MINUTE generations per minute. Closings are generated without
+the conversation, which the exit prompt does not need.
+
+  TALENTSCOUT_REPLY_POOL_SIZE      replies kept per model and kind (default 8, 0 disables)
+  TALENTSCOUT_REPLY_POOL_RATE      refill generations per minute (default 20)
+  TALENTSCOUT_REPLY_POOL_IDLE      outstanding backend requests above which refills wait (default 1)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from budgets import get_token_ledger, output_budget
+from context import estimate_tokens
+from pipeline import parse_metadata_and_clean_reply, sampling_params
+
+POOL_SIZE = int(os.environ.get("TALENTSCOUT_REPLY_POOL_SIZE", 8))
+REFILL_PER_MINUTE = float(os.environ.get("TALENTSCOUT_REPLY_POOL_RATE", 20))
+REFILL_MAX_OUTSTANDING = int(os.environ.get("TALENTSCOUT_REPLY_POOL_IDLE", 1))
+BUSY_BACKOFF = 1.0
+RETRY_AFTER = 30
+
+# Used when the closing pool is empty, so ending an interview never waits for the model
+FALLBACK_CLOSING = ("Thank you for your time! TalentScout will review your details and get in touch "
+                    "about next steps. Goodbye!")
+
+
+class ReplyPool:
+    """
+    Pools of (raw_reply, display_text, metadata) per (model, kind). Call
+    ensure() for the models sessions will use and pop() at session start or
+    exit; the refill thread keeps every pool at `size`.
+    """
+
+    def __init__(self, client, system_prompt: str, prompts: dict, size: int = POOL_SIZE,
+                 per_minute: float = REFILL_PER_MINUTE, max_outstanding: int = REFILL_MAX_OUTSTANDING):
+        self.client = client
+        self.system_prompt = system_prompt
+        self.prompts = prompts  # turn type (GREETING or CLOSING) -> control prompt
+        self.size = size
+        self.min_interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.max_outstanding = max_outstanding
+
+        self._pools = {}
+        self._failed_at = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+
+    def start(self):
+        """Start the background refill thread."""
+        if self._thread is None and self.size > 0:
+            self._thread = threading.Thread(target=self._run, name="talentscout-reply-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def ensure(self, model: str, kind: str):
+        """Keep a pool of `kind` replies for `model` from now on."""
+        if self.size <= 0:
+            return
+        with self._lock:
+            if (model, kind) in self._pools:
+                return
+            self._pools[(model, kind)] = deque()
+        self._wake.set()
+
+    def pop(self, model: str, kind: str) -> tuple | None:
+        """Take a pre-generated reply, or None if the pool is empty (it is then refilled)."""
+        self.ensure(model, kind)
+        with self._lock:
+            pool = self._pools.get((model, kind))
+            entry = pool.popleft() if pool else None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._wake.set()
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pools": {f"{kind}:{model}": len(pool) for (model, kind), pool in self._pools.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "generated": self.generated,
+            }
+
+    def generate(self, model: str, kind: str) -> tuple | None:
+        """Generate one reply; returns None if it has no displayable text."""
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.prompts[kind]},
+        ]
+        completion = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **sampling_params(output_budget(kind)),
+        )
+        raw_reply = completion.choices[0].message.content or ""
+        usage = getattr(completion, "usage", None)
+        # Pool refills are not part of any session, only of the process totals
+        get_token_ledger().record(
+            kind,
+            usage.prompt_tokens if usage is not None else sum(estimate_tokens(m["content"]) for m in messages),
+            usage.completion_tokens if usage is not None else estimate_tokens(raw_reply),
+            truncated=completion.choices[0].finish_reason == "length",
+        )
+        display_text, metadata = parse_metadata_and_clean_reply(raw_reply)
+        if not display_text.strip():
+            return None
+        return raw_reply, display_text, metadata
+
+    def _most_needed(self):
+        now = time.time()
+        with self._lock:
+            short = [(len(pool), key) for key, pool in self._pools.items()
+                     if len(pool) < self.size and now - self._failed_at.get(key, 0) >= RETRY_AFTER]
+        return min(short)[1] if short else None
+
+    def _backend_busy(self) -> bool:
+        endpoints = getattr(self.client, "endpoints", None)
+        if endpoints is None:
+            return False
+        return sum(endpoint.outstanding for endpoint in endpoints) > self.max_outstanding
+
+    def _run(self):
+        last_started = 0.0
+        while not self._stop.is_set():
+            key = self._most_needed()
+            if key is None:
+                self._wake.wait(RETRY_AFTER)
+                self._wake.clear()
+                continue
+            if self._backend_busy():
+                self._stop.wait(BUSY_BACKOFF)
+                continue
+            wait = last_started + self.min_interval - time.monotonic()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+
+            last_started = time.monotonic()
+            try:
+                entry = self.generate(*key)
+            except Exception:
+                with self._lock:
+                    self._failed_at[key] = time.time()
+                continue
+            if entry is not None:
+                with self._lock:
+                    self._pools[key].append(entry)
+                    self.generated += 1
@@ -0,0 +1,113 @@
+"""
+Per-turn model routing for TalentScout AI.
+
+Most of an interview is form-filling: greeting the candidate, collecting
+contact details, answering "what do you mean?" and saying goodbye. Those
+turns can go to a small, fast model, and only technical questioning (asking,
+evaluating and following up on answers) needs the model picked in the
+sidebar. The turn type comes from turns.classify_turn.
+
+Policy (environment):
+  TALENTSCOUT_SMALL_MODEL    model for the cheap turn types (greeting, closing,
+                             collecting, clarification); unset keeps every turn
+                             on the selected model
+  TALENTSCOUT_MODEL_ROUTES   explicit routes that override the above, e.g.
+                             "collecting=llama3.2:3b,stack_ack=llama3.1";
+                             "default" means the selected model
+  TALENTSCOUT_MODEL_COSTS    relative cost per 1K tokens for the counters,
+                             e.g. "llama3.1=1,llama3.2:3b=0.15" (default 1)
+
+Routed models share the session's context window, which is budgeted for the
+selected model; give small models at least that much context.
+"""
+
+import os
+import threading
+
+from turns import CLARIFICATION, CLOSING, COLLECTING, GREETING, TURN_TYPES
+
+DEFAULT = "default"
+CHEAP_TURNS = (GREETING, CLOSING, COLLECTING, CLARIFICATION)
+
+
+def parse_assignments(spec: str) -> dict:
+    """Parse "key=value,key=value" into a dict, skipping malformed items."""
+    assignments = {}
+    for item in spec.split(","):
+        key, _, value = item.partition("=")
+        if key.strip() and value.strip():
+            assignments[key.strip()] = value.strip()
+    return assignments
+
+
+class ModelRouter:
+    """
+    Maps a turn type to the model that should answer it and keeps per-route
+    counters (turns, answers served without a model call, latency, estimated
+    tokens and relative cost).
+    """
+
+    def __init__(self, routes: dict | None = None, costs: dict | None = None):
+        unknown = set(routes or {}) - set(TURN_TYPES)
+        if unknown:
+            raise ValueError(f"unknown turn types in model routes: {', '.join(sorted(unknown))}")
+        self.routes = {turn_type: model for turn_type, model in (routes or {}).items() if model != DEFAULT}
+        self.costs = costs or {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def route(self, turn_type: str | None, default_model: str) -> str:
+        """The model for a turn of this type; the selected model when no route applies."""
+        return self.routes.get(turn_type, default_model)
+
+    def models(self) -> list:
+        """Models that routes send turns to (besides the selected one)."""
+        return sorted(set(self.routes.values()))
+
+    def record(self, turn_type: str | None, model: str, latency: float, prompt_tokens: int = 0,
+               completion_tokens: int = 0, cached: bool = False):
+        """Count one answered turn. Cached answers cost nothing."""
+        cost = 0.0 if cached else (prompt_tokens + completion_tokens) / 1000 * float(self.costs.get(model, 1))
+        with self._lock:
+            counters = self._counters.setdefault((turn_type or "unknown", model), {
+                "turns": 0, "cached": 0, "latency_s": 0.0, "max_latency_s": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0,
+            })
+            counters["turns"] += 1
+            counters["cached"] += cached
+            counters["latency_s"] += latency
+            counters["max_latency_s"] = max(counters["max_latency_s"], latency)
+            counters["prompt_tokens"] += prompt_tokens
+            counters["completion_tokens"] += completion_tokens
+            counters["cost"] += cost
+
+    def stats(self) -> dict:
+        """Counters per "turn_type→model" route, with the mean latency."""
+        with self._lock:
+            report = {}
+            for (turn_type, model), counters in sorted(self._counters.items()):
+                route = dict(counters)
+                route["mean_latency_s"] = route.pop("latency_s") / route["turns"]
+                report[f"{turn_type}→{model}"] = route
+            return report
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+_shared_router = None
+_shared_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide router, configured from the environment (see module docstring)."""
+    global _shared_router
+    if _shared_router is None:
+        with _shared_router_lock:
+            if _shared_router is None:
+                small_model = os.environ.get("TALENTSCOUT_SMALL_MODEL", "").strip()
+                routes = dict.fromkeys(CHEAP_TURNS, small_model) if small_model else {}
+                routes.update(parse_assignments(os.environ.get("TALENTSCOUT_MODEL_ROUTES", "")))
+                _shared_router = ModelRouter(routes, parse_assignments(os.environ.get("TALENTSCOUT_MODEL_COSTS", "")))
+    return _shared_router
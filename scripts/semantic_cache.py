@@ -0,0 +1,304 @@
+"""
+Near-duplicate response cache for TalentScout AI.
+
+The exact-match cache (cache.py) only hits when two contexts are identical,
+which candidate answers almost never are. This second tier matches turns by
+meaning instead: the candidate's message is normalized (known profile
+values and emails replaced by placeholders, stop words dropped; numbers are
+kept, so "5 years" and "12 years" never match),
+sketched with MinHash over word shingles, and looked up in an LSH index.
+A cached reply is reused when the estimated Jaccard similarity reaches the
+threshold and the scope matches exactly (model, turn type, interview stage,
+and for stack turns the tech stack).
+
+Only well-defined turn types are eligible (see turns.py), replies that
+mention the candidate's own details or repeat a value from their message
+are never stored, and a sample of hits
+is verified against the backend to estimate precision.
+"""
+
+import hashlib
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from turns import CLARIFICATION, COLLECTING, STACK_ACK
+
+# MinHash signature length and LSH banding (BANDS * ROWS == NUM_PERM)
+NUM_PERM = 64
+BANDS = 16
+ROWS = 4
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 64) - 1
+
+
+def _permutations() -> list:
+    seed = hashlib.sha256(b"talentscout-minhash").digest()
+    params = []
+    for index in range(NUM_PERM):
+        block = hashlib.sha256(seed + struct.pack(">I", index)).digest()
+        a, b = struct.unpack(">QQ", block[:16])
+        params.append((a % (_PRIME - 1) + 1, b % _PRIME))
+    return params
+
+
+PERMUTATIONS = _permutations()
+
+STOP_WORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "so", "i", "i'm", "im", "my", "me", "we", "you", "your",
+    "is", "am", "are", "was", "be", "been", "it", "its", "it's", "to", "of", "in", "on", "at", "for",
+    "with", "as", "by", "from", "that", "this", "have", "has", "had", "do", "does", "did", "um", "uh",
+    "well", "yeah", "yes", "ok", "okay", "sure", "also", "really", "just", "like", "about",
+})
+
+# Spellings of the same technology, so "Node.js" and "node" sketch alike
+ALIASES = {
+    "node.js": "node", "nodejs": "node", "reactjs": "react", "react.js": "react", "vue.js": "vue",
+    "golang": "go", "postgres": "postgresql", "k8s": "kubernetes", "nextjs": "next.js", "js": "javascript",
+    "ts": "typescript", "yrs": "years", "year": "years", "yr": "years",
+}
+
+EMAIL_PATTERN = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+CAPITALIZED_PATTERN = re.compile(r"[A-Z][\w.+#-]{2,}")
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]+")
+TOKEN_PATTERN = re.compile(r"[a-z0-9#+.<>']+")
+
+# Profile facts that identify a candidate; replies mentioning them are never stored
+PRIVATE_FACTS = ("name", "location")
+
+
+def normalize(text: str, facts: dict | None = None) -> list:
+    """Lower-case content words, with the candidate's details replaced by placeholders."""
+    text = text.lower()
+    for fact in PRIVATE_FACTS:
+        value = (facts or {}).get(fact)
+        if isinstance(value, str) and value.strip():
+            text = text.replace(value.lower(), f" <{fact}> ")
+    text = EMAIL_PATTERN.sub(" <email> ", text)
+    tokens = [token.strip(".'") for token in TOKEN_PATTERN.findall(text)]
+    return [ALIASES.get(token, token) for token in tokens if token and token not in STOP_WORDS]
+
+
+def shingles(tokens: list) -> set:
+    """Single words plus adjacent word pairs."""
+    items = set(tokens)
+    items.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return items
+
+
+def minhash(items: set) -> tuple:
+    """MinHash signature of a set of strings."""
+    if not items:
+        return ()
+    hashes = [int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big") for item in items]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) & _MASK for a, b in PERMUTATIONS)
+
+
+def similarity(first: tuple, second: tuple) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not first or not second:
+        return 0.0
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+def message_values(message: str) -> set:
+    """
+    The values a candidate's message gives: numbers, and capitalized words
+    that do not start a sentence (employers, places, names), lower-cased.
+    """
+    values = set(NUMBER_PATTERN.findall(message))
+    for sentence in SENTENCE_PATTERN.findall(message):
+        words = sentence.split()
+        for word in words[1:]:
+            if CAPITALIZED_PATTERN.fullmatch(word.strip(",;:'\"()")):
+                values.add(word.strip(",;:'\"()").lower())
+    return values
+
+
+def mentions_private_facts(reply: str, facts: dict | None, message: str | None = None) -> bool:
+    """
+    True if the reply repeats the candidate's name, location, an email
+    address or a value from their `message` (see message_values). The tech
+    stack is part of the scope of stack turns, so it may be repeated.
+    """
+    lowered = reply.lower()
+    for fact in PRIVATE_FACTS:
+        value = (facts or {}).get(fact)
+        if not isinstance(value, str):
+            continue
+        parts = [value] + (value.split() if fact == "name" else [])
+        if any(len(part) > 2 and part.lower() in lowered for part in parts):
+            return True
+    if message:
+        stack = {tech.lower() for tech in (facts or {}).get("tech_stack", [])}
+        if any(re.search(rf"\b{re.escape(value)}\b", lowered) for value in message_values(message) - stack):
+            return True
+    return bool(EMAIL_PATTERN.search(reply))
+
+
+class SemanticCache:
+    """
+    MinHash/LSH cache of replies. `scope` must match exactly; the sketched
+    text must reach `threshold` estimated Jaccard similarity.
+    """
+
+    def __init__(self, threshold: float = 0.7, max_entries: int = 5000, ttl: float = 3600.0,
+                 verify_rate: float = 0.05, turn_types=(COLLECTING, CLARIFICATION, STACK_ACK)):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.verify_rate = verify_rate
+        self.turn_types = frozenset(turn_types)
+
+        self._entries = OrderedDict()  # entry_id -> (scope, signature, reply, expires_at)
+        self._buckets = {}             # (scope, band, band_hash) -> set of entry ids
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.skipped_private = 0
+        self.evictions = 0
+        self.verified = 0
+        self.agreed = 0
+
+    def eligible(self, turn_type: str) -> bool:
+        return turn_type in self.turn_types
+
+    def sketch(self, text: str, facts: dict | None = None) -> tuple:
+        return minhash(shingles(normalize(text, facts)))
+
+    def get(self, scope: tuple, signature: tuple) -> tuple | None:
+        """Return (entry_id, reply) of the most similar entry in scope, or None."""
+        if not signature:
+            return None
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band, band_hash in self._bands(signature):
+                candidates |= self._buckets.get((scope, band, band_hash), set())
+
+            best_id, best_score = None, self.threshold
+            for entry_id in candidates:
+                _, entry_signature, _, expires_at = self._entries[entry_id]
+                if expires_at <= now:
+                    continue
+                score = similarity(signature, entry_signature)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return best_id, self._entries[best_id][2]
+
+    def set(self, scope: tuple, signature: tuple, reply: str, facts: dict | None = None,
+            message: str | None = None) -> str | None:
+        """
+        Store a reply and return its entry id; replies with personal details
+        or values from the candidate's `message` are skipped.
+        """
+        if not signature or not reply.strip():
+            return None
+        if mentions_private_facts(reply, facts, message):
+            with self._lock:
+                self.skipped_private += 1
+            return None
+
+        entry_id = hashlib.sha256(repr((scope, signature)).encode()).hexdigest()
+        with self._lock:
+            if entry_id in self._entries:
+                self._remove(entry_id)
+            self._entries[entry_id] = (scope, signature, reply, time.time() + self.ttl)
+            for band, band_hash in self._bands(signature):
+                self._buckets.setdefault((scope, band, band_hash), set()).add(entry_id)
+            self.stores += 1
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry_id
+
+    def discard(self, entry_id: str):
+        with self._lock:
+            if entry_id in self._entries:
+                self._remove(entry_id)
+
+    def record_verification(self, cached_reply: str, fresh_reply: str) -> bool:
+        """Compare a cached reply with a freshly generated one; returns whether they agree."""
+        agreed = similarity(self.sketch(cached_reply), self.sketch(fresh_reply)) >= self.threshold / 2
+        with self._lock:
+            self.verified += 1
+            self.agreed += agreed
+        return agreed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.lookups = self.hits = self.stores = self.skipped_private = 0
+            self.evictions = self.verified = self.agreed = 0
+
+    def stats(self) -> dict:
+        """Return hit-rate and sampled-precision counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "stores": self.stores,
+                "skipped_private": self.skipped_private,
+                "evictions": self.evictions,
+                "verified": self.verified,
+                "precision": self.agreed / self.verified if self.verified else None,
+            }
+
+    @staticmethod
+    def _bands(signature: tuple):
+        for band in range(BANDS):
+            rows = signature[band * ROWS:(band + 1) * ROWS]
+            yield band, hash(rows)
+
+    def _remove(self, entry_id: str):
+        scope, signature, _, _ = self._entries.pop(entry_id)
+        for band, band_hash in self._bands(signature):
+            bucket = self._buckets.get((scope, band, band_hash))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[(scope, band, band_hash)]
+
+
+_shared_semantic_cache = None
+_shared_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache | None:
+    """
+    Return the process-wide semantic cache, or None when disabled. Configured
+    from TALENTSCOUT_SEMANTIC_CACHE ("0" disables it), _THRESHOLD,
+    _MAX_ENTRIES, _TTL, _VERIFY_RATE and _TURNS (comma-separated turn types).
+    """
+    global _shared_semantic_cache
+    if os.environ.get("TALENTSCOUT_SEMANTIC_CACHE", "1") == "0":
+        return None
+    if _shared_semantic_cache is None:
+        with _shared_semantic_cache_lock:
+            if _shared_semantic_cache is None:
+                turn_types = os.environ.get("TALENTSCOUT_SEMANTIC_TURNS", "")
+                _shared_semantic_cache = SemanticCache(
+                    threshold=float(os.environ.get("TALENTSCOUT_SEMANTIC_THRESHOLD", 0.7)),
+                    max_entries=int(os.environ.get("TALENTSCOUT_SEMANTIC_MAX_ENTRIES", 5000)),
+                    ttl=float(os.environ.get("TALENTSCOUT_SEMANTIC_TTL", 3600)),
+                    verify_rate=float(os.environ.get("TALENTSCOUT_SEMANTIC_VERIFY_RATE", 0.05)),
+                    **({"turn_types": [t.strip() for t in turn_types.split(",") if t.strip()]} if turn_types else {}),
+                )
+    return _shared_semantic_cache
@@ -0,0 +1,187 @@
+"""
+Interview session state for the HTTP API (api.py).
+
+API workers keep no interview in memory between requests: each request
+loads the session's state (InterviewSession.to_state, see engine.py) from
+the store, runs the turn and writes it back. Any worker can then serve any
+request, and workers can be added, removed or restarted freely.
+
+Writes are optimistic: put() names the version it read and fails with
+SessionConflict when another request wrote the session in between, so two
+concurrent turns on one interview cannot silently overwrite each other.
+Sessions not written for TALENTSCOUT_SESSION_TTL seconds are dropped.
+
+  TALENTSCOUT_SESSION_STORE   "memory" (default; one process only) or
+                              "sqlite:///path/to/sessions.db" (shared by the
+                              workers of one host)
+  TALENTSCOUT_SESSION_TTL     idle seconds before a session expires (default 86400)
+
+The SQLite store stands in for a networked key-value store (Redis, a SQL
+database); another backend only needs get, put and delete with the same
+versioning.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SESSION_TTL = float(os.environ.get("TALENTSCOUT_SESSION_TTL", 24 * 3600))
+# Expired sessions are purged at most this often, on writes
+PURGE_INTERVAL = 60.0
+
+
+class SessionConflict(Exception):
+    """The session was written by another request since it was read."""
+
+
+class MemorySessionStore:
+    """Sessions in a dict of this process. For a single worker and for tests."""
+
+    def __init__(self, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._last_purge = time.monotonic()
+
+    def get(self, session_id: str) -> tuple | None:
+        """Return (state, version), or None for unknown or expired sessions."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.monotonic() - entry[2] > self.ttl:
+                return None
+            # A copy, so callers cannot change the stored state in place
+            return json.loads(entry[0]), entry[1]
+
+    def put(self, session_id: str, state: dict, version: int = 0) -> int:
+        """
+        Store state if the session is still at `version` (0 for a new
+        session). Returns the new version; raises SessionConflict otherwise.
+        """
+        data = json.dumps(state)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            current = entry[1] if entry is not None and now - entry[2] <= self.ttl else 0
+            if current != version:
+                raise SessionConflict(session_id)
+            self._sessions[session_id] = (data, version + 1, now)
+            if now - self._last_purge > PURGE_INTERVAL:
+                self._purge(now)
+        return version + 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _purge(self, now: float):
+        self._last_purge = now
+        for session_id in [sid for sid, entry in self._sessions.items() if now - entry[2] > self.ttl]:
+            del self._sessions[session_id]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite file in WAL mode, shared by every worker process
+    on the host. Each thread uses its own connection.
+    """
+
+    def __init__(self, path: str, ttl: float = SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._last_purge = 0.0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, "
+                "version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, session_id: str) -> tuple | None:
+        """Return (state, version), or None for unknown or expired sessions."""
+        row = self._connection().execute(
+            "SELECT state, version FROM sessions WHERE session_id = ? AND updated_at > ?",
+            (session_id, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, session_id: str, state: dict, version: int = 0) -> int:
+        """
+        Store state if the session is still at `version` (0 for a new
+        session). Returns the new version; raises SessionConflict otherwise.
+        """
+        data = json.dumps(state)
+        now = time.time()
+        with self._connection() as connection:
+            if version == 0:
+                # An expired session with the same id may still be on disk
+                connection.execute("DELETE FROM sessions WHERE session_id = ? AND updated_at <= ?",
+                                   (session_id, now - self.ttl))
+                try:
+                    connection.execute(
+                        "INSERT INTO sessions (session_id, state, version, updated_at) VALUES (?, ?, 1, ?)",
+                        (session_id, data, now),
+                    )
+                except sqlite3.IntegrityError:
+                    raise SessionConflict(session_id) from None
+            else:
+                updated = connection.execute(
+                    "UPDATE sessions SET state = ?, version = version + 1, updated_at = ? "
+                    "WHERE session_id = ? AND version = ? AND updated_at > ?",
+                    (data, now, session_id, version, now - self.ttl),
+                ).rowcount
+                if not updated:
+                    raise SessionConflict(session_id)
+            if now - self._last_purge > PURGE_INTERVAL:
+                self._last_purge = now
+                connection.execute("DELETE FROM sessions WHERE updated_at <= ?", (now - self.ttl,))
+        return version + 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._connection() as connection:
+            return connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def open_session_store(url: str, ttl: float = SESSION_TTL):
+    """Open the store a TALENTSCOUT_SESSION_STORE value names."""
+    if url in ("", "memory"):
+        return MemorySessionStore(ttl)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):], ttl)
+    raise ValueError(f"unknown session store {url!r} (use 'memory' or 'sqlite:///path')")
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the process-wide session store configured by TALENTSCOUT_SESSION_STORE."""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = open_session_store(os.environ.get("TALENTSCOUT_SESSION_STORE", "memory"))
+    return _shared_store
@@ -1,43 +1,41 @@
 
 
+import cProfile
+import os
 import streamlit as st
-from openai import OpenAI
+from backend_pool import BackendPool
+from routing import get_model_router
+from reply_pool import ReplyPool
+from turns import CLOSING, GREETING
+from metrics import profile_report, profiled, span, stage_percentiles, start_metrics_server, timed
+from warmup import ModelWarmer, STATUS_LABELS
 from prompt import instruction
+from history import ConversationHistory, Message
+from engine import close, greet, save_transcript
+from pipeline import MODEL_NAMES, get_exit_prompt, get_initial_greeting_prompt, is_exit_intent, validate_input
 from functions import (
-    completion_func, 
-    get_initial_greeting_prompt, 
-    get_exit_prompt, 
-    is_exit_intent, 
-    build_sanitized_history,
     init_input_queue,
     add_to_queue,
-    get_next_from_queue,
     has_pending_inputs,
-    validate_input,
-    is_processing,
-    set_processing,
-    efficient_completion,
+    get_interview_session,
+    get_session_usage,
+    get_input_worker,
+    get_transcript_renderer,
+    collect_finished_turns,
+    forget_everything,
+    record_saved,
     clear_queue
 )
 from styles import get_app_styles
-import time
-import json
-import re
-import base64
-import os
-
-def get_logo_base64():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    logo_path = os.path.join(script_dir, "..", "logo.png")
-    try:
-        with open(logo_path, "rb") as f:
-            return base64.b64encode(f.read()).decode()
-    except FileNotFoundError:
-        return None
+from assets import build_assets
+from transcript_store import get_transcript_store
+from transcript import VISIBLE_PAGES, render_bubble
 
-logo_base64 = get_logo_base64()
-logo_html_sidebar = f'<img src="data:image/png;base64,{logo_base64}" style="width: 10rem; height: 10rem; object-fit: contain;">' if logo_base64 else "🎯"
-logo_html_header = f'<img src="data:image/png;base64,{logo_base64}" style="width: 7rem; height: 7rem; object-fit: contain;">' if logo_base64 else "🎯"
+# Logo thumbnail and minified stylesheet, built once per process and
+# referenced by URL so reruns do not resend them
+@st.cache_resource
+def get_assets():
+    return build_assets(get_app_styles(), static_serving=st.get_option("server.enableStaticServing"))
 
 # Page configuration
 st.set_page_config(
@@ -47,13 +45,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown(get_app_styles(), unsafe_allow_html=True)
+assets = get_assets()
+logo_html_sidebar = f'<img src="{assets["logo_src"]}" style="width: 10rem; height: 10rem; object-fit: contain;">' if assets["logo_src"] else "🎯"
+logo_html_header = f'<img src="{assets["logo_src"]}" style="width: 7rem; height: 7rem; object-fit: contain;">' if assets["logo_src"] else "🎯"
+
+st.markdown(assets["styles"], unsafe_allow_html=True)
 
 # Initialize session state
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = [{"role": "system", "content": instruction}]
+    st.session_state.conversation_history = ConversationHistory([{"role": "system", "content": instruction}])
 if "initialized" not in st.session_state:
     st.session_state.initialized = False
 if "conversation_ended" not in st.session_state:
@@ -71,6 +73,37 @@ if "collected_info" not in st.session_state:
 
 init_input_queue()
 
+# Initialize backend pool (shared by all sessions, pooled connections, health-checked)
+@st.cache_resource
+def get_client(base_url):
+    return BackendPool(base_url, api_key="LAMBA")
+
+# Preload models and keep them resident (one warmer per backend endpoint)
+@st.cache_resource
+def get_model_warmers(base_url):
+    models = MODEL_NAMES + [m for m in get_model_router().models() if m not in MODEL_NAMES]
+    return [
+        ModelWarmer(endpoint.base_url, endpoint.client, [m for m in models if endpoint.serves(m)],
+                    instruction, get_initial_greeting_prompt()).start()
+        for endpoint in get_client(base_url).endpoints
+    ]
+
+# Prometheus endpoint for the stage histograms (TALENTSCOUT_METRICS_PORT), once per process
+@st.cache_resource
+def get_metrics_server():
+    try:
+        return start_metrics_server()
+    except OSError:
+        return None  # another process on this host already serves the port
+
+get_metrics_server()
+
+# Pre-generated greetings and closings, refilled in the background
+@st.cache_resource
+def get_reply_pool(base_url):
+    prompts = {GREETING: get_initial_greeting_prompt(), CLOSING: get_exit_prompt()}
+    return ReplyPool(get_client(base_url), instruction, prompts).start()
+
 # Sidebar
 with st.sidebar:
     st.markdown(f"""
@@ -86,8 +119,29 @@ with st.sidebar:
     # Connection settings
     st.markdown('<div class="sidebar-card"><h3>⚙️ Connection Settings</h3></div>', unsafe_allow_html=True)
     
-    base_url = st.text_input("API Base URL", value="http://localhost:11434/v1", help="Your Ollama or OpenAI-compatible API endpoint")
-    model_name = st.selectbox("Model", ["llama3.1", "llama3", "mistral", "codellama"], help="Select the LLM model to use")
+    base_url = st.text_input("API Base URL", value="http://localhost:11434/v1", help="Your Ollama or OpenAI-compatible API endpoint; separate several with commas")
+    model_name = st.selectbox("Model", MODEL_NAMES, help="Select the LLM model to use")
+    stream_replies = st.toggle("Stream replies", value=True, help="Show the reply word by word as the model writes it")
+    
+    # Keep the selected model loaded on every backend that serves it
+    statuses = []
+    for warmer in get_model_warmers(base_url):
+        # Models that cheap turns are routed to stay warm alongside it
+        for routed_model in get_model_router().models():
+            if routed_model in warmer.status:
+                warmer.mark_used(routed_model)
+        if model_name in warmer.status:
+            warmer.mark_used(model_name)
+            statuses.append(warmer.status[model_name])
+    model_status = next((status for status in ("ready", "warming", "cold") if status in statuses), "error")
+    serving = [endpoint for endpoint in get_client(base_url).endpoints if endpoint.serves(model_name)]
+    backends = f" · {sum(e.healthy for e in serving)}/{len(serving)} backends up" if len(serving) > 1 else ""
+    st.markdown(f'<p style="color: rgba(255,255,255,0.75); font-size: 0.85rem; margin: 0;">Model status: {STATUS_LABELS[model_status]}{backends}</p>', unsafe_allow_html=True)
+    
+    # Keep greetings and closings ready for the models those turns are routed to
+    reply_pool = get_reply_pool(base_url)
+    for turn_type in (GREETING, CLOSING):
+        reply_pool.ensure(get_model_router().route(turn_type, model_name), turn_type)
     
     st.markdown('<hr>', unsafe_allow_html=True)
     
@@ -116,37 +170,68 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🔄 Reset", use_container_width=True):
+            clear_queue()
             st.session_state.messages = []
-            st.session_state.conversation_history = [{"role": "system", "content": instruction}]
+            st.session_state.transcript_pages = VISIBLE_PAGES
+            st.session_state.conversation_history = ConversationHistory([{"role": "system", "content": instruction}])
             st.session_state.initialized = False
             st.session_state.conversation_ended = False
             st.session_state.collected_info = {k: False for k in st.session_state.collected_info}
+            st.session_state.pop("session_id", None)
+            st.session_state.pop("token_usage", None)
             st.rerun()
     
     with col2:
         if st.button("👋 End", use_container_width=True):
             if not st.session_state.conversation_ended:
                 st.session_state.conversation_ended = True
-                clear_queue()
+                clear_queue(wait=True)
                 st.rerun()
     
     if st.button("🧽 Delete my data", use_container_width=True):
+        forget_everything(model_name)
         st.session_state.clear()
         st.rerun()
     
+    # Saving is opt-in for the candidate, and only offered when the operator enabled a store
+    transcript_store = get_transcript_store()
+    if transcript_store is not None:
+        st.checkbox("💾 Save my interview for the recruiter", key="save_transcript",
+                    help="Stored encrypted when the interview ends. Delete my data erases it.")
+    
     st.markdown('<hr>', unsafe_allow_html=True)
     
-    st.markdown("""
+    st.markdown(f"""
     <div class="sidebar-card">
         <h3>📊 Session Stats</h3>
         <p style="font-size: 0.85rem; color: rgba(255,255,255,0.75);">
             • Your answers are used only to conduct this interview.<br>
-            • We do not persist your data after the session.<br>
+            • {"Your interview is saved for the recruiter only if you tick the box above." if transcript_store is not None else "We do not persist your data after the session."}<br>
             • You can erase everything instantly with <b>Delete my data</b>.<br>
             • Some text is sent to the selected AI model provider, with emails/phones masked.
         </p>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Operator panel, only with ?operator=<TALENTSCOUT_OPERATOR_TOKEN> in the URL
+    operator_token = os.environ.get("TALENTSCOUT_OPERATOR_TOKEN")
+    if operator_token and st.query_params.get("operator") == operator_token:
+        with st.expander("🛠️ Operator"):
+            rows = ["| Stage | n | p50 ms | p95 ms | p99 ms |", "|---|---:|---:|---:|---:|"]
+            for stage, count, p50, p95, p99 in stage_percentiles():
+                rows.append(f"| {stage} | {count} | {p50 * 1000:.1f} | {p95 * 1000:.1f} | {p99 * 1000:.1f} |")
+            st.markdown("\n".join(rows))
+            usage = get_session_usage()
+            ceiling = f" of {usage.ceiling}" if usage.ceiling else ""
+            st.caption(f"Session tokens: {usage.total}{ceiling} ({usage.prompt_tokens} prompt, "
+                       f"{usage.completion_tokens} completion, {usage.calls} calls, {usage.truncated} truncated)")
+            if st.toggle("Profile this session", key="profile_session", help="cProfile around session start and every turn"):
+                st.session_state.setdefault("profiler", cProfile.Profile())
+                get_input_worker().profiler = st.session_state.profiler
+                st.code(profile_report(st.session_state.profiler), language=None)
+            else:
+                st.session_state.pop("profiler", None)
+                get_input_worker().profiler = None
 
 # Main content
 st.markdown(f"""
@@ -167,80 +252,78 @@ else:
 
 st.markdown("<br>", unsafe_allow_html=True)
 
-# Initialize OpenAI client
-@st.cache_resource
-def get_client(base_url):
-    return OpenAI(base_url=base_url, api_key="LAMBA")
-
 client = get_client(base_url)
 
-# Function to parse metadata from assistant replies
-def parse_metadata_and_clean_reply(raw_reply: str):
-    """
-    Splits the assistant reply into:
-      - display_text: what you show to the user
-      - metadata: dict with booleans or None if missing
-    """
-    metadata = None
-    display_text = raw_reply
-
-    # Look for a line starting with METADATA:
-    match = re.search(r"METADATA:\s*(\{.*\})", raw_reply, re.DOTALL)
-    if match:
-        json_str = match.group(1).strip()
-        try:
-            metadata = json.loads(json_str)
-        except Exception:
-            metadata = None
-
-        # Remove the metadata part from what you show to the user
-        display_text = raw_reply[:match.start()].rstrip()
-
-    return display_text, metadata
-
 # Initialize conversation with greeting
+@timed("session.init")
 def initialize_conversation():
     if not st.session_state.initialized:
         with st.spinner("TalentScout is preparing..."):
-            st.session_state.conversation_history.append({
-                "role": "user",
-                "content": get_initial_greeting_prompt()
-            })
-            
             try:
-                completion = completion_func(client, build_sanitized_history(), model_name)
-                raw_reply = completion.choices[0].message.content
-                display_text, metadata = parse_metadata_and_clean_reply(raw_reply)
-                
-                st.session_state.conversation_history.append({"role": "assistant", "content": raw_reply})
-                st.session_state.messages.append({"role": "assistant", "content": display_text})
-                
-                # Update progress from metadata if present
-                if metadata:
-                    for key in st.session_state.collected_info.keys():
-                        if key in metadata and isinstance(metadata[key], bool):
-                            st.session_state.collected_info[key] = metadata[key]
-                
+                # A pre-generated greeting starts the session without a model call
+                placeholder = st.empty()
+                greet(
+                    get_interview_session(model_name),
+                    client,
+                    reply_pool,
+                    stream=stream_replies,
+                    on_text=lambda text: placeholder.markdown(render_bubble("assistant", text, streaming=True), unsafe_allow_html=True),
+                )
+                # The finished reply is drawn with the rest of the transcript
+                placeholder.empty()
                 st.session_state.initialized = True
             except Exception as e:
                 st.error(f"Connection error: {str(e)}. Please check your API settings.")
                 return False
     return True
 
+# Poll the background worker while a reply is pending
+@st.fragment(run_every=0.3)
+def show_pending_reply():
+    finished = collect_finished_turns()
+    if finished or not get_input_worker().busy:
+        st.session_state.turn_errors = [turn["error"] for turn in finished if turn["error"]]
+        st.rerun()
+    
+    partial_reply = get_input_worker().partial_reply
+    if partial_reply:
+        st.markdown(render_bubble("assistant", partial_reply, streaming=True), unsafe_allow_html=True)
+    else:
+        st.markdown('<div class="assistant-message">🤖 Thinking...</div>', unsafe_allow_html=True)
+
 # Chat display
 chat_container = st.container()
 
 with chat_container:
     # Initialize if needed
     if not st.session_state.initialized:
-        initialize_conversation()
+        with profiled(st.session_state.get("profiler")):
+            initialize_conversation()
     
-    # Display messages
-    for message in st.session_state.messages:
-        if message["role"] == "assistant":
-            st.markdown(f'<div class="assistant-message">🤖 {message["content"]}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div class="user-message">{message["content"]} 👤</div>', unsafe_allow_html=True)
+    # Move finished replies into the transcript before drawing it
+    errors = [turn["error"] for turn in collect_finished_turns() if turn["error"]]
+    for error in errors + st.session_state.pop("turn_errors", []):
+        st.error(f"Error getting response: {error}")
+    
+    # The session's token ceiling is used up: its last reply said goodbye
+    if get_session_usage().exhausted and not st.session_state.conversation_ended:
+        st.session_state.conversation_ended = True
+        st.rerun()
+    
+    # Display messages: only new bubbles are rendered, full pages are sent
+    # as cached blocks, and long transcripts show the most recent pages
+    transcript = get_transcript_renderer()
+    visible_pages = st.session_state.get("transcript_pages", VISIBLE_PAGES)
+    hidden = transcript.hidden_messages(visible_pages)
+    if hidden and st.button(f"⬆️ Show earlier messages ({hidden} hidden)"):
+        st.session_state.transcript_pages = visible_pages + VISIBLE_PAGES
+        st.rerun()
+    with span("render.transcript"):
+        for block in transcript.blocks(visible_pages):
+            st.markdown(block, unsafe_allow_html=True)
+    
+    if has_pending_inputs():
+        show_pending_reply()
 
 # Chat input
 if not st.session_state.conversation_ended:
@@ -252,49 +335,26 @@ if not st.session_state.conversation_ended:
         if not is_valid:
             st.warning(result)
         else:
-            add_to_queue(result)
+            # Add user message
+            st.session_state.messages.append(Message("user", result))
             
-            # Process all queued inputs one by one
-            while has_pending_inputs():
-                current_input = get_next_from_queue()
-                if current_input:
-                    # Add user message
-                    st.session_state.messages.append({"role": "user", "content": current_input})
-                    
-                    # Check for exit intent
-                    if is_exit_intent(current_input):
-                        st.session_state.conversation_history.append({
-                            "role": "user",
-                            "content": get_exit_prompt()
-                        })
-                        st.session_state.conversation_ended = True
-                        clear_queue()
-                        break
-                    else:
-                        st.session_state.conversation_history.append({"role": "user", "content": current_input})
-                    
-                    # Get AI response
-                    try:
-                        with st.spinner("Thinking..."):
-                            sanitized = build_sanitized_history()
-                            raw_reply = efficient_completion(client, sanitized, model_name)
-                            display_text, metadata = parse_metadata_and_clean_reply(raw_reply)
-                            
-                            st.session_state.conversation_history.append({"role": "assistant", "content": raw_reply})
-                            st.session_state.messages.append({"role": "assistant", "content": display_text})
-                            
-                            if metadata:
-                                for key in st.session_state.collected_info.keys():
-                                    if key in metadata and isinstance(metadata[key], bool):
-                                        st.session_state.collected_info[key] = metadata[key]
-                                    
-                    except Exception as e:
-                        st.error(f"Error getting response: {str(e)}")
-                        clear_queue()
-                        break
+            # Check for exit intent
+            if is_exit_intent(result):
+                # The turn in flight must leave the history before the exit prompt goes in
+                clear_queue(wait=True)
+                # The goodbye is pre-generated, so leaving never waits for the model
+                close(get_interview_session(model_name), reply_pool)
+                st.session_state.conversation_ended = True
+            else:
+                # The background worker answers it; quick follow-ups are merged
+                add_to_queue(result, client, model_name, stream=stream_replies)
             
             st.rerun()
 else:
+    # Queued for the background writer, so ending the interview does not wait on disk
+    session = get_interview_session(model_name)
+    if save_transcript(session):
+        record_saved(session)
     st.info("The interview has ended. Click 'Reset' in the sidebar to start a new session.")
 
 # Footer
@@ -0,0 +1,69 @@
+"""
+Incremental transcript rendering for TalentScout AI.
+
+Each message is escaped and turned into bubble HTML once. Messages are grouped
+into fixed pages: a page that is full never changes again, so it is emitted
+as one byte-identical markdown block on every rerun, and Streamlit sends the
+browser a reference to its cached copy instead of the content
+(global.minCachedMessageSize in .streamlit/config.toml). Only the newest,
+still-open page is sent in full. Pages older than the visible window are not
+emitted at all until the reader asks for them, so a rerun costs the same at
+turn 200 as at turn 20.
+"""
+
+import html
+
+# Messages per page; a full page is rendered as a single block
+PAGE_SIZE = 20
+
+# Pages shown before "Show earlier messages" is needed
+VISIBLE_PAGES = 3
+
+
+def render_bubble(role: str, content: str, streaming: bool = False) -> str:
+    """Escaped chat-bubble HTML for one message."""
+    text = html.escape(content).replace("\n", "<br>")
+    if streaming:
+        text += "▌"
+    if role == "assistant":
+        return f'<div class="assistant-message">🤖 {text}</div>'
+    return f'<div class="user-message">{text} 👤</div>'
+
+
+class TranscriptRenderer:
+    """
+    Rendered HTML for one session's messages list. Call sync() every rerun;
+    only messages appended since the last call are rendered.
+    """
+
+    def __init__(self):
+        self.messages = None
+        self.bubbles = []
+        self.pages = []
+
+    def sync(self, messages: list):
+        """Render new messages. A different (or shorter) list starts over."""
+        if messages is not self.messages or len(messages) < len(self.bubbles):
+            self.messages = messages
+            self.bubbles = []
+            self.pages = []
+
+        for message in messages[len(self.bubbles):]:
+            self.bubbles.append(render_bubble(message.role, message.display))
+
+        while len(self.pages) < len(self.bubbles) // PAGE_SIZE:
+            start = len(self.pages) * PAGE_SIZE
+            self.pages.append("\n".join(self.bubbles[start:start + PAGE_SIZE]))
+
+    def hidden_messages(self, visible_pages: int = VISIBLE_PAGES) -> int:
+        """Number of messages before the visible window."""
+        first_page = max(0, len(self.pages) - (visible_pages - 1))
+        return first_page * PAGE_SIZE
+
+    def blocks(self, visible_pages: int = VISIBLE_PAGES) -> list:
+        """
+        Markdown blocks to draw: the visible full pages, then one block per
+        message of the open page.
+        """
+        first_page = max(0, len(self.pages) - (visible_pages - 1))
+        return self.pages[first_page:] + self.bubbles[len(self.pages) * PAGE_SIZE:]
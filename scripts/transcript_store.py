@@ -0,0 +1,395 @@
+"""
+Opt-in transcript sink for TalentScout AI.
+
+When an operator sets TALENTSCOUT_TRANSCRIPT_DIR and the candidate agrees,
+completed interviews (the conversation history plus the final
+collected_info) are kept so recruiters no longer have to re-run them.
+
+Writes never block the app: submit() hands the record to a background
+writer, which groups everything that arrived within FLUSH_INTERVAL into one
+frame. Each frame is compressed, encrypted, appended to the current segment
+file and fsynced once for the whole group. Segments are append-only and
+rotate at SEGMENT_BYTES.
+
+"Delete my data" appends a tombstone. The writer then rewrites the segments
+that held the session's records without them, so the data is gone from
+disk and not only hidden from exports.
+
+Several processes (API workers) may share a directory: appends and
+rewrites hold an exclusive lock on its .lock file, and a writer follows the
+newest segment on disk rather than the one it opened last. The lock needs
+fcntl; elsewhere, give each process its own directory.
+
+Encryption uses Fernet (the optional `cryptography` package) with the key
+in TALENTSCOUT_TRANSCRIPT_KEY. The store refuses to start without a key
+unless TALENTSCOUT_TRANSCRIPT_PLAINTEXT=1 explicitly allows frames that are
+only compressed.
+
+    python transcript_store.py export --format jsonl --out interviews.jsonl
+    python transcript_store.py export --format parquet --out interviews.parquet
+    python transcript_store.py keygen
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writing process per directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_BYTES = int(os.environ.get("TALENTSCOUT_TRANSCRIPT_SEGMENT_BYTES", 8 * 1024 * 1024))
+FLUSH_INTERVAL = float(os.environ.get("TALENTSCOUT_TRANSCRIPT_FLUSH_INTERVAL", 0.5))
+MAX_BATCH = 500
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def _load_cipher(key: str | None):
+    if not key:
+        return None
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError as e:
+        raise RuntimeError("TALENTSCOUT_TRANSCRIPT_KEY is set but the 'cryptography' package is not installed") from e
+    return Fernet(key.encode() if isinstance(key, str) else key)
+
+
+class TranscriptStore:
+    """
+    Append-only, segment-rotated store of completed interviews. Records are
+    dicts with at least a "session_id"; use submit() and delete() from the
+    app, and export() to read everything back.
+    """
+
+    def __init__(self, directory: str, key: str | None = None, segment_bytes: int = SEGMENT_BYTES,
+                 flush_interval: float = FLUSH_INTERVAL, plaintext: bool = False):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self._cipher = _load_cipher(key)
+        if self._cipher is None:
+            if not plaintext:
+                raise RuntimeError(f"Transcript store at {directory} needs TALENTSCOUT_TRANSCRIPT_KEY "
+                                   "(or TALENTSCOUT_TRANSCRIPT_PLAINTEXT=1 to store transcripts unencrypted)")
+            logger.warning("Transcript store at %s is not encrypted (TALENTSCOUT_TRANSCRIPT_PLAINTEXT=1)", directory)
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, ".lock")
+
+        self._queue = queue.Queue()
+        self._file_lock = threading.Lock()
+        self._segment = None
+        self._segment_path = None
+        self._thread = None
+
+        self.records_written = 0
+        self.frames_written = 0
+        self.tombstones = 0
+
+    # Write path
+
+    def submit(self, record: dict):
+        """Queue a completed interview; returns immediately."""
+        self._start()
+        self._queue.put({"type": "interview", "saved_at": time.time(), **record})
+
+    def delete(self, session_id: str):
+        """Queue a tombstone; the session's records are then erased from disk."""
+        self._start()
+        self._queue.put({"type": "tombstone", "session_id": session_id, "saved_at": time.time()})
+
+    def flush(self, timeout: float = 10.0):
+        """Wait until everything submitted so far is on disk."""
+        done = threading.Event()
+        self._start()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _start(self):
+        if self._thread is None:
+            with self._file_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                if isinstance(batch[-1], threading.Event):
+                    break
+
+            waiters = [item for item in batch if isinstance(item, threading.Event)]
+            records = [item for item in batch if not isinstance(item, threading.Event)]
+            try:
+                if records:
+                    self._write_frame(records)
+                    deleted = {r["session_id"] for r in records if r["type"] == "tombstone"}
+                    if deleted:
+                        self._erase(deleted)
+            except Exception:
+                logger.exception("Transcript store write failed; %d records dropped", len(records))
+            for waiter in waiters:
+                waiter.set()
+
+    def _write_frame(self, records: list):
+        payload = "\n".join(json.dumps(record, ensure_ascii=False) for record in records).encode()
+        frame = self._seal(payload)
+        with self._file_lock, self._directory_lock():
+            segment = self._current_segment(len(frame))
+            segment.write(_FRAME_HEADER.pack(len(frame)) + frame)
+            segment.flush()
+            os.fsync(segment.fileno())
+        self.frames_written += 1
+        self.records_written += sum(r["type"] == "interview" for r in records)
+        self.tombstones += sum(r["type"] == "tombstone" for r in records)
+
+    def _current_segment(self, incoming: int):
+        """The newest segment with room for `incoming` bytes (callers hold both locks)."""
+        segments = self._segment_paths()
+        latest = segments[-1] if segments else None
+        if self._segment is not None and (self._segment_path != latest or not self._is_current(latest)):
+            # Another process rotated or rewrote it
+            self._segment.close()
+            self._segment = None
+        if latest is not None and self._segment is None:
+            self._segment_path = latest
+            self._segment = open(latest, "ab")
+        if self._segment is not None and self._segment.seek(0, os.SEEK_END) + incoming > self.segment_bytes:
+            self._segment.close()
+            self._segment = None
+        if self._segment is None:
+            index = int(os.path.basename(latest)[8:16]) + 1 if latest else 1
+            self._segment_path = os.path.join(self.directory, f"segment-{index:08d}.log")
+            self._segment = open(self._segment_path, "ab")
+        return self._segment
+
+    def _is_current(self, path: str) -> bool:
+        try:
+            return os.stat(path).st_ino == os.fstat(self._segment.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    @contextmanager
+    def _directory_lock(self):
+        """Exclusive lock on the directory, shared with the other processes writing to it."""
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _erase(self, session_ids: set):
+        """Rewrite every segment holding records of these sessions without them."""
+        with self._file_lock, self._directory_lock():
+            for path in self._segment_paths():
+                self._rewrite_without(path, session_ids)
+
+    def _rewrite_without(self, path: str, session_ids: set):
+        frames = list(self._read_frames(path))
+        kept, changed = [], False
+        for records in frames:
+            remaining = [r for r in records if not (r["type"] == "interview" and r["session_id"] in session_ids)]
+            changed |= len(remaining) != len(records)
+            if remaining:
+                kept.append(remaining)
+        if not changed:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for records in kept:
+                frame = self._seal("\n".join(json.dumps(r, ensure_ascii=False) for r in records).encode())
+                f.write(_FRAME_HEADER.pack(len(frame)) + frame)
+            f.flush()
+            os.fsync(f.fileno())
+        if path == self._segment_path and self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        os.replace(tmp_path, path)
+
+    # Frames
+
+    def _seal(self, payload: bytes) -> bytes:
+        compressed = zlib.compress(payload, 6)
+        return self._cipher.encrypt(compressed) if self._cipher is not None else compressed
+
+    def _open(self, frame: bytes) -> bytes:
+        if self._cipher is not None:
+            frame = self._cipher.decrypt(frame)
+        return zlib.decompress(frame)
+
+    def _read_frames(self, path: str):
+        """Yield the records of each frame in a segment; a torn final frame is ignored."""
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_FRAME_HEADER.size)
+                if len(header) < _FRAME_HEADER.size:
+                    return
+                (length,) = _FRAME_HEADER.unpack(header)
+                frame = f.read(length)
+                if len(frame) < length:
+                    return
+                yield [json.loads(line) for line in self._open(frame).decode().split("\n") if line]
+
+    def _segment_paths(self) -> list:
+        return sorted(glob.glob(os.path.join(self.directory, "segment-*.log")))
+
+    # Read path
+
+    def export(self):
+        """Yield every stored interview that has not been deleted, oldest first."""
+        segments = self._segment_paths()
+        deleted = set()
+        for path in segments:
+            for records in self._read_frames(path):
+                deleted.update(r["session_id"] for r in records if r["type"] == "tombstone")
+        for path in segments:
+            for records in self._read_frames(path):
+                for record in records:
+                    if record["type"] == "interview" and record["session_id"] not in deleted:
+                        yield record
+
+    def stats(self) -> dict:
+        segments = self._segment_paths()
+        return {
+            "segments": len(segments),
+            "bytes": sum(os.path.getsize(path) for path in segments),
+            "encrypted": self._cipher is not None,
+            "records_written": self.records_written,
+            "frames_written": self.frames_written,
+            "tombstones": self.tombstones,
+            "pending": self._queue.qsize(),
+        }
+
+
+def export_jsonl(store: TranscriptStore, out) -> int:
+    count = 0
+    for record in store.export():
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def export_parquet(store: TranscriptStore, path: str, batch_size: int = 1000) -> int:
+    """Stream interviews into a Parquet file in row groups of batch_size (needs pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("session_id", pa.string()),
+        ("saved_at", pa.float64()),
+        ("model", pa.string()),
+        ("collected_info", pa.string()),
+        ("history", pa.string()),
+    ])
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for record in store.export():
+            batch.append(record)
+            if len(batch) >= batch_size:
+                count += _write_parquet_batch(writer, schema, batch)
+                batch = []
+        if batch:
+            count += _write_parquet_batch(writer, schema, batch)
+    return count
+
+
+def _write_parquet_batch(writer, schema, records: list) -> int:
+    import pyarrow as pa
+
+    columns = {
+        "session_id": [r["session_id"] for r in records],
+        "saved_at": [r.get("saved_at") for r in records],
+        "model": [r.get("model") for r in records],
+        "collected_info": [json.dumps(r.get("collected_info", {})) for r in records],
+        "history": [json.dumps(r.get("history", []), ensure_ascii=False) for r in records],
+    }
+    writer.write_table(pa.table(columns, schema=schema))
+    return len(records)
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_transcript_store() -> TranscriptStore | None:
+    """
+    Return the process-wide transcript store, or None when
+    TALENTSCOUT_TRANSCRIPT_DIR is not set (persistence is off by default).
+    Raises RuntimeError when the store has no key and plaintext storage was
+    not allowed with TALENTSCOUT_TRANSCRIPT_PLAINTEXT=1.
+    """
+    global _shared_store
+    directory = os.environ.get("TALENTSCOUT_TRANSCRIPT_DIR")
+    if not directory:
+        return None
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = TranscriptStore(
+                    directory,
+                    key=os.environ.get("TALENTSCOUT_TRANSCRIPT_KEY"),
+                    plaintext=os.environ.get("TALENTSCOUT_TRANSCRIPT_PLAINTEXT") == "1",
+                )
+    return _shared_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or inspect stored interview transcripts.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="write every stored interview to JSONL or Parquet")
+    export_parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    export_parser.add_argument("--out", help="output file (JSONL defaults to stdout)")
+    subparsers.add_parser("stats", help="print segment count and size")
+    subparsers.add_parser("keygen", help="print a new TALENTSCOUT_TRANSCRIPT_KEY")
+    args = parser.parse_args()
+
+    if args.command == "keygen":
+        from cryptography.fernet import Fernet
+        print(Fernet.generate_key().decode())
+        return
+
+    store = get_transcript_store()
+    if store is None:
+        parser.error("set TALENTSCOUT_TRANSCRIPT_DIR and TALENTSCOUT_TRANSCRIPT_KEY")
+
+    if args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    elif args.format == "parquet":
+        if not args.out:
+            parser.error("--out is required for parquet")
+        print(f"exported {export_parquet(store, args.out)} interviews", file=sys.stderr)
+    elif args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            print(f"exported {export_jsonl(store, f)} interviews", file=sys.stderr)
+    else:
+        export_jsonl(store, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Turn classification for TalentScout AI.
+
+Names the kind of reply the model is about to write, from the interview stage
+(collected_info and the local profile extractor) and the candidate's latest
+message. The turn type decides which turns may be answered from the semantic
+cache.
+"""
+
+import re
+
+GREETING = "greeting"
+CLOSING = "closing"
+COLLECTING = "collecting"          # gathering name, contact, location, experience, position
+CLARIFICATION = "clarification"    # the candidate asks what the last question meant
+STACK_ACK = "stack_ack"            # stack just declared: acknowledge it, ask the first question
+QUESTIONING = "questioning"        # evaluate an answer and ask the next technical question
+
+TURN_TYPES = (GREETING, CLOSING, COLLECTING, CLARIFICATION, STACK_ACK, QUESTIONING)
+
+CLARIFICATION_PATTERN = re.compile(
+    r"^\s*(?:sorry[,.!]?\s*)?(?:what do you mean|what does that mean|can you (?:repeat|rephrase|clarify|explain)|"
+    r"could you (?:repeat|rephrase|clarify|explain)|i don'?t (?:understand|get it)|not sure what you mean|"
+    r"come again|pardon|huh|what\?|which one)\b",
+    re.IGNORECASE,
+)
+
+
+def is_clarification(text: str) -> bool:
+    """True for a short message asking the assistant to explain its last question."""
+    return len(text.split()) <= 12 and bool(CLARIFICATION_PATTERN.search(text))
+
+
+def classify_turn(history, collected_info: dict, extractor=None,
+                  greeting_prompt: str = "", exit_prompt: str = "") -> str:
+    """
+    Return the turn type of the reply to the last message in `history`.
+    `extractor` is the session's ProfileExtractor, already updated with that
+    message.
+    """
+    last_message = history[-1]["content"] if len(history) else ""
+    if last_message == greeting_prompt:
+        return GREETING
+    if last_message == exit_prompt:
+        return CLOSING
+    if is_clarification(last_message):
+        return CLARIFICATION
+
+    if collected_info.get("tech_stack") and not collected_info.get("questions"):
+        if extractor is not None and extractor.questions_asked == 0:
+            return STACK_ACK
+        return QUESTIONING
+    if collected_info.get("questions"):
+        return CLOSING
+    return COLLECTING
@@ -0,0 +1,163 @@
+"""
+Model warm-up and keep-alive for TalentScout AI.
+
+A background thread loads the configured models on the backend before any
+candidate needs them, pre-fills the shared system-prompt prefix, and pings
+them so they stay resident. Session start latency then no longer depends on
+whether someone happened to use the model recently.
+
+Residency policy (environment):
+  TALENTSCOUT_WARM_MODELS     models kept resident at all times
+                              (comma-separated; default: the first configured model)
+  TALENTSCOUT_KEEP_ALIVE      how long the backend keeps a model loaded after a ping (default "10m")
+  TALENTSCOUT_PING_INTERVAL   seconds between keep-alive rounds (default 240)
+Models selected in the app are also kept warm while they were used within
+the keep-alive window.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+RESIDENT_MODELS = [m.strip() for m in os.environ.get("TALENTSCOUT_WARM_MODELS", "").split(",") if m.strip()]
+KEEP_ALIVE = os.environ.get("TALENTSCOUT_KEEP_ALIVE", "10m")
+PING_INTERVAL = float(os.environ.get("TALENTSCOUT_PING_INTERVAL", 240))
+LOAD_TIMEOUT = 300
+RETRY_AFTER = 30
+
+STATUS_LABELS = {
+    "cold": "⚪ Not loaded",
+    "warming": "🟡 Loading…",
+    "ready": "🟢 Ready",
+    "error": "🔴 Unavailable",
+}
+
+
+def parse_duration(value: str) -> float:
+    """Seconds in an Ollama-style duration ("90s", "10m", "1h", or plain seconds)."""
+    value = str(value).strip()
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class ModelWarmer:
+    """
+    Keeps models loaded on one backend. `status[model]` is one of
+    STATUS_LABELS; call mark_used() whenever a session uses a model.
+    """
+
+    def __init__(self, base_url: str, client, models, system_prompt: str, greeting_prompt: str,
+                 resident_models=None, keep_alive: str = KEEP_ALIVE, interval: float = PING_INTERVAL):
+        self.base_url = base_url.rstrip("/")
+        self.client = client
+        self.models = list(models)
+        self.system_prompt = system_prompt
+        self.greeting_prompt = greeting_prompt
+        self.resident_models = set(resident_models or RESIDENT_MODELS or self.models[:1])
+        self.keep_alive = keep_alive
+        self.interval = interval
+
+        self.status = dict.fromkeys(self.models, "cold")
+        self.last_ready = {}
+        self.last_used = {}
+        self.errors = {}
+        self.failed_at = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background warm-up / keep-alive thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="talentscout-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def mark_used(self, model: str):
+        """Record use of a model; wakes the thread to load it if it is not ready."""
+        self.last_used[model] = time.time()
+        if self.status.get(model) != "ready":
+            self._wake.set()
+
+    def is_ready(self, model: str) -> bool:
+        return self.status.get(model) == "ready"
+
+    def wanted_models(self) -> list:
+        """Models to keep resident now: the resident set plus recently used ones."""
+        window = parse_duration(self.keep_alive)
+        now = time.time()
+        recent = {model for model, used in self.last_used.items() if now - used < window}
+        return [model for model in self.models if model in self.resident_models or model in recent]
+
+    def warm(self, model: str):
+        """Load one model, pre-fill the system prompt and refresh its keep-alive."""
+        if self.status.get(model) != "ready":
+            self.status[model] = "warming"
+        try:
+            self._ping(model)
+            # A one-token completion on the shared prefix leaves the system
+            # prompt in the backend's prompt cache for the first real session.
+            self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": self.greeting_prompt},
+                ],
+                max_tokens=1,
+                temperature=0,
+            )
+        except Exception as e:
+            self.status[model] = "error"
+            self.errors[model] = str(e)
+            self.failed_at[model] = time.time()
+            return
+        self.status[model] = "ready"
+        self.last_ready[model] = time.time()
+        self.errors.pop(model, None)
+
+    def _ping(self, model: str):
+        # Ollama's native API loads the model and sets its keep-alive. Other
+        # OpenAI-compatible servers do not have it; the completion still warms them.
+        root = self.base_url[:-3] if self.base_url.endswith("/v1") else self.base_url
+        request = urllib.request.Request(
+            f"{root}/api/generate",
+            data=json.dumps({"model": model, "keep_alive": self.keep_alive}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=LOAD_TIMEOUT) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise
+
+    def _run(self):
+        while not self._stop.is_set():
+            wanted = self.wanted_models()
+            # Models nobody is waiting for expire on the backend by themselves
+            for model in self.models:
+                if model not in wanted and self.status[model] == "ready":
+                    last_ready = self.last_ready.get(model, 0)
+                    if time.time() - last_ready > parse_duration(self.keep_alive):
+                        self.status[model] = "cold"
+
+            # Selected-but-cold models first, then keep-alive for the rest
+            for model in sorted(wanted, key=lambda m: self.status[m] == "ready"):
+                if self._stop.is_set():
+                    return
+                if time.time() - self.failed_at.get(model, 0) < RETRY_AFTER:
+                    continue
+                self.warm(model)
+
+            self._wake.wait(self.interval)
+            self._wake.clear()
@@ -0,0 +1,167 @@
+"""
+Background input worker for TalentScout AI.
+
+Each session gets an InputWorker that owns its input queue. Completions run
+on a shared thread pool instead of the Streamlit script thread, and inputs
+that arrive while a reply is being generated are merged into one user turn,
+so a burst of quick messages costs a single backend call. The UI only polls.
+
+A newer input supersedes the reply in flight: its backend request is
+cancelled and the reply is generated again for all inputs merged, instead of
+finishing a reply the candidate has already moved past (TALENTSCOUT_SUPERSEDE,
+"0" to let it finish). Cancelled turns free their backend capacity at once.
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import profiled
+
+WORKER_THREADS = int(os.environ.get("TALENTSCOUT_WORKER_THREADS", 32))
+SUPERSEDE = os.environ.get("TALENTSCOUT_SUPERSEDE", "1") != "0"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by the input workers of every session."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="talentscout-turn")
+    return _executor
+
+
+class InputWorker:
+    """
+    Owns one session's input queue and runs its turns in the background.
+
+    `turn_func(user_input, on_text=..., is_cancelled=..., **settings)` answers
+    the (merged) input in the conversation `history`, as engine.answer does:
+    it adds the input and the reply to the history, leaves the history as it
+    was when it fails or is cancelled, and returns the (input, reply) records
+    (None when cancelled). The worker never touches st.session_state;
+    finished turns are handed back by poll().
+    """
+
+    def __init__(self, history, turn_func, supersede: bool = SUPERSEDE):
+        self.history = history
+        self.turn_func = turn_func
+        self.supersede = supersede
+        self.superseded_turns = 0
+        self.profiler = None  # a cProfile.Profile enabled around each turn, when set
+
+        self.queue = deque()
+        self.results = deque()
+        self.partial_reply = ""
+        self._settings = None
+        self._running = False
+        self._in_flight = False
+        self._superseded = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._turn_done = threading.Condition(self._lock)
+
+    @property
+    def busy(self) -> bool:
+        """True while inputs are queued or a turn is being generated."""
+        return self._running or bool(self.queue)
+
+    def submit(self, user_input: str, settings: dict):
+        """Queue an input; `settings` (turn_func keyword arguments) apply to the next turn."""
+        with self._lock:
+            self.queue.append(user_input)
+            self._settings = settings
+            if not self._running:
+                self._running = True
+                get_executor().submit(self._drain)
+            elif self._in_flight and self.supersede:
+                self._superseded = True
+
+    def poll(self) -> list:
+        """Return and forget the turns finished since the last poll."""
+        with self._lock:
+            finished = list(self.results)
+            self.results.clear()
+            return finished
+
+    def cancel(self, wait: bool = False):
+        """
+        Drop queued inputs and abandon the turn in flight, if any. With
+        `wait`, return only once that turn has stopped and left the history,
+        so the caller can change the history itself (the exit flow).
+        """
+        with self._lock:
+            self._generation += 1
+            self.queue.clear()
+            self.partial_reply = ""
+            self._superseded = False
+            if wait:
+                self._turn_done.wait_for(lambda: not self._in_flight)
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self.queue:
+                    self._running = False
+                    self.partial_reply = ""
+                    return
+                inputs = list(self.queue)
+                self.queue.clear()
+                settings = self._settings
+                generation = self._generation
+                self._in_flight = True
+
+            result = {"inputs": inputs, "message": None, "error": None}
+            records = None
+            try:
+                with profiled(self.profiler):
+                    records = self.turn_func(
+                        "\n\n".join(inputs),
+                        on_text=lambda text: self._set_partial(generation, text),
+                        is_cancelled=lambda: self._generation != generation or self._superseded,
+                        **settings,
+                    )
+            except Exception as e:
+                result["error"] = str(e) or type(e).__name__
+
+            with self._lock:
+                self._in_flight = False
+                self._turn_done.notify_all()
+                if generation != self._generation:
+                    # Abandoned. A turn that finished anyway leaves the history too
+                    if records is not None:
+                        self._discard(records[0])
+                    continue
+                if self._superseded and records is None:
+                    # Answer these inputs together with the newer ones instead
+                    self._superseded = False
+                    self.superseded_turns += 1
+                    self.queue.extendleft(reversed(inputs))
+                    self.partial_reply = ""
+                    continue
+                self._superseded = False
+                if records is not None:
+                    result["message"] = records[1]
+                elif result["error"] is None:
+                    result["error"] = "The reply was cancelled."
+                if result["error"] is not None:
+                    self.queue.clear()
+                self.partial_reply = ""
+                self.results.append(result)
+
+    def _discard(self, message):
+        """Remove a turn from the history: `message` (its input) and the records after it."""
+        for index in range(len(self.history) - 1, 0, -1):
+            if self.history[index] is message:
+                while len(self.history) > index:
+                    self.history.pop()
+                return
+
+    def _set_partial(self, generation: int, text: str):
+        if generation == self._generation:
+            self.partial_reply = text
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+import api
+import engine
+from fake_backend import FakeBackend
+from session_store import SessionConflict, get_session_store
+from transcript_store import TranscriptStore
+
+
+@pytest.fixture(scope="module")
+def backend_url():
+    fake = FakeBackend(ttft=0, tokens_per_second=0)
+    yield fake.start()
+    fake.stop()
+
+
+@pytest.fixture
+def client(backend_url, monkeypatch):
+    monkeypatch.setattr(api, "BASE_URL", backend_url)
+    with TestClient(api.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def transcripts(tmp_path, monkeypatch):
+    store = TranscriptStore(str(tmp_path), plaintext=True, flush_interval=0)
+    monkeypatch.setattr(api, "get_transcript_store", lambda: store)
+    monkeypatch.setattr(engine, "get_transcript_store", lambda: store)
+    return store
+
+
+def start(client, **options) -> str:
+    response = client.post("/v1/sessions", json=options)
+    assert response.status_code == 201
+    assert response.json()["reply"]
+    return response.json()["session"]["session_id"]
+
+
+def events(response) -> list:
+    return [(block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in response.text.strip().split("\n\n")]
+
+
+def test_interview_over_json(client):
+    session_id = start(client)
+    response = client.post(f"/v1/sessions/{session_id}/messages", json={"content": "I'm Jane Doe"})
+    assert response.status_code == 200 and "METADATA" not in response.json()["reply"]
+    view = client.get(f"/v1/sessions/{session_id}").json()
+    assert [m["role"] for m in view["messages"]] == ["assistant", "user", "assistant"]
+    response = client.post(f"/v1/sessions/{session_id}/messages", json={"content": "bye"})
+    assert response.json()["session"]["ended"]
+    response = client.post(f"/v1/sessions/{session_id}/messages", json={"content": "hello"})
+    assert response.status_code == 400
+
+
+def test_reply_streams_as_server_sent_events(client):
+    session_id = start(client)
+    response = client.post(f"/v1/sessions/{session_id}/messages", json={"content": "I'm Jane Doe"},
+                           headers={"Accept": "text/event-stream"})
+    received = events(response)
+    assert received[-1][0] == "done"
+    deltas = "".join(data["text"] for name, data in received if name == "delta")
+    assert deltas == received[-1][1]["reply"]
+
+
+@pytest.mark.parametrize("path, body, status", [
+    ("/v1/sessions/unknown/messages", {"content": "hi"}, 404),
+    ("/v1/sessions", {"model": "gpt-9"}, 400),
+])
+def test_bad_requests(client, path, body, status):
+    assert client.post(path, json=body).status_code == status
+
+
+def test_resent_exit_after_a_conflict_saves_one_transcript(client, transcripts, monkeypatch):
+    session_id = start(client, save_transcript=True)
+    store = get_session_store()
+    put = store.put
+    calls = []
+
+    def conflict_once(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise SessionConflict(session_id)
+        return put(*args, **kwargs)
+
+    monkeypatch.setattr(store, "put", conflict_once)
+    assert client.post(f"/v1/sessions/{session_id}/messages", json={"content": "bye"}).status_code == 409
+    assert client.post(f"/v1/sessions/{session_id}/messages", json={"content": "bye"}).status_code == 200
+    transcripts.flush()
+    assert [record["session_id"] for record in transcripts.export()] == [session_id]
+
+
+def test_delete_erases_the_interview(client, transcripts):
+    session_id = start(client, save_transcript=True)
+    client.post(f"/v1/sessions/{session_id}/messages", json={"content": "bye"})
+    assert client.delete(f"/v1/sessions/{session_id}").status_code == 204
+    assert client.get(f"/v1/sessions/{session_id}").status_code == 404
+    transcripts.flush()
+    assert list(transcripts.export()) == []
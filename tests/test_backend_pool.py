@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from backend_pool import EJECT_AFTER, BackendPool
+from client import run_coroutine
+from fake_backend import FakeBackend
+
+MESSAGES = [{"role": "user", "content": "Start the conversation."}]
+
+
+@pytest.fixture
+def backends():
+    started = []
+
+    def start(**kwargs):
+        fake = FakeBackend(**{"ttft": 0, "tokens_per_second": 0, **kwargs})
+        started.append(fake)
+        return fake, fake.start()
+
+    yield start
+    for fake in started:
+        fake.stop()
+
+
+@pytest.fixture
+def pools():
+    opened = []
+
+    def open_pool(spec: str) -> BackendPool:
+        pool = BackendPool(spec, health_interval=0)
+        opened.append(pool)
+        return pool
+
+    yield open_pool
+    for pool in opened:
+        pool.close()
+
+
+def complete(pool: BackendPool, model: str = "llama3.1") -> str:
+    return pool.create(model=model, messages=MESSAGES).choices[0].message.content
+
+
+def test_requests_go_to_the_least_outstanding_endpoint(backends, pools):
+    (first, first_url), (second, second_url) = backends(ttft=0.5), backends(ttft=0.5)
+    pool = pools(f"{first_url}, {second_url}")
+    threads = []
+    for _ in range(4):
+        threads.append(threading.Thread(target=complete, args=(pool,)))
+        threads[-1].start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join(10)
+    assert first.requests == second.requests == 2
+    assert [endpoint.outstanding for endpoint in pool.endpoints] == [0, 0]
+
+
+def test_weight_zero_excludes_an_endpoint(backends, pools):
+    (first, first_url), (second, second_url) = backends(), backends()
+    pool = pools(f"{first_url} llama3.1=0, {second_url}")
+    for _ in range(4):
+        complete(pool)
+    assert (first.requests, second.requests) == (0, 4)
+    complete(pool, "mistral")
+    assert first.requests + second.requests == 5
+    with pytest.raises(ValueError):
+        pools(f"{first_url} llama3.1=0").create(model="llama3.1", messages=MESSAGES)
+
+
+def test_failing_endpoint_is_ejected_and_readmitted_after_a_probe(backends, pools):
+    (failing, failing_url), (_, healthy_url) = backends(error_rate=1.0), backends()
+    # The failing endpoint is picked first while it is healthy
+    pool = pools(f"{failing_url} *=10, {healthy_url}")
+    ejected = pool.endpoints[0]
+    for _ in range(EJECT_AFTER):
+        assert complete(pool)
+    assert not ejected.healthy and ejected.failures == EJECT_AFTER
+    requests = failing.requests
+    complete(pool)
+    assert failing.requests == requests
+
+    failing.error_rate = 0.0
+    run_coroutine(pool.check(ejected))
+    assert ejected.healthy
+    complete(pool)
+    assert failing.requests == requests + 1
+
+
+def test_connection_error_is_retried_on_another_endpoint(backends, pools):
+    healthy, healthy_url = backends()
+    pool = pools(f"http://127.0.0.1:9/v1 *=10, {healthy_url}")
+    assert complete(pool)
+    unreachable = pool.endpoints[0]
+    assert unreachable.failures == 1 and "Connection" in unreachable.last_error
+    assert healthy.requests == 1
+
+
+def test_hedge_to_a_fast_endpoint_cancels_the_slow_one(backends, pools, monkeypatch):
+    import backend_pool
+
+    monkeypatch.setattr(backend_pool, "HEDGE_INITIAL_DELAY", 0.1)
+    # Long enough that the slow reply is still being written when the client goes
+    reply = "word " * 2000
+    (slow, slow_url), (fast, fast_url) = backends(ttft=0.5, replies=[reply]), backends(replies=[reply])
+    pool = pools(f"{slow_url} *=10, {fast_url}")
+    chunks = pool.create(model="llama3.1", messages=MESSAGES, stream=True)
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices)
+    assert text == reply
+    assert pool.hedges == 1 and pool.hedge_wins == 1
+    assert [endpoint.outstanding for endpoint in pool.endpoints] == [0, 0]
+    assert (slow.requests, fast.requests) == (1, 1)
+    deadline = time.monotonic() + 5
+    while not slow.disconnects:
+        assert time.monotonic() < deadline, "the slow backend never saw the disconnect"
+        time.sleep(0.02)
+    assert fast.disconnects == 0
@@ -0,0 +1,70 @@
+import threading
+import uuid
+
+import pytest
+
+from backend_pool import BackendPool
+from cache import ResponseCache
+from fake_backend import FakeBackend
+from pipeline import efficient_completion, stream_completion
+
+
+@pytest.fixture
+def backend():
+    fake = FakeBackend(ttft=0.3, tokens_per_second=0)
+    pool = BackendPool(fake.start(), health_interval=0)
+    yield fake, pool
+    pool.close()
+    fake.stop()
+
+
+def run_concurrently(count: int, call) -> list:
+    replies = [None] * count
+    start = threading.Barrier(count)
+
+    def run(index):
+        start.wait()
+        replies[index] = call()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return replies
+
+
+def greeting_messages() -> list:
+    # A context no other test has cached
+    return [{"role": "system", "content": f"You are TalentScout {uuid.uuid4().hex}."},
+            {"role": "user", "content": "Start the conversation."}]
+
+
+def test_concurrent_misses_call_the_backend_once(backend):
+    fake, pool = backend
+    messages = greeting_messages()
+    replies = run_concurrently(20, lambda: efficient_completion(pool, messages, "llama3.1"))
+    assert fake.requests == 1
+    assert len(set(replies)) == 1 and replies[0]
+
+
+def test_concurrent_streaming_misses_call_the_backend_once(backend):
+    fake, pool = backend
+    messages = greeting_messages()
+    replies = run_concurrently(10, lambda: "".join(stream_completion(pool, messages, "llama3.1")))
+    assert fake.requests == 1
+    assert len(set(replies)) == 1 and replies[0]
+
+
+def test_waiting_callers_generate_their_own_when_the_first_fails():
+    cache = ResponseCache()
+    assert cache.join("key") is None
+    waiting = cache.join("key")
+    cache.settle("key", None)
+    assert waiting.result(0) is None
+    # The key is free again
+    assert cache.join("key") is None
+    cache.set("key", "reply")
+    cache.settle("key", "reply")
+    assert cache.join("key").result(0) == "reply"
+    assert cache.stats()["coalesced"] == 2
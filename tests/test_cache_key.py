@@ -0,0 +1,76 @@
+import pytest
+
+from context import ContextWindow
+from extractor import FIELDS
+from pipeline import chain_digest, context_digest, get_cache_key, sampling_params
+from history import ConversationHistory
+
+
+def window_with(turns: int, budget: int = 100000) -> ContextWindow:
+    history = ConversationHistory([{"role": "system", "content": "You are TalentScout."}])
+    for turn in range(turns):
+        history.append({"role": "user", "content": f"Answer {turn}: " + "words " * 40})
+        history.append({"role": "assistant", "content": f"Question {turn + 1}? " + "text " * 40})
+    history.append({"role": "user", "content": "My latest answer"})
+    return ContextWindow(history, budget, keep_recent=2)
+
+
+def key_for(window: ContextWindow, collected_info: dict, facts: dict | None = None) -> str:
+    messages = window.build(collected_info, facts)
+    return get_cache_key(messages, "llama3.1", context_digest(window), **sampling_params(300))
+
+
+def test_digest_matches_the_context_sent():
+    window = window_with(2)
+    window.plan_block = "QUESTION PLAN: ask about rate limiting"
+    messages = window.build(dict.fromkeys(FIELDS, False))
+    digest = window.history.digest
+    for message in window.injected:
+        digest = chain_digest(digest, message)
+    assert context_digest(window) == digest
+    assert window.injected == [messages[-2]]
+
+
+def test_same_context_same_key():
+    collected_info = dict.fromkeys(FIELDS, False)
+    assert key_for(window_with(2), collected_info) == key_for(window_with(2), collected_info)
+
+
+def test_plain_history_keeps_the_history_digest():
+    # The greeting and early turns are shared across sessions under this key
+    window = window_with(1)
+    window.build(dict.fromkeys(FIELDS, False))
+    assert window.injected == []
+    assert context_digest(window) == window.history.digest
+
+
+def test_plan_block_changes_the_key():
+    collected_info = dict.fromkeys(FIELDS, False)
+    planned = window_with(2)
+    planned.plan_block = "QUESTION PLAN: ask about rate limiting"
+    other_plan = window_with(2)
+    other_plan.plan_block = "QUESTION PLAN: ask about database indexes"
+    keys = {key_for(window_with(2), collected_info), key_for(planned, collected_info),
+            key_for(other_plan, collected_info)}
+    assert len(keys) == 3
+
+
+@pytest.mark.parametrize("change", [
+    lambda collected_info, facts: collected_info.update(name=True),
+    lambda collected_info, facts: facts.update(years=4.0),
+])
+def test_profile_block_changes_the_key(change):
+    collected_info = dict.fromkeys(FIELDS, False)
+    facts = {}
+    before = key_for(window_with(12, budget=400), collected_info, facts)
+    change(collected_info, facts)
+    after = key_for(window_with(12, budget=400), collected_info, facts)
+    assert before != after
+
+
+def test_model_and_params_change_the_key():
+    messages = [{"role": "user", "content": "hi"}]
+    key = get_cache_key(messages, "llama3.1", max_tokens=300)
+    assert get_cache_key(messages, "mistral", max_tokens=300) != key
+    assert get_cache_key(messages, "llama3.1", max_tokens=200) != key
+    assert get_cache_key(messages, "llama3.1", chain_digest("", messages[0]), max_tokens=300) == key
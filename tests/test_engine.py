@@ -0,0 +1,134 @@
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+import engine
+from backend_pool import BackendPool
+from cache import get_response_cache
+from engine import InterviewSession, answer, close, forget, greet, pending_transcript
+from fake_backend import FakeBackend
+from worker import InputWorker
+
+
+@pytest.fixture(scope="module")
+def backend():
+    fake = FakeBackend(ttft=0, tokens_per_second=0)
+    url = fake.start()
+    yield fake, url
+    fake.stop()
+
+
+@pytest.fixture
+def client(backend):
+    pool = BackendPool(backend[1], health_interval=0)
+    yield pool
+    pool.close()
+
+
+def unique(text: str) -> str:
+    # Keeps the response caches from answering a test with an earlier test's reply
+    return f"{text} {uuid.uuid4().hex[:8]}"
+
+
+def test_importing_the_api_does_not_load_streamlit():
+    code = "import sys, api; print('streamlit' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=engine.__file__.rsplit("/", 1)[0],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_greet_answer_and_close(client):
+    session = InterviewSession()
+    greeting = greet(session, client)
+    assert "TalentScout" in greeting and session.initialized
+    reply = answer(session, client, unique("I'm Jane Doe"))
+    assert "METADATA" not in reply
+    assert [m.role for m in session.messages] == ["assistant", "user", "assistant"]
+    closing = answer(session, client, "bye")
+    assert session.ended and session.messages[-1].display == closing
+    with pytest.raises(ValueError):
+        answer(session, client, "hello again")
+
+
+def test_failed_turn_leaves_the_session_as_it_was(client):
+    session = InterviewSession()
+    greet(session, client)
+    history, messages = list(session.history), list(session.messages)
+    down = BackendPool("http://127.0.0.1:9/v1", health_interval=0)
+    with pytest.raises(Exception):
+        answer(session, down, unique("I'm Jane Doe"))
+    assert list(session.history) == history and session.messages == messages
+
+
+def test_close_ends_without_the_model(backend):
+    fake, _ = backend
+    session = InterviewSession()
+    requests = fake.requests
+    closing = close(session)
+    assert session.ended and session.messages[-1].display == closing
+    assert fake.requests == requests
+
+
+def test_exit_while_a_turn_is_in_flight(client):
+    session = InterviewSession()
+    greet(session, client)
+    slow = FakeBackend(ttft=0.3, tokens_per_second=0)
+    slow_client = BackendPool(slow.start(), health_interval=0)
+
+    def turn(user_input, on_text=None, is_cancelled=None):
+        count = len(session.messages)
+        answer(session, slow_client, user_input, on_text=on_text, is_cancelled=is_cancelled)
+        return tuple(session.messages[count:]) or None
+
+    worker = InputWorker(session.history, turn)
+    try:
+        worker.submit(unique("I'm Jane Doe"), {})
+        deadline = time.monotonic() + 5
+        while not worker._in_flight:
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.005)
+        worker.cancel(wait=True)
+        close(session)
+    finally:
+        slow_client.close()
+        slow.stop()
+    roles = [m.role for m in session.history]
+    assert roles == ["system", "user", "assistant", "user", "assistant"]
+    assert session.history[-1] is session.messages[-1] and worker.poll() == []
+
+
+def test_state_round_trip(client):
+    session = InterviewSession()
+    greet(session, client)
+    answer(session, client, unique("I'm Jane Doe"))
+    restored = InterviewSession.from_state(session.to_state())
+    assert restored.view() == session.view()
+    assert [m.as_dict() for m in restored.history] == [m.as_dict() for m in session.history]
+    # Displayed history records are shared again, not copies
+    assert restored.messages[-1] is restored.history[-1]
+
+
+def test_pending_transcript_is_handed_out_once(monkeypatch):
+    monkeypatch.setattr(engine, "get_transcript_store", lambda: object())
+    session = InterviewSession(save_transcript=True)
+    assert pending_transcript(session) is None
+    close(session)
+    record = pending_transcript(session)
+    assert record["session_id"] == session.session_id and session.saved
+    assert pending_transcript(session) is None
+
+
+def test_forget_keeps_the_shared_greeting(client):
+    cache = get_response_cache()
+    session = InterviewSession()
+    greet(session, client)
+    shared = set(cache._entries)
+    answer(session, client, unique("I'm Jane Doe"))
+    own = set(session.cache_keys)
+    assert own and not own & shared
+    forget(session)
+    assert not session.cache_keys and not own & set(cache._entries)
+    assert shared <= set(cache._entries)
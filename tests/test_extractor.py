@@ -0,0 +1,121 @@
+import pytest
+
+from extractor import ProfileExtractor
+
+
+def asked(question: str) -> ProfileExtractor:
+    extractor = ProfileExtractor()
+    extractor.observe_assistant(question)
+    return extractor
+
+
+NAME_QUESTION = "Great to meet you! What is your full name?"
+LOCATION_QUESTION = "Thanks! Where are you currently located?"
+EXPERIENCE_QUESTION = "How many years of professional experience do you have?"
+
+
+@pytest.mark.parametrize("reply, name", [
+    ("Priya Shah", "Priya Shah"),
+    ("priya shah.", "priya shah"),
+    ("My name is Jane Doe", "Jane Doe"),
+    ("Hi, I'm Jane Doe and I write Python", "Jane Doe"),
+])
+def test_name_is_taken_from_answers(reply, name):
+    extractor = asked(NAME_QUESTION)
+    extractor.observe_user(reply)
+    assert extractor.flags["name"]
+    assert extractor.facts["name"] == name
+
+
+@pytest.mark.parametrize("reply", [
+    "hello",
+    "Hi there",
+    "why do you need it",
+    "Can I skip this?",
+    "I'd rather not say",
+    "Python developer",
+    "Not sure",
+    "I am Not Sure",
+])
+def test_name_is_not_taken_from_non_answers(reply):
+    extractor = asked(NAME_QUESTION)
+    extractor.observe_user(reply)
+    assert not extractor.flags["name"]
+    assert "name" not in extractor.facts
+
+
+@pytest.mark.parametrize("reply, location", [
+    ("Pune", "Pune"),
+    ("I'm in Austin, Texas.", "Austin, Texas"),
+    ("I'm based in Berlin and open to remote", "Berlin"),
+])
+def test_location_is_taken_from_answers(reply, location):
+    extractor = asked(LOCATION_QUESTION)
+    extractor.observe_user(reply)
+    assert extractor.facts["location"] == location
+
+
+@pytest.mark.parametrize("reply", [
+    "hello", "Hi there", "why do you need it", "Can I skip this?", "prefer not to say",
+    "Remote", "Not sure yet", "I'm based in Remote",
+])
+def test_location_is_not_taken_from_non_answers(reply):
+    extractor = asked(LOCATION_QUESTION)
+    extractor.observe_user(reply)
+    assert not extractor.flags["location"]
+
+
+@pytest.mark.parametrize("reply, years", [
+    ("5 years", 5.0),
+    ("About 3.5 yrs in total", 3.5),
+    ("18 months", 1.5),
+    ("I'm a fresher", 0.0),
+])
+def test_experience_needs_a_unit(reply, years):
+    extractor = asked(EXPERIENCE_QUESTION)
+    extractor.observe_user(reply)
+    assert extractor.facts["years"] == years
+
+
+@pytest.mark.parametrize("reply", ["I have 2 kids", "4", "Worked at 3 companies"])
+def test_experience_is_not_taken_from_bare_numbers(reply):
+    extractor = asked(EXPERIENCE_QUESTION)
+    extractor.observe_user(reply)
+    assert not extractor.flags["experience"]
+
+
+def test_only_the_last_question_says_what_is_asked():
+    extractor = asked("Hi, I'm TalentScout! I'll collect your name, email, phone, location and experience. "
+                      "Ready? To start, what is your full name?")
+    assert extractor.asking_for == "name"
+    extractor.observe_user("Priya Shah")
+    assert extractor.facts["name"] == "Priya Shah"
+
+
+def test_bare_numbers_outside_experience_questions_are_ignored():
+    extractor = asked(NAME_QUESTION)
+    extractor.observe_user("Jane, 2 kids")
+    assert "years" not in extractor.facts
+
+
+def test_model_reported_fields_are_left_to_the_model(monkeypatch):
+    import extractor as extractor_module
+
+    monkeypatch.setattr(extractor_module, "METADATA_FIELDS", ("name", "questions"))
+    extractor = asked(NAME_QUESTION)
+    extractor.observe_user("My name is Jane Doe, jane@example.com, 555 123 4567")
+    collected_info = dict.fromkeys(extractor_module.FIELDS, False)
+    extractor.apply(collected_info)
+    assert extractor.flags["name"] and not collected_info["name"]
+    assert collected_info["contact"]
+
+
+def test_tech_stack_and_questions():
+    extractor = asked("Which technologies are in your tech stack?")
+    extractor.observe_user("Python, Django and PostgreSQL")
+    assert extractor.flags["tech_stack"]
+    assert extractor.facts["tech_stack"] == ["python", "django", "postgresql"]
+    for _ in range(3):
+        extractor.observe_assistant("How would you design a rate limiter?")
+        extractor.observe_user("With a token bucket per key.")
+    assert extractor.flags["questions"]
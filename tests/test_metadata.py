@@ -0,0 +1,61 @@
+import pytest
+
+from pipeline import MetadataStreamParser, parse_metadata_and_clean_reply
+
+REPLIES = [
+    ('Nice to meet you, Jane!\nMETADATA: {"name": true}', "Nice to meet you, Jane!", {"name": True}),
+    ('Thanks.\nMETADATA:\n```json\n{"name": true, "contact": false}\n```', "Thanks.", {"name": True, "contact": False}),
+    ('Thanks.\nMETADATA: ```json {"name": true}``` (updated)', "Thanks.", {"name": True}),
+    ("Thanks.\nMETADATA: none yet", "Thanks.", None),
+    ('Thanks.\nMETADATA: {"name": tr', "Thanks.", None),
+    ('Thanks.\nMETADATA: ["name"]', "Thanks.", None),
+    ("What is your full name?", "What is your full name?", None),
+]
+
+
+@pytest.mark.parametrize("raw_reply, display_text, metadata", REPLIES)
+def test_parse_metadata_and_clean_reply(raw_reply, display_text, metadata):
+    assert parse_metadata_and_clean_reply(raw_reply) == (display_text, metadata)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1000])
+@pytest.mark.parametrize("raw_reply, display_text, metadata", REPLIES)
+def test_stream_parser_matches_the_batch_parser(raw_reply, display_text, metadata, chunk_size):
+    parser = MetadataStreamParser()
+    shown = "".join(parser.feed(raw_reply[i:i + chunk_size]) for i in range(0, len(raw_reply), chunk_size))
+    shown += parser.finish()
+    assert shown == parser.display_text == display_text
+    assert parser.metadata == metadata
+    assert parser.raw_reply == raw_reply
+
+
+def test_a_partial_marker_is_held_back():
+    parser = MetadataStreamParser()
+    shown = parser.feed("Thanks.\nMETA")
+    assert "META" not in shown
+    assert parser.feed('DATA: {"name": true}') == ""
+    assert parser.metadata == {"name": True}
+    # Text that only looked like the marker is shown once it is ruled out
+    parser = MetadataStreamParser()
+    shown = parser.feed("Tell me about META")
+    shown += parser.feed("L and Vulkan.")
+    assert shown + parser.finish() == "Tell me about METAL and Vulkan."
+
+
+def test_streamed_turn_never_shows_the_trailer():
+    from backend_pool import BackendPool
+    from engine import InterviewSession, greet
+    from fake_backend import FakeBackend
+
+    fake = FakeBackend(ttft=0, tokens_per_second=0)
+    pool = BackendPool(fake.start(), health_interval=0)
+    shown = []
+    try:
+        session = InterviewSession()
+        greeting = greet(session, pool, stream=True, on_text=shown.append, use_cache=False)
+    finally:
+        pool.close()
+        fake.stop()
+    assert shown and shown[-1] == greeting
+    assert not any("METADATA" in text for text in shown)
+    assert "METADATA" in session.history[-1].content
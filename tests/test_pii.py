@@ -0,0 +1,64 @@
+import pytest
+
+from pii import find_pii, mask, scan
+
+
+@pytest.mark.parametrize("text, masked", [
+    ("jane.doe@example.com", "[EMAIL]"),
+    ("jane.doe+jobs@mail.example.co.uk", "[EMAIL]"),
+    ("5551234567", "[PHONE]"),
+    ("555-123-4567", "[PHONE]"),
+    ("555 123 4567", "[PHONE]"),
+    ("555.123.4567", "[PHONE]"),
+    ("(555) 123-4567", "[PHONE]"),
+    ("+1 (555) 123-4567", "[PHONE]"),
+    ("+1 555 123 4567", "[PHONE]"),
+    ("+1 555-123-4567", "[PHONE]"),
+    ("+1-555-123-4567", "[PHONE]"),
+    ("1 555-123-4567", "[PHONE]"),
+    ("1(555) 123-4567", "[PHONE]"),
+    ("+91 98765 43210", "[PHONE]"),
+    ("+44 20 7946 0958", "[PHONE]"),
+    ("https://github.com/janedoe", "[URL]"),
+    ("www.jane.dev", "[URL]"),
+    ("linkedin.com/in/jane-doe", "[URL]"),
+    ("@jane_doe", "[HANDLE]"),
+])
+def test_pii_is_masked(text, masked):
+    assert mask(text) == masked
+
+
+@pytest.mark.parametrize("text", [
+    "Python 3.11.4",
+    "from 2015 - 2020",
+    "a salary of 120,000",
+    "python.org",
+    "2015 2016 2017 2018",
+    "192.168.100.200",
+    "1.2.3.4.5.6.7.8.9.10",
+    "555-123 4567",
+    "version 2024.10.15.1234",
+])
+def test_technical_text_is_left_alone(text):
+    assert mask(text) == text
+
+
+def test_phone_next_to_other_numbers():
+    assert mask("Worked 2015 2016 2017 2018; call 555 123 4567.") == "Worked 2015 2016 2017 2018; call [PHONE]."
+
+
+def test_phone_followed_by_another_phone():
+    assert mask("1234567890-1234567890") == "[PHONE]-[PHONE]"
+    assert mask("555-123-4567-89") == "555-123-4567-89"
+
+
+def test_email_with_digits_in_local_part():
+    assert mask("jane.5551234567@example.com") == "[EMAIL]"
+
+
+def test_scan_reports_spans_in_the_original_text():
+    text = "Mail jane@example.com or call 555-123-4567"
+    masked, spans = scan(text)
+    assert masked == "Mail [EMAIL] or call [PHONE]"
+    assert spans == find_pii(text)
+    assert [text[start:end] for _, start, end in spans] == ["jane@example.com", "555-123-4567"]
@@ -0,0 +1,35 @@
+import pytest
+
+from backend_pool import BackendPool
+from fake_backend import FakeBackend
+from reply_pool import FALLBACK_CLOSING
+from replay import replay_interview
+
+
+@pytest.fixture(scope="module")
+def client():
+    fake = FakeBackend(ttft=0, tokens_per_second=0)
+    pool = BackendPool(fake.start(), health_interval=0)
+    yield pool
+    pool.close()
+    fake.stop()
+
+
+def test_exit_message_is_answered_with_the_closing(client):
+    result = replay_interview(client, "llama3.1", ["Hi, I'm Priya Shah.", "bye", "ignored"], use_cache=False)
+    assert [turn["user"] for turn in result["turns"]] == [None, "Hi, I'm Priya Shah.", "bye"]
+    assert result["turns"][-1]["reply"] == FALLBACK_CLOSING
+    session = result["session"]
+    assert session.ended and session.messages[-1].display == FALLBACK_CLOSING
+    assert not result["errors"]
+
+
+def test_failed_turn_leaves_no_user_message_behind():
+    down = BackendPool("http://127.0.0.1:9/v1", health_interval=0)
+    try:
+        result = replay_interview(down, "llama3.1", ["Hi, I'm Priya Shah."], use_cache=False)
+    finally:
+        down.close()
+    assert [error["turn"] for error in result["errors"]] == [0, 0]
+    session = result["session"]
+    assert [m.role for m in session.history] == ["system"] and not session.messages
@@ -0,0 +1,42 @@
+from semantic_cache import SemanticCache, mentions_private_facts, message_values
+
+SCOPE = ("llama3.1", "collecting", ("name", "contact", "location"), "experience")
+
+
+def test_reply_repeating_the_candidates_years_is_not_stored():
+    cache = SemanticCache()
+    signature = cache.sketch("I have 5 years of experience")
+    assert cache.set(SCOPE, signature, "5 years is a solid background!", {}, "I have 5 years of experience") is None
+    assert cache.get(SCOPE, cache.sketch("I have 12 years of experience")) is None
+    assert cache.stats()["skipped_private"] == 1
+
+
+def test_different_numbers_do_not_match():
+    cache = SemanticCache()
+    reply = "Great background! Which position are you interested in?"
+    assert cache.set(SCOPE, cache.sketch("I have 5 years of experience"), reply) is not None
+    assert cache.get(SCOPE, cache.sketch("I have 12 years of experience")) is None
+    assert cache.get(SCOPE, cache.sketch("i have 5 years of experience.")) is not None
+
+
+def test_message_values():
+    assert message_values("Hi! I have 5 years at Google, mostly Python. Thanks") == {"5", "google", "python"}
+
+
+def test_values_from_the_message_block_the_reply():
+    message = "I worked at Acme for 3 years"
+    assert mentions_private_facts("Acme is a great place to learn!", {}, message)
+    assert mentions_private_facts("3 years, nice.", {}, message)
+    assert not mentions_private_facts("Thanks! Where are you based?", {}, message)
+
+
+def test_tech_stack_may_be_repeated():
+    facts = {"tech_stack": ["python", "django"]}
+    assert not mentions_private_facts("Python and Django, nice!", facts, "I use Python and Django")
+
+
+def test_name_location_and_email_are_never_stored():
+    facts = {"name": "Priya Shah", "location": "Pune"}
+    assert mentions_private_facts("Thanks, Priya!", facts)
+    assert mentions_private_facts("Pune is lovely.", facts)
+    assert mentions_private_facts("I'll write to priya@example.com.", {})
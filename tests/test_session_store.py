@@ -0,0 +1,45 @@
+import pytest
+
+from session_store import MemorySessionStore, SQLiteSessionStore, SessionConflict, open_session_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_versions_advance_on_every_write(store):
+    assert store.put("s", {"turn": 1}) == 1
+    assert store.put("s", {"turn": 2}, 1) == 2
+    assert store.get("s") == ({"turn": 2}, 2)
+
+
+def test_stale_writes_conflict(store):
+    store.put("s", {"turn": 1})
+    store.put("s", {"turn": 2}, 1)
+    with pytest.raises(SessionConflict):
+        store.put("s", {"turn": 2}, 1)
+    with pytest.raises(SessionConflict):
+        store.put("s", {"turn": 1})
+
+
+def test_returned_state_is_a_copy(store):
+    store.put("s", {"messages": []})
+    state, _ = store.get("s")
+    state["messages"].append("changed")
+    assert store.get("s")[0] == {"messages": []}
+
+
+def test_expired_and_deleted_sessions_are_gone(store):
+    store.put("s", {})
+    assert store.delete("s") and store.get("s") is None
+    store.ttl = -1
+    store.put("t", {})
+    assert store.get("t") is None
+
+
+def test_unknown_store_url():
+    with pytest.raises(ValueError):
+        open_session_store("redis://localhost")
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from transcript_store import TranscriptStore, export_jsonl
+
+
+def interview(session_id: str) -> dict:
+    return {"session_id": session_id, "model": "llama3.1", "collected_info": {"name": True},
+            "history": [{"role": "user", "content": f"I'm candidate {session_id}"}]}
+
+
+def stored_records(store: TranscriptStore) -> list:
+    """Everything on disk, tombstones and deleted interviews included."""
+    return [record for path in store._segment_paths() for records in store._read_frames(path) for record in records]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TranscriptStore(str(tmp_path), plaintext=True, flush_interval=0)
+    yield store
+    store.flush()
+
+
+def test_a_key_is_required_unless_plaintext_is_allowed(tmp_path):
+    with pytest.raises(RuntimeError, match="TALENTSCOUT_TRANSCRIPT_KEY"):
+        TranscriptStore(str(tmp_path))
+
+
+def test_export_returns_interviews_oldest_first(store):
+    for session_id in ("a", "b", "c"):
+        store.submit(interview(session_id))
+        store.flush()
+    assert [record["session_id"] for record in store.export()] == ["a", "b", "c"]
+
+
+def test_tombstone_hides_and_erases_the_session(store):
+    store.submit(interview("a"))
+    store.submit(interview("b"))
+    store.flush()
+    store.delete("a")
+    store.flush()
+    assert [record["session_id"] for record in store.export()] == ["b"]
+    on_disk = stored_records(store)
+    assert not any(r["type"] == "interview" and r["session_id"] == "a" for r in on_disk)
+    assert [r["type"] for r in on_disk if r["session_id"] == "a"] == ["tombstone"]
+    assert store.stats()["tombstones"] == 1
+
+
+def test_erase_rewrites_every_segment(tmp_path):
+    store = TranscriptStore(str(tmp_path), plaintext=True, segment_bytes=1, flush_interval=0)
+    for session_id in ("a", "b", "a"):
+        store.submit(interview(session_id))
+        store.flush()
+    assert store.stats()["segments"] == 3
+    store.delete("a")
+    store.flush()
+    assert [r["session_id"] for r in stored_records(store) if r["type"] == "interview"] == ["b"]
+
+
+def test_stores_sharing_a_directory_do_not_lose_records(tmp_path):
+    # Two API workers: each keeps writing after the other erased a session
+    first = TranscriptStore(str(tmp_path), plaintext=True, flush_interval=0)
+    second = TranscriptStore(str(tmp_path), plaintext=True, flush_interval=0)
+    first.submit(interview("a"))
+    first.flush()
+    second.submit(interview("b"))
+    second.flush()
+    second.delete("a")
+    second.flush()
+    first.submit(interview("c"))
+    first.flush()
+    assert [record["session_id"] for record in first.export()] == ["b", "c"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_encrypted_store_round_trip(tmp_path):
+    fernet = pytest.importorskip("cryptography.fernet")
+    key = fernet.Fernet.generate_key().decode()
+    store = TranscriptStore(str(tmp_path), key=key, flush_interval=0)
+    store.submit(interview("a"))
+    store.flush()
+    raw = b"".join(open(path, "rb").read() for path in store._segment_paths())
+    assert b"candidate" not in raw
+    assert [record["session_id"] for record in TranscriptStore(str(tmp_path), key=key).export()] == ["a"]
+
+
+def test_export_jsonl(store, tmp_path):
+    store.submit(interview("a"))
+    store.flush()
+    out = tmp_path / "out.jsonl"
+    with open(out, "w", encoding="utf-8") as f:
+        assert export_jsonl(store, f) == 1
+    assert '"session_id": "a"' in out.read_text()
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from history import ConversationHistory, Message
+from worker import InputWorker
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+class FakeTurn:
+    """Answers like engine.answer: adds the turn to the history, or nothing when cancelled or failing."""
+
+    def __init__(self, history, reply: str = "reply", error: Exception | None = None):
+        self.history = history
+        self.reply = reply
+        self.error = error
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.inputs = []
+
+    def __call__(self, user_input, on_text=None, is_cancelled=None):
+        message = Message("user", user_input)
+        self.history.append(message)
+        self.inputs.append(user_input)
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            self.history.pop()
+            raise self.error
+        if is_cancelled():
+            self.history.pop()
+            return None
+        return message, self.history.add_reply(self.reply, self.reply)
+
+
+def make_worker(**kwargs) -> tuple:
+    history = ConversationHistory([{"role": "system", "content": "You are TalentScout."}])
+    turn = FakeTurn(history, **kwargs)
+    return InputWorker(history, turn, supersede=True), turn
+
+
+def test_turn_is_answered_and_handed_back():
+    worker, turn = make_worker()
+    turn.release.set()
+    worker.submit("hello", {})
+    wait_for(lambda: not worker.busy)
+    [result] = worker.poll()
+    assert result["error"] is None and result["message"].content == "reply"
+    assert [m.role for m in worker.history] == ["system", "user", "assistant"]
+
+
+def test_cancelled_turn_leaves_no_orphaned_user_message():
+    worker, turn = make_worker()
+    worker.submit("first", {})
+    assert turn.started.wait(5)
+    worker.cancel()
+    turn.release.set()
+    wait_for(lambda: not worker.busy)
+    assert [m.role for m in worker.history] == ["system"]
+    assert worker.poll() == []
+
+
+def test_input_after_cancel_is_answered_alone():
+    worker, turn = make_worker()
+    worker.submit("first", {})
+    assert turn.started.wait(5)
+    worker.cancel()
+    worker.submit("second", {})
+    turn.release.set()
+    wait_for(lambda: not worker.busy)
+    assert [(m.role, m.content) for m in worker.history[1:]] == [("user", "second"), ("assistant", "reply")]
+
+
+def test_newer_input_supersedes_the_turn_in_flight():
+    worker, turn = make_worker()
+    worker.submit("first", {})
+    assert turn.started.wait(5)
+    worker.submit("second", {})
+    turn.release.set()
+    wait_for(lambda: not worker.busy)
+    assert turn.inputs == ["first", "first\n\nsecond"]
+    assert worker.superseded_turns == 1
+    assert [m.content for m in worker.history[1:]] == ["first\n\nsecond", "reply"]
+
+
+def test_error_without_message_is_named():
+    worker, turn = make_worker(error=TimeoutError())
+    turn.release.set()
+    worker.submit("hello", {})
+    wait_for(lambda: not worker.busy)
+    assert [result["error"] for result in worker.poll()] == ["TimeoutError"]
+    assert [m.role for m in worker.history] == ["system"]